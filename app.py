@@ -1,4 +1,11 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
 import streamlit as st
+from utils.anomaly import describe
+from utils.data_sources import chatbot_summary, cs_summary, signup_summary
+from utils.warmup import start_warmup
 
 # 페이지 설정
 st.set_page_config(
@@ -68,6 +75,93 @@ st.title("🚀 CS & Data Intelligence Dashboard")
 st.write("실무 경험에 데이터 분석과 AI 기술을 접목하여 구축한 포트폴리오입니다.")
 st.divider()
 
+# --- 오늘의 핵심 지표 (공유 캐시에서 동시에 계산) ---
+# 카드마다 원본(구글 시트 / 챗봇 로그)이 달라서 동시에 불러오고, 카드별 제한 시간을 넘기면
+# 그 카드만 '불러오는 중'으로 두고 페이지는 먼저 그립니다. 백그라운드 작업은 계속 돌아
+# 캐시를 채우므로, 새로고침하거나 상세 페이지로 이동하면 바로 보입니다.
+# 원본마다 진행 중인 작업은 하나만 둡니다. (새로고침/다른 세션은 끝날 때까지 같은 작업을 기다림)
+# 작업은 여러 세션이 함께 기다리므로 특정 세션의 실행 컨텍스트를 붙이지 않습니다. KPI 함수는
+# 데이터만 다루고(st.secrets 는 세션과 무관), 화면/session_state 는 건드리지 않아야 합니다.
+KPI_TIMEOUTS = {"cs": 8.0, "signup": 8.0, "chatbot": 3.0}   # 카드별 제한 시간(초)
+KPI_SOURCES = {"cs": cs_summary, "signup": signup_summary, "chatbot": chatbot_summary}
+
+
+@st.cache_resource
+def kpi_executor():
+    return ThreadPoolExecutor(max_workers=len(KPI_SOURCES), thread_name_prefix="kpi")
+
+
+@st.cache_resource
+def kpi_inflight():
+    # (잠금, {원본: 진행 중이거나 마지막으로 끝난 future}) - 모든 세션이 함께 씀
+    return threading.Lock(), {}
+
+
+def _kpi_future(key, fn):
+    # 아직 안 끝난 작업이 있으면 새로 제출하지 않고 그 작업을 다시 기다림 (시간 초과가 쌓여도 작업은 원본당 하나)
+    lock, inflight = kpi_inflight()
+    with lock:
+        future = inflight.get(key)
+        if future is None or future.done():
+            future = kpi_executor().submit(fn)
+            inflight[key] = future
+        return future
+
+
+def load_kpis():
+    started = time.monotonic()
+    futures = {key: _kpi_future(key, fn) for key, fn in KPI_SOURCES.items()}
+    results = {}
+    for key, future in futures.items():
+        remaining = KPI_TIMEOUTS[key] - (time.monotonic() - started)
+        try:
+            results[key] = future.result(timeout=max(remaining, 0))
+        except FutureTimeout:
+            results[key] = "timeout"
+        except Exception as e:
+            results[key] = e
+    return results, time.monotonic() - started
+
+
+def kpi_placeholder(col, label, result):
+    if result == "timeout":
+        col.metric(label, "⏳", help="불러오는 중입니다. 잠시 후 새로고침하면 표시됩니다.")
+    else:
+        col.metric(label, "-", help=f"불러오지 못했습니다: {result}")
+
+
+st.subheader("📌 오늘의 핵심 지표")
+kpis, kpi_elapsed = load_kpis()
+k1, k2, k3, k4 = st.columns(4)
+
+cs = kpis["cs"]
+if isinstance(cs, dict):
+    k1.metric("오늘 CS 접수", f"{cs['today']}건")
+    k2.metric("미처리 CS", f"{cs['unsolved']}건", delta_color="inverse")
+else:
+    kpi_placeholder(k1, "오늘 CS 접수", cs)
+    kpi_placeholder(k2, "미처리 CS", cs)
+
+signup = kpis["signup"]
+if isinstance(signup, dict):
+    k3.metric("이번 달 신규 가입", f"{signup['month']:,}명", f"누적 {signup['total']:,}명", delta_color="off")
+else:
+    kpi_placeholder(k3, "이번 달 신규 가입", signup)
+
+chat = kpis["chatbot"]
+if isinstance(chat, dict):
+    k4.metric("오늘 챗봇 상담", f"{chat['today']}세션", f"질문 {chat['questions_today']}건", delta_color="off")
+else:
+    kpi_placeholder(k4, "오늘 챗봇 상담", chat)
+
+if isinstance(cs, dict) and cs["anomalies"]:
+    # 요일별 평소 수준 대비 급증한 카테고리 (utils.anomaly)
+    for flag in cs["anomalies"][:5]:
+        st.warning(f"🚨 CS 인입 급증 · {describe(flag)}")
+
+st.caption(f"CS·가입자 지표는 최대 1분 캐시 기준입니다. (집계 {kpi_elapsed:.1f}초)")
+st.divider()
+
 # --- 프로젝트 섹션 (2단 구성) ---
 col1, col2 = st.columns(2)
 
@@ -108,4 +202,7 @@ with col6:
     st.empty()
 
 st.divider()
-st.caption("© 2026 CS Manager Portfolio. Built with Streamlit & Python.")
\ No newline at end of file
+st.caption("© 2026 CS Manager Portfolio. Built with Streamlit & Python.")
+
+# --- 무거운 라이브러리 미리 불러오기 (화면을 다 그린 뒤 백그라운드에서, 프로세스당 1회) ---
+start_warmup()
@@ -1,18 +1,28 @@
 import streamlit as st
 import pandas as pd
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import plotly.express as px
-import plotly.graph_objects as go
 import datetime
-from prophet import Prophet
-
-# 워드 클라우드용 라이브러리
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
+from utils.charts import aggregate_counts, band_xy, downsample, scatter_class, size_caption
+from utils.data_grid import data_grid
+from utils.export import export_menu
+from utils.anomaly import describe, recent_flags
+from utils.cache_registry import budgeted_cache
+from utils.data_sources import CS_SHEETS, cs_anomalies, data_version, load_cs_data
+from utils.sla import AGING_THRESHOLDS, SLA_DAYS, sla_report
+from utils.view_state import (
+    ALL, get_param, grades_key, init_state, parse_date, parse_list, shared_view, view_key, write_params,
+)
+from utils.forecasting import (
+    HORIZON, MIN_TRAIN, MODEL_LABELS, available_models, backtest, best_model, daily_series,
+    forecast as forecast_model, forecast_many, split_series,
+)
+
+# [성능] prophet / wordcloud / matplotlib / gspread 는 불러오는 데만 수 초가 걸리므로
+# 맨 위에서 import 하지 않고, 실제로 쓰는 함수/탭 안에서 처음 필요할 때 불러옵니다.
 import platform
 
 #한글깨짐 보완
+import io
 import os
 import urllib.request
 
@@ -21,82 +31,97 @@ import urllib.request
 # ==========================================
 st.set_page_config(page_title="일반 CS 대시보드", page_icon="📞", layout="wide")
 
-# -------------------------------------------------------------------
-# [중요] 구글 시트 주소
-# -------------------------------------------------------------------
-SHEET_URL = "https://docs.google.com/spreadsheets/d/1MQVn2jcKiHagQqUyyHR3ew9BLhD520Cv3UTwVMo5_6g/edit?usp=sharing"
-# -------------------------------------------------------------------
-
 # ==========================================
 # [함수] 데이터 로드 (시트 이름을 인자로 받음)
 # ==========================================
-@st.cache_data(ttl=60)
+# 시트 읽기/전처리와 캐시는 utils.data_sources 에 있어 랜딩 페이지 요약 카드와 캐시를 함께 씁니다.
 def load_data(target_sheet_name):
     try:
-        # 1. 인증 및 연결
-        scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-        
-        # --- 변경소스 ---
-        # 파일 이름 대신 st.secrets에 저장한 딕셔너리를 직접 사용합니다.
-        creds_dict = dict(st.secrets["gcp_service_account"])
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-        # -----------------------
-        
-        client = gspread.authorize(creds)
-        
-        sh = client.open_by_url(SHEET_URL)
-        
-        # 선택된 시트 이름으로 접속
-        try:
-            worksheet = sh.worksheet(target_sheet_name)
-        except gspread.exceptions.WorksheetNotFound:
-            return None # 시트가 없으면 None 반환
+        return load_cs_data(target_sheet_name)
+    except Exception as e:
+        st.error(f"오류 발생: {e}")
+        return pd.DataFrame()
 
-        # 2. 데이터 가져오기
-        raw_data = worksheet.get_all_values()
-        
-        if len(raw_data) < 5:
-            return pd.DataFrame()
+MAX_GROUP_SERIES = 40   # 카테고리/부서별 예측에서 한 번에 그리는 최대 시리즈 수
+MODES = list(CS_SHEETS)
+DEFAULT_KEYWORDS = "완독, 지성의별"
 
-        # 5행 헤더, 6행 데이터
-        header = raw_data[4]
-        rows = raw_data[5:]
-        
-        df = pd.DataFrame(rows, columns=header)
-        
-        # 3. 데이터 청소
-        df.columns = df.columns.str.strip()
-        
-        if '일시' in df.columns:
-            df = df[df['일시'].str.strip() != '']
-        else:
-            return pd.DataFrame()
+# [리스크 분류 로직 개선]
+# 팀장님 의견 반영: 시스템/연동은 Showstopper, 컨텐츠는 Quality Issue로 분리
+def classify_risk(val):
+    val = str(val).strip()
 
-        # 4. 날짜 변환 (점. 제거 및 변환)
-        def clean_date(col_name):
-            if col_name in df.columns:
-                df[col_name] = df[col_name].astype(str).str.replace('.', '-', regex=False)
-                df[col_name] = pd.to_datetime(df[col_name], errors='coerce')
+    # 1. Showstopper: 문이 안 열림 (가장 심각)
+    if val in ['회원연동문제', '시스템오류']:
+        return '⛔ Showstopper (진입/이용 불가)'
 
-        clean_date('일시')
-        clean_date('처리일')
-        
-        # 날짜 없는 행 제거
-        df = df.dropna(subset=['일시'])
+    # 2. Quality Issue: 보기에 안 좋음 (신뢰도 하락)
+    elif val in ['컨텐츠오류']:
+        return '📉 Quality Issue (신뢰도 하락)'
 
-        # 5. 파생 변수 생성
-        if '처리일' in df.columns:
-            df['체류시간'] = (df['처리일'] - df['일시']).dt.total_seconds() / (60 * 60 * 24)
-        
-        if '일시' in df.columns:
-            day_map = {0:'월', 1:'화', 2:'수', 3:'목', 4:'금', 5:'토', 6:'일'}
-            df['요일'] = df['일시'].dt.dayofweek.map(day_map)
-            
-        return df
+    # 3. General: 사용성 문제
+    elif val in ['단순문의']:
+        return '⚠️ 일반 문의 (사용성 불편)'
+    else:
+        return '기타'
+
+def filter_frame(df_raw, start_date, end_date, selected_grades):
+    # 필터 적용 + 리스크 유형 컬럼 (이 결과는 세션끼리 공유하므로 화면 코드에서 고치지 않음)
+    mask = (df_raw['일시'].dt.date >= start_date) & (df_raw['일시'].dt.date <= end_date)
+    if '학년' in df_raw.columns and selected_grades:
+        mask = mask & (df_raw['학년'].isin(selected_grades))
+    df = df_raw.loc[mask].copy()
+    target_col = '처리카테고리' if '처리카테고리' in df.columns else '카테고리'
+    if target_col in df.columns:
+        df['리스크_유형'] = df[target_col].apply(classify_risk)
+    return df
 
-    except Exception as e:
-        st.error(f"오류 발생: {e}")
-        return pd.DataFrame()
+# ==========================================
+# [함수] 예측 (백테스트 / 예측 결과 캐시)
+# ==========================================
+# 같은 일별 건수 시리즈면 다시 계산하지 않습니다. (시리즈 값 자체가 캐시 키, 디스크 캐시로 프로세스끼리 공유)
+@budgeted_cache(ttl=6 * 3600, max_entries=4, disk=True)
+def run_backtest(start, values):
+    return backtest(pd.Series(values, index=pd.date_range(start, periods=len(values), freq="D")))
+
+@budgeted_cache(ttl=6 * 3600, max_entries=8, disk=True)
+def make_forecast(model, start, values):
+    return forecast_model(model, pd.Series(values, index=pd.date_range(start, periods=len(values), freq="D")), horizon=30)
+
+# ==========================================
+# [함수] 워드 클라우드 (PNG 이미지 캐시)
+# ==========================================
+@budgeted_cache(ttl=6 * 3600, max_entries=4, disk=True)
+def render_wordcloud(text_data):
+    from wordcloud import WordCloud
+
+    # 1. [핵심] 제거할 단어 리스트 만들기 (불용어)
+    # 여기에 보기 싫은 단어를 계속 추가하시면 됩니다!
+    stop_words = {
+        "합니다", "부탁드립니다", "문의주셨습니다", "확인부탁드립니다", 
+        "안녕하세요", "감사합니다", "주셨습니다", "대해", "관련", 
+        "확인", "부탁", "드립니다", "있는", "있습니다", "하는", 
+        "문의", "내용", "건으로", "대한", "드립니다","독서화랑","충돌","이해","비판","어머니께서"
+    }
+
+    font_file = "NanumGothic.ttf"
+    if not os.path.exists(font_file):
+        url = "https://github.com/google/fonts/raw/main/ofl/nanumgothic/NanumGothic-Regular.ttf"
+        urllib.request.urlretrieve(url, font_file)
+
+    wc = WordCloud(
+        font_path=font_file,
+        width=1000, height=500,
+        background_color='white',
+        colormap='viridis',
+        max_words=100,
+        stopwords=stop_words  # <--- [핵심] 여기에 제거 리스트 적용!
+    ).generate(text_data)
+
+    # 프로세스끼리 나눠 쓸 수 있도록 그림 객체 대신 PNG 바이트로 저장
+    buf = io.BytesIO()
+    wc.to_image().save(buf, format="PNG")
+    return buf.getvalue()
 
 # ==========================================
 # [UI] 사이드바 (먼저 보여야 함)
@@ -104,18 +129,16 @@ def load_data(target_sheet_name):
 with st.sidebar:
     st.title("🗂️ 조회 대상 선택")
     
-    # 1. 시트 선택 스위치 (라디오 버튼)
+    # 1. 시트 선택 스위치 (라디오 버튼) - 링크로 열면 주소의 ?mode= 값으로 시작
+    init_state("cs_mode", get_param("mode") if get_param("mode") in MODES else MODES[0])
     target_mode = st.radio(
         "보고 싶은 데이터를 선택하세요",
-        ["관리부", "선생님"],
-        index=0 # 기본값: 관리부
+        MODES,
+        key="cs_mode",
     )
     
     # 선택에 따라 실제 시트 이름 매핑
-    if target_mode == "관리부":
-        sheet_name = "CS 접수기록(관리부)"
-    else:
-        sheet_name = "CS 접수기록(선생님)"
+    sheet_name = CS_SHEETS[target_mode]
         
     st.divider()
     st.header("🔍 검색 필터")
@@ -144,23 +167,38 @@ with st.sidebar:
     min_date = df_raw['일시'].min().date()
     max_date = df_raw['일시'].max().date()
     
-    start_date = st.date_input("시작일", min_date)
-    end_date = st.date_input("종료일", max_date)
+    # 기간은 시트마다 따로 기억하고, 이 시트의 데이터 범위 안으로 맞춤 (모드 전환/데이터 갱신 후에도)
+    start_key, end_key = f"cs_start_{target_mode}", f"cs_end_{target_mode}"
+    init_state(start_key, parse_date(get_param("from"), min_date))
+    init_state(end_key, parse_date(get_param("to"), max_date))
+    st.session_state[start_key] = min(max(st.session_state[start_key], min_date), max_date)
+    st.session_state[end_key] = min(max(st.session_state[end_key], st.session_state[start_key]), max_date)
+    start_date = st.date_input("시작일", key=start_key, min_value=min_date, max_value=max_date)
+    end_date = st.date_input("종료일", key=end_key, min_value=min_date, max_value=max_date)
     
-    # 학년 필터
+    # 학년 필터 (주소에 grades 가 없으면 전체)
     if '학년' in df_raw.columns:
         grades = sorted([g for g in df_raw['학년'].unique() if g and str(g).strip() != ''])
-        selected_grades = st.multiselect("학년 선택", grades, default=grades)
+        init_state("cs_grades", [g for g in parse_list(get_param("grades")) if g in grades] or grades)
+        st.session_state["cs_grades"] = [g for g in st.session_state["cs_grades"] if g in grades] or grades
+        selected_grades = st.multiselect("학년 선택", grades, key="cs_grades")
     else:
-        selected_grades = []
+        grades, selected_grades = [], []
 
-# --- 필터링 적용 ---
-mask = (df_raw['일시'].dt.date >= start_date) & (df_raw['일시'].dt.date <= end_date)
+    st.caption("🔗 주소창의 링크를 공유하면 같은 조건으로 열립니다.")
 
-if '학년' in df_raw.columns and selected_grades:
-    mask = mask & (df_raw['학년'].isin(selected_grades))
+# --- 필터링 적용 (정규화한 필터 키가 같으면 다른 사람이 이미 계산한 결과를 그대로 씀) ---
+grade_filter = grades_key(selected_grades, grades)
+view = view_key(sheet_name, data_version(df_raw), start_date, end_date, min_date, max_date, grade_filter)
+df = shared_view(view, "df", lambda: filter_frame(
+    df_raw, start_date, end_date, [] if grade_filter == ALL else list(grade_filter)))
 
-df = df_raw.loc[mask]
+write_params({
+    "mode": target_mode,
+    "from": None if start_date <= min_date else start_date.isoformat(),
+    "to": None if end_date >= max_date else end_date.isoformat(),
+    "grades": None if grade_filter == ALL else ",".join(grade_filter),
+})
 
 # --- KPI 지표 ---
 c1, c2, c3, c4 = st.columns(4)
@@ -169,18 +207,42 @@ c1.metric("총 접수", f"{len(df)}건")
 unsolved = len(df[df['처리 상태'] != '처리완료']) if '처리 상태' in df.columns else 0
 c2.metric("미처리", f"{unsolved}건", delta_color="inverse")
 
+# 처리 시간: 주말/공휴일 제외 영업일 기준 중앙값 (utils.sla, 보기 키(데이터 버전 + 필터)별 캐시)
+sla = sla_report(df, view)
 avg_time = df['체류시간'].mean() if '체류시간' in df.columns else 0
-val_time = f"{avg_time:.1f}일" if pd.notnull(avg_time) else "-"
-c3.metric("평균 처리 시간", val_time)
+val_time = f"{sla['overall']['p50']:.0f}영업일" if sla['overall']['p50'] is not None else "-"
+c3.metric("처리 시간 (중앙값)", val_time,
+          help=f"달력 기준 평균 {avg_time:.1f}일" if pd.notnull(avg_time) else None)
 
 top_cat = df['카테고리'].value_counts().idxmax() if '카테고리' in df.columns and not df.empty else "-"
 c4.metric("최다 발생 이슈", top_cat)
 
+# --- 인입량 이상 감지 (전체 기간 데이터로 상태를 증분 갱신, 필터와 무관) ---
+anomalies = cs_anomalies({target_mode: df_raw})
+for flag in anomalies:
+    st.error(f"🚨 평소보다 문의가 급증했습니다 · {describe(flag)}")
+history = recent_flags(target_mode)
+if history:
+    with st.expander(f"📈 최근 30일 이상 급증 기록 ({len(history)}건)"):
+        st.dataframe(
+            pd.DataFrame(history)[["day", "category", "count", "expected", "z"]].rename(columns={
+                "day": "날짜", "category": "카테고리", "count": "건수", "expected": "평소(기대값)", "z": "z점수"}),
+            use_container_width=True, hide_index=True,
+        )
+
 st.divider()
 
+def heat_styles(table):
+    # background_gradient(cmap="Reds") 와 비슷한 색을 직접 계산 (Styler 의 그라데이션은 matplotlib 을 불러옴)
+    values = table.astype(float)
+    lo, hi = values.min().min(), values.max().max()
+    scale = (values - lo) / (hi - lo) if hi > lo else values * 0
+    return scale.apply(lambda col: col.map(
+        lambda s: f"background-color: rgba(203, 24, 29, {0.05 + 0.85 * s:.2f}); color: {'white' if s > 0.6 else 'black'}"))
+
 # --- 탭 구성 ---
 #tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["📊 종합 현황", "📈 상세 분석", "💡 건의사항 집중 분석", "🔮 미래 예측 (AI)", "📋 데이터 원본","🔍 키워드 맞춤 분석"])
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 종합 현황", "📈 상세 분석", "💡 건의사항 집중 분석", "🔮 미래 예측 (AI)", "🔍 키워드 맞춤 분석"])
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["📊 종합 현황", "📈 상세 분석", "💡 건의사항 집중 분석", "🔮 미래 예측 (AI)", "🔍 키워드 맞춤 분석", "⏱️ 처리 시간 (SLA)"])
 
 # 탭 1: 종합 분석 (순서 변경: 상세표 -> 추이 -> 안전성 진단)
 with tab1:
@@ -191,9 +253,11 @@ with tab1:
     st.caption("현재 접수된 문의들의 유형별 교차 분석표입니다. (가로: 처리 결과 / 세로: 문의 주제)")
     
     if '카테고리' in df.columns and '처리카테고리' in df.columns:
-        pivot = pd.crosstab(df['카테고리'], df['처리카테고리'], margins=True, margins_name="총 합계")
+        pivot = shared_view(view, "pivot", lambda: pd.crosstab(
+            df['카테고리'], df['처리카테고리'], margins=True, margins_name="총 합계"))
         # 히트맵 스타일 적용 (숫자가 클수록 진하게)
-        st.dataframe(pivot.style.background_gradient(cmap="Reds", axis=None), use_container_width=True)
+        st.dataframe(pivot.style.apply(heat_styles, axis=None), use_container_width=True)
+        export_menu(pivot, f"CS_접수vs처리_{target_mode}", "pivot_export", token=view, index=True)
     else:
         st.info("카테고리 데이터가 부족하여 표를 생성할 수 없습니다.")
 
@@ -207,21 +271,28 @@ with tab1:
     with c1:
         st.subheader("🏢 부서별 이슈 관여도")
         if '협업 부서' in df.columns:
-            dept_df = df[df['협업 부서'].str.strip() != '']
-            dept_cnt = dept_df['협업 부서'].value_counts().reset_index()
-            dept_cnt.columns = ['부서', '건수']
-            
-            fig = px.bar(dept_cnt, x='건수', y='부서', orientation='h', text='건수',
-                         color_discrete_sequence=['#FF8C00']) # 주황색
-            fig.update_layout(yaxis={'categoryorder':'total ascending'})
-            st.plotly_chart(fig, use_container_width=True)
+            def build_dept():
+                dept_df = df[df['협업 부서'].str.strip() != '']
+                dept_cnt = dept_df['협업 부서'].value_counts().reset_index()
+                dept_cnt.columns = ['부서', '건수']
+                
+                fig = px.bar(dept_cnt, x='건수', y='부서', orientation='h', text='건수',
+                             color_discrete_sequence=['#FF8C00']) # 주황색
+                fig.update_layout(yaxis={'categoryorder':'total ascending'})
+                return fig
+            st.plotly_chart(shared_view(view, "fig_dept", build_dept), use_container_width=True)
             
     with c2:
         st.subheader("📅 일자별 접수 추이")
         if not df.empty:
-            daily = df.groupby(df['일시'].dt.date).size().reset_index(name='건수')
-            fig_daily = px.bar(daily, x='일시', y='건수', color_discrete_sequence=['#A9A9A9']) # 회색
+            # 조회 기간이 길면 주/월 단위로 묶어서 보냄 (utils.charts)
+            def build_daily():
+                daily, freq = aggregate_counts(df['일시'], x_name='일시')
+                fig_daily = px.bar(daily, x='일시', y='건수', color_discrete_sequence=['#A9A9A9']) # 회색
+                return fig_daily, size_caption(fig_daily, freq)
+            fig_daily, daily_caption = shared_view(view, "fig_daily", build_daily)
             st.plotly_chart(fig_daily, use_container_width=True)
+            st.caption(daily_caption)
 
     st.divider()
 
@@ -230,30 +301,9 @@ with tab1:
     # --------------------------------------------------------------------------------
     st.markdown("### 🚨 서비스 안정성 진단 ")
     
-    # [리스크 분류 로직 개선]
-    # 팀장님 의견 반영: 시스템/연동은 Showstopper, 컨텐츠는 Quality Issue로 분리
-    def classify_risk(val):
-        val = str(val).strip()
-        
-        # 1. Showstopper: 문이 안 열림 (가장 심각)
-        if val in ['회원연동문제', '시스템오류']:
-            return '⛔ Showstopper (진입/이용 불가)'
-            
-        # 2. Quality Issue: 보기에 안 좋음 (신뢰도 하락)
-        elif val in ['컨텐츠오류']:
-            return '📉 Quality Issue (신뢰도 하락)'
-            
-        # 3. General: 사용성 문제
-        elif val in ['단순문의']:
-            return '⚠️ 일반 문의 (사용성 불편)'
-        else:
-            return '기타'
-
-    # 분석 기준열 설정
+    # 분석 기준열 설정 (리스크 유형은 filter_frame 에서 미리 계산해 둠)
     target_col = '처리카테고리' if '처리카테고리' in df.columns else '카테고리'
     
-    df['리스크_유형'] = df[target_col].apply(classify_risk)
-    
     # 통계 계산
     risk_counts = df['리스크_유형'].value_counts()
     
@@ -279,10 +329,11 @@ with tab1:
     
     with col_risk1:
         st.caption("📊 리스크 유형별 비중")
-        risk_df = df['리스크_유형'].value_counts().reset_index()
-        risk_df.columns = ['유형', '건수']
-        
-        fig_risk = px.pie(risk_df, values='건수', names='유형', hole=0.4,
+        def build_risk():
+            risk_df = risk_counts.reset_index()
+            risk_df.columns = ['유형', '건수']
+            
+            return px.pie(risk_df, values='건수', names='유형', hole=0.4,
                           color='유형',
                           color_discrete_map={
                               '⛔ Showstopper (진입/이용 불가)': '#FF4B4B',   # 빨강
@@ -290,7 +341,7 @@ with tab1:
                               '⚠️ 일반 문의 (사용성 불편)': '#FFCC00',     # 노랑
                               '기타': '#E0E0E0'
                           })
-        st.plotly_chart(fig_risk, use_container_width=True)
+        st.plotly_chart(shared_view(view, "fig_risk", build_risk), use_container_width=True)
         
     with col_risk2:
         st.caption("🔥 Showstopper & Quality 상세 내역")
@@ -298,14 +349,16 @@ with tab1:
         critical_df = df[df['리스크_유형'].str.contains('Showstopper|Quality')]
         
         if not critical_df.empty:
-            detail_counts = critical_df[target_col].value_counts().reset_index()
-            detail_counts.columns = ['장애 내용', '건수']
-            
-            fig_detail = px.bar(detail_counts, x='건수', y='장애 내용', orientation='h',
-                                text='건수', color='건수',
-                                color_continuous_scale='Reds') 
-            fig_detail.update_layout(yaxis={'categoryorder':'total ascending'})
-            st.plotly_chart(fig_detail, use_container_width=True)
+            def build_detail():
+                detail_counts = critical_df[target_col].value_counts().reset_index()
+                detail_counts.columns = ['장애 내용', '건수']
+                
+                fig_detail = px.bar(detail_counts, x='건수', y='장애 내용', orientation='h',
+                                    text='건수', color='건수',
+                                    color_continuous_scale='Reds') 
+                fig_detail.update_layout(yaxis={'categoryorder':'total ascending'})
+                return fig_detail
+            st.plotly_chart(shared_view(view, "fig_detail", build_detail), use_container_width=True)
         else:
             st.info("표시할 장애 상세 내역이 없습니다.")
 
@@ -315,25 +368,28 @@ with tab2:
     with r1_1:
         st.subheader("카테고리별 비중")
         if '카테고리' in df.columns:
-            cat_cnt = df['카테고리'].value_counts().reset_index()
-            cat_cnt.columns = ['카테고리', '건수']
-            fig_pie = px.pie(cat_cnt, values='건수', names='카테고리', hole=0.3)
-            st.plotly_chart(fig_pie, use_container_width=True)
+            def build_pie():
+                cat_cnt = df['카테고리'].value_counts().reset_index()
+                cat_cnt.columns = ['카테고리', '건수']
+                return px.pie(cat_cnt, values='건수', names='카테고리', hole=0.3)
+            st.plotly_chart(shared_view(view, "fig_pie", build_pie), use_container_width=True)
     with r1_2:
         st.subheader("요일별 접수량")
         if '요일' in df.columns:
-            order = ['월', '화', '수', '목', '금', '토', '일']
-            day_cnt = df['요일'].value_counts().reindex(order).reset_index()
-            day_cnt.columns = ['요일', '건수']
-            fig_day = px.bar(day_cnt, x='요일', y='건수', color='건수')
-            st.plotly_chart(fig_day, use_container_width=True)
+            def build_day():
+                order = ['월', '화', '수', '목', '금', '토', '일']
+                day_cnt = df['요일'].value_counts().reindex(order).reset_index()
+                day_cnt.columns = ['요일', '건수']
+                return px.bar(day_cnt, x='요일', y='건수', color='건수')
+            st.plotly_chart(shared_view(view, "fig_day", build_day), use_container_width=True)
             
     st.subheader("학년별 이슈 분포")
     if '학년' in df.columns and '카테고리' in df.columns:
-        grade_cat = df.groupby(['학년', '카테고리']).size().reset_index(name='건수')
-        grade_cat = grade_cat.sort_values('학년')
-        fig_stack = px.bar(grade_cat, x='학년', y='건수', color='카테고리', barmode='stack')
-        st.plotly_chart(fig_stack, use_container_width=True)
+        def build_stack():
+            grade_cat = df.groupby(['학년', '카테고리']).size().reset_index(name='건수')
+            grade_cat = grade_cat.sort_values('학년')
+            return px.bar(grade_cat, x='학년', y='건수', color='카테고리', barmode='stack')
+        st.plotly_chart(shared_view(view, "fig_stack", build_stack), use_container_width=True)
 
     st.divider()
     st.subheader("☁️ 문의 내용 키워드 분석 (Word Cloud)")
@@ -346,36 +402,15 @@ with tab2:
     elif '카테고리' in df.columns:
         text_data = " ".join(df['카테고리'].astype(str))
     
-    if text_data.strip():
-        # 1. [핵심] 제거할 단어 리스트 만들기 (불용어)
-        # 여기에 보기 싫은 단어를 계속 추가하시면 됩니다!
-        stop_words = {
-            "합니다", "부탁드립니다", "문의주셨습니다", "확인부탁드립니다", 
-            "안녕하세요", "감사합니다", "주셨습니다", "대해", "관련", 
-            "확인", "부탁", "드립니다", "있는", "있습니다", "하는", 
-            "문의", "내용", "건으로", "대한", "드립니다","독서화랑","충돌","이해","비판","어머니께서"
-        }
-
-        font_file = "NanumGothic.ttf"
-        if not os.path.exists(font_file):
-            url = "https://github.com/google/fonts/raw/main/ofl/nanumgothic/NanumGothic-Regular.ttf"
-            urllib.request.urlretrieve(url, font_file)
-            
+    # 워드 클라우드는 무거운 라이브러리(wordcloud)를 쓰므로 켰을 때만 생성
+    show_wc = st.toggle("☁️ 워드 클라우드 생성하기", key="show_wordcloud")
+
+    if not show_wc:
+        st.caption("토글을 켜면 문의 내용 키워드를 분석합니다.")
+    elif text_data.strip():
         try:
-            wc = WordCloud(
-                font_path=font_file,
-                width=1000, height=500,
-                background_color='white',
-                colormap='viridis',
-                max_words=100,
-                stopwords=stop_words  # <--- [핵심] 여기에 제거 리스트 적용!
-            ).generate(text_data)
-            
-            fig, ax = plt.subplots(figsize=(12, 6))
-            ax.imshow(wc, interpolation='bilinear')
-            ax.axis('off')
-            st.pyplot(fig)
-            
+            # 같은 문장 묶음이면 다른 앱 프로세스가 그려 둔 이미지도 디스크 캐시에서 꺼내 씀
+            st.image(render_wordcloud(text_data), use_container_width=True)
         except Exception as e:
             st.error(f"워드 클라우드 에러: {e}")
     else:
@@ -475,66 +510,127 @@ with tab4:
     st.subheader("🔮 향후 30일 CS 인입량 예측")
     st.markdown("과거 데이터를 학습하여 **향후 30일간의 CS 접수량**을 예측합니다.")
     
-    # 데이터 준비 (Prophet은 ds, y 컬럼이 필요함)
-    # 전체 기간 데이터를 사용해야 학습이 잘 되므로 df_raw를 사용
+    # 전체 기간 데이터를 사용해야 학습이 잘 되므로 df_raw를 사용 (접수가 없는 날은 0건으로 채움)
     if not df_raw.empty:
-        # 일별 데이터로 묶기
-        prophet_df = df_raw.groupby(df_raw['일시'].dt.date).size().reset_index(name='y')
-        prophet_df.columns = ['ds', 'y'] # Prophet 규칙: 날짜=ds, 값=y
+        series = daily_series(df_raw['일시'])
         
         # 데이터가 너무 적으면 경고
-        if len(prophet_df) < 10:
+        if len(series) < 10:
             st.warning("⚠️ 예측을 하기에는 데이터가 너무 적습니다. (최소 10일 이상 필요)")
+        elif not st.toggle("🔮 예측 실행하기", key="run_forecast"):
+            st.caption("토글을 켜면 예측 모델들을 과거 데이터로 검증(백테스트)한 뒤, 가장 효율적인 모델로 예측합니다.")
         else:
-            with st.spinner("AI가 데이터를 학습하고 있습니다... (Prophet)"):
-                # 1. 모델 생성 및 학습
-                m = Prophet()
-                m.fit(prophet_df)
-                
-                # 2. 미래 날짜 생성 (30일)
-                future = m.make_future_dataframe(periods=30)
-                
-                # 3. 예측 수행
-                forecast = m.predict(future)
-                
-                # 4. 시각화 (Plotly로 예쁘게 그리기)
-                fig_forecast = go.Figure()
-                
-                # (1) 실제 데이터 점 찍기
-                fig_forecast.add_trace(go.Scatter(
-                    x=prophet_df['ds'], y=prophet_df['y'],
-                    mode='markers', name='실제 데이터',
-                    marker=dict(color='gray', size=8)
-                ))
-                
-                # (2) 예측 선 그리기
-                fig_forecast.add_trace(go.Scatter(
-                    x=forecast['ds'], y=forecast['yhat'],
-                    mode='lines', name='예측(Trend)',
-                    line=dict(color='blue', width=2)
-                ))
-                
-                # (3) 예측 범위 (불확실성) 그리기 (투명하게)
-                fig_forecast.add_trace(go.Scatter(
-                    x=forecast['ds'].tolist() + forecast['ds'][::-1].tolist(),
-                    y=forecast['yhat_upper'].tolist() + forecast['yhat_lower'][::-1].tolist(),
-                    fill='toself',
-                    fillcolor='rgba(0,0,255,0.2)',
-                    line=dict(color='rgba(255,255,255,0)'),
-                    name='예측 범위',
-                    showlegend=False
-                ))
-                
-                st.plotly_chart(fig_forecast, use_container_width=True)
-                
-                st.info("💡 **파란 선**이 앞으로 예상되는 CS 건수입니다. (회색 점은 실제 과거 데이터)")
-                
-                # (선택) 예측 데이터 표로 보여주기
-                st.write("▼ 날짜별 예측 수치")
-                forecast_show = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].tail(30)
-                forecast_show['ds'] = forecast_show['ds'].dt.date
-                forecast_show.columns = ['날짜', '예측 건수', '최소 예상', '최대 예상']
-                st.dataframe(forecast_show)
+            import plotly.graph_objects as go
+
+            # 1. 백테스트: 최근 구간을 여러 번 잘라 맞혀보고 모델별 정확도/학습 시간 비교 (6시간 캐시)
+            with st.spinner("모델별 백테스트 중... (여러 CPU 코어에서 동시 실행)"):
+                report = run_backtest(series.index[0], tuple(series.to_numpy()))
+
+            if report.empty:
+                st.caption(f"백테스트에는 최소 {MIN_TRAIN + HORIZON}일의 데이터가 필요합니다. 기본 모델(ETS)로 예측합니다.")
+            else:
+                with st.expander("🧪 모델 백테스트 결과 (rolling-origin, 14일 예측 x 최대 6회)", expanded=False):
+                    st.dataframe(
+                        report.drop(columns=["model"]).style.format(
+                            {"MAE": "{:.2f}", "MAPE": "{:.0%}", "학습 시간(초)": "{:.3f}", "초당 정확도": "{:.1f}"}),
+                        use_container_width=True, hide_index=True,
+                    )
+                    st.caption("MAE: 하루 평균 오차(건) · MAPE: 접수 0건인 날 제외 · 초당 정확도 = (1/MAE) ÷ 학습 시간")
+
+            # 2. 모델 선택 (기본값: 초당 정확도가 가장 높은 모델)
+            model_names = report["model"].tolist() if not report.empty else available_models()
+            default = best_model(report)
+            model = st.selectbox("예측 모델", model_names, index=model_names.index(default) if default in model_names else 0,
+                                 format_func=lambda m: MODEL_LABELS[m] + (" ⭐ 추천" if m == default else ""))
+
+            with st.spinner(f"{MODEL_LABELS[model]} 모델로 예측하는 중..."):
+                forecast, fit_seconds = make_forecast(model, series.index[0], tuple(series.to_numpy()))
+
+            # 3. 시각화 (실제 데이터 점 + 예측 선 + 예측 범위)
+            fig_forecast = go.Figure()
+            
+            # (1) 실제 데이터 점 찍기 (기간이 길면 LTTB로 줄이고 WebGL로 그림)
+            actual = downsample(series.rename_axis('ds').reset_index(name='y'), 'ds', 'y')
+            fig_forecast.add_trace(scatter_class(len(actual))(
+                x=actual['ds'], y=actual['y'],
+                mode='markers', name='실제 데이터',
+                marker=dict(color='gray', size=8)
+            ))
+            
+            # (2) 예측 선 그리기
+            fig_forecast.add_trace(go.Scatter(
+                x=forecast['ds'], y=forecast['yhat'],
+                mode='lines', name=f'예측 ({MODEL_LABELS[model]})',
+                line=dict(color='blue', width=2)
+            ))
+            
+            # (3) 예측 범위 (불확실성) 그리기 (투명하게) - numpy로 위/아래 선을 이어 붙임
+            band_x, band_y = band_xy(forecast['ds'], forecast['yhat_upper'], forecast['yhat_lower'])
+            fig_forecast.add_trace(go.Scatter(
+                x=band_x, y=band_y,
+                fill='toself',
+                fillcolor='rgba(0,0,255,0.2)',
+                line=dict(color='rgba(255,255,255,0)'),
+                name='예측 범위',
+                showlegend=False
+            ))
+            
+            st.plotly_chart(fig_forecast, use_container_width=True)
+            st.caption(size_caption(fig_forecast) + f" · 학습+예측 {fit_seconds:.2f}초")
+            
+            st.info("💡 **파란 선**이 앞으로 예상되는 CS 건수입니다. (회색 점은 실제 과거 데이터, 음영은 80% 예측 범위)")
+            
+            # (선택) 예측 데이터 표로 보여주기
+            st.write("▼ 날짜별 예측 수치")
+            forecast_show = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].copy()
+            forecast_show['ds'] = forecast_show['ds'].dt.date
+            forecast_show.columns = ['날짜', '예측 건수', '최소 예상', '최대 예상']
+            st.dataframe(forecast_show.round(1))
+            export_menu(forecast_show.round(1), f"CS_예측_{model}", "forecast_export",
+                        token=view[:2], filters=model)
+
+            # 4. 카테고리 / 협업 부서별 일괄 예측 (시리즈마다 프로세스 풀에서 동시에 학습)
+            st.divider()
+            st.subheader("📊 카테고리 / 부서별 예측")
+            group_options = [c for c in ['카테고리', '협업 부서'] if c in df_raw.columns]
+            if not group_options:
+                st.info("'카테고리' 또는 '협업 부서' 컬럼이 없어 나눠서 예측할 수 없습니다.")
+            else:
+                g1, g2 = st.columns([2, 1])
+                group_col = g1.radio("나눌 기준", group_options, horizontal=True, key="forecast_group")
+                top_n = g2.number_input("상위 몇 개까지", min_value=1, max_value=MAX_GROUP_SERIES, value=12, key="forecast_top")
+                groups = split_series(df_raw, group_col, series.index, top=int(top_n))
+
+                with st.spinner(f"{len(groups)}개 시리즈를 {MODEL_LABELS[model]} 모델로 예측하는 중... (바뀐 시리즈만 새로 학습)"):
+                    group_forecasts, batch = forecast_many(groups, model, horizon=30)
+                st.caption(f"새로 학습 {batch['fitted']}개 · 캐시 사용 {batch['cached']}개 · {batch['seconds']:.1f}초")
+                for name, error in batch["failed"].items():
+                    st.warning(f"'{name}' 예측 실패: {error}")
+
+                # 작은 그래프 여러 개 (최근 8주 실제 + 30일 예측)
+                recent_start = series.index[-1] - pd.Timedelta(days=55)
+                frames = []
+                for name, fc in group_forecasts.items():
+                    hist = groups[name][groups[name].index >= recent_start]
+                    frames.append(pd.DataFrame({group_col: name, '날짜': hist.index, '건수': hist.to_numpy(), '구분': '실제'}))
+                    frames.append(pd.DataFrame({group_col: name, '날짜': fc['ds'], '건수': fc['yhat'].to_numpy(), '구분': '예측'}))
+                if frames:
+                    small = pd.concat(frames, ignore_index=True)
+                    rows = -(-len(group_forecasts) // 4)
+                    fig_small = px.line(small, x='날짜', y='건수', color='구분', facet_col=group_col, facet_col_wrap=4,
+                                        color_discrete_map={'실제': 'gray', '예측': 'blue'}, height=220 * rows,
+                                        facet_row_spacing=min(0.08, 0.5 / max(rows - 1, 1)))
+                    fig_small.update_yaxes(matches=None, showticklabels=True)
+                    fig_small.for_each_annotation(lambda a: a.update(text=a.text.split("=", 1)[-1]))
+                    st.plotly_chart(fig_small, use_container_width=True)
+
+                    table = pd.concat(
+                        [fc.assign(**{group_col: name}) for name, fc in group_forecasts.items()], ignore_index=True)
+                    table = table[[group_col, 'ds', 'yhat', 'yhat_lower', 'yhat_upper']].round(1)
+                    table['ds'] = table['ds'].dt.date
+                    table.columns = [group_col, '날짜', '예측 건수', '최소 예상', '최대 예상']
+                    export_menu(table, f"CS_{group_col}별_예측", "group_forecast_export",
+                                token=view[:2], filters=(group_col, int(top_n), model))
 
 # 탭 5: 원본 데이터
 # with tab5:
@@ -550,13 +646,15 @@ with tab5:
     st.markdown("띄어쓰기와 상관없이 핵심 단어를 검색합니다. (예: '지성의 별'과 '지성의별' 모두 검색)")
 
     # 1. 사용자가 직접 키워드를 추가할 수 있도록 입력창 제공
-    # 기본값으로 '완독'과 '지성의별'을 설정
-    user_keywords = st.text_input("분석하고 싶은 키워드들을 쉼표(,)로 구분해서 입력하세요", "완독, 지성의별")
+    # 기본값으로 '완독'과 '지성의별'을 설정 (주소의 ?kw= 값이 있으면 그 값으로 시작)
+    init_state("cs_keywords", get_param("kw", DEFAULT_KEYWORDS))
+    user_keywords = st.text_input("분석하고 싶은 키워드들을 쉼표(,)로 구분해서 입력하세요", key="cs_keywords")
     target_keywords = [kw.strip() for kw in user_keywords.split(",") if kw.strip()]
+    write_params({"kw": None if user_keywords == DEFAULT_KEYWORDS else ",".join(target_keywords)})
 
     content_col = '문의 내용' if '문의 내용' in df.columns else '문의내용'
 
-    if content_col in df.columns:
+    def search_keywords():
         keyword_data = []
         for kw in target_keywords:
             # [핵심] 띄어쓰기 무시 로직 (Regex 사용)
@@ -568,6 +666,11 @@ with tab5:
             filtered_df = df[df[content_col].str.contains(regex_pattern, na=False, case=False, regex=True)]
             
             keyword_data.append({"키워드": kw, "건수": len(filtered_df), "데이터": filtered_df})
+        return keyword_data
+
+    if content_col in df.columns:
+        # 같은 보기 + 같은 키워드 목록이면 검색 결과도 공용 캐시에서
+        keyword_data = shared_view(view, ("keywords", tuple(target_keywords)), search_keywords)
 
         # 2. 요약 지표 (상단 카드)
         kpi_cols = st.columns(len(keyword_data))
@@ -591,8 +694,46 @@ with tab5:
                 show_cols = ['일시', content_col, '카테고리', '처리 상태']
                 avail = [c for c in show_cols if c in display_kw_df.columns]
                 
-                st.dataframe(display_kw_df[avail].sort_values('일시', ascending=False), use_container_width=True)
+                data_grid(display_kw_df[avail], key="kw_grid", token=(view, "keywords", selected_kw),
+                          sort_by='일시', ascending=False,
+                          export_name=f"CS_키워드_{selected_kw}")
             else:
                 st.info(f"'{selected_kw}'와(과) 관련된 문의가 없습니다.")
     else:
-        st.error("데이터에서 문의 내용 컬럼을 찾을 수 없습니다.")
\ No newline at end of file
+        st.error("데이터에서 문의 내용 컬럼을 찾을 수 없습니다.")
+
+# 탭 6: 처리 시간 / SLA (영업일 기준)
+with tab6:
+    st.subheader("⏱️ 처리 시간 & SLA 분석")
+    st.caption(f"접수일부터 처리일까지 주말·공휴일을 뺀 영업일 기준입니다. 목표 처리 기한: {SLA_DAYS}영업일")
+
+    overall = sla['overall']
+    s1, s2, s3, s4 = st.columns(4)
+    s1.metric("처리 완료", f"{overall['closed']}건")
+    s2.metric("중앙값 / p90", "-" if overall['p50'] is None else f"{overall['p50']:.0f} / {overall['p90']:.0f}영업일")
+    s3.metric("SLA 준수율", "-" if overall['sla_rate'] is None else f"{overall['sla_rate']:.0%}")
+    s4.metric(f"{AGING_THRESHOLDS[0]}영업일 넘은 미처리", f"{len(sla['aging'])}건", delta_color="inverse")
+
+    st.markdown("##### 📋 기준별 처리 시간 분위수 (영업일)")
+    groups_df = sla['groups']
+    if groups_df.empty:
+        st.info("처리일이 입력된 데이터가 없어 처리 시간을 계산할 수 없습니다.")
+    else:
+        basis = st.radio("기준", groups_df['기준'].unique().tolist(), horizontal=True, key="sla_basis")
+        basis_df = groups_df[groups_df['기준'] == basis].drop(columns=['기준']).rename(columns={'값': basis})
+        st.dataframe(
+            basis_df, use_container_width=True, hide_index=True,
+            column_config={"SLA 준수율": st.column_config.ProgressColumn("SLA 준수율", min_value=0.0, max_value=1.0, format="percent")},
+        )
+        export_menu(basis_df, f"CS_처리시간_{basis}", "sla_groups_export", token=view, filters=basis)
+
+    st.markdown("##### 🚨 오래된 미처리 건")
+    aging_df = sla['aging']
+    if aging_df.empty:
+        st.success(f"{AGING_THRESHOLDS[0]}영업일 넘게 밀린 미처리 건이 없습니다.")
+    else:
+        st.write(" · ".join(f"**{label}** {count}건" for label, count in overall['aging'].items()))
+        aging_content = '문의 내용' if '문의 내용' in aging_df.columns else '문의내용'
+        aging_cols = [c for c in ['경과 구간', '경과 영업일', '일시', '카테고리', '협업 부서', '처리 상태', aging_content] if c in aging_df.columns]
+        data_grid(aging_df[aging_cols], key="sla_aging_grid", token=(view, "aging", datetime.date.today()), sort_by='경과 영업일', ascending=False,
+                  export_name="CS_오래된_미처리")
@@ -1,9 +1,11 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import datetime
+from utils.charts import FREQ_OPTIONS, aggregate_counts, downsample, render_mode, size_caption
+from utils.data_grid import INDEX_LABEL, data_grid
+from utils.data_sources import data_version, load_signup_data
+from utils.export import export_menu, frame_token
 
 # ==========================================
 # [설정] 페이지 설정
@@ -12,12 +14,6 @@ st.set_page_config(page_title="회원 가입 분석", page_icon="📈", layout="
 
 st.title("📈 독서화랑 회원 가입 분석")
 
-# -------------------------------------------------------------------
-# [설정] 구글 시트 주소
-# -------------------------------------------------------------------
-NEW_SHEET_URL = "https://docs.google.com/spreadsheets/d/1gQ9kS_gVrcvDFA7cZEy6Ch5pSxRSbSwUaPX-ZwVUVV0/edit?usp=sharing"
-# -------------------------------------------------------------------
-
 # ==========================================
 # [설정] 고정값 (재원생 수 & 기존 가입자 수)
 # ==========================================
@@ -53,60 +49,10 @@ MY_COLORS = ['#F2C744', '#88A61C','#6BBEF2', '#BF2604', '#D9A59A', '#260101']
 # ==========================================
 # [함수] 데이터 로드
 # ==========================================
-@st.cache_data(ttl=60)
+# 시트 읽기/전처리와 캐시는 utils.data_sources 에 있어 랜딩 페이지 요약 카드와 캐시를 함께 씁니다.
 def load_data():
     try:
-        # 1. 인증 정보 설정 (파일 없이 secrets만 사용)
-        scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-        
-        # 이전의 from_json_keyfile_name 부분은 완전히 지우고 아래 내용만 남깁니다.
-        creds_dict = dict(st.secrets["gcp_service_account"])
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-        
-        client = gspread.authorize(creds)
-        
-        # 2. 시트 연결 및 데이터 로드
-        sh = client.open_by_url(NEW_SHEET_URL)
-        worksheet = sh.worksheet('가입자_RAW_DATA(신규)')        
-        
-        data = worksheet.get_all_values()
-
-        
-        if len(data) < 2:
-            return pd.DataFrame()
-            
-        header = data[0]
-        rows = data[1:]
-        
-        # 중복 컬럼명 해결
-        seen_count = {}
-        new_header = []
-        for col_name in header:
-            if col_name in seen_count:
-                seen_count[col_name] += 1
-                new_header.append(f"{col_name}_{seen_count[col_name]}")
-            else:
-                seen_count[col_name] = 0
-                new_header.append(col_name)
-        
-        df = pd.DataFrame(rows, columns=new_header)
-        
-        # 전처리
-        if '가입일' in df.columns:
-            df['가입일'] = pd.to_datetime(df['가입일'], errors='coerce')
-        
-        if '소속' in df.columns:
-            df['소속'] = df['소속'].astype(str).str.strip()
-            df['소속'] = df['소속'].replace({
-                '대치': '대치점', '잠실': '잠실점', '서초': '서초점', '분당': '분당점'
-            })
-            df = df[~df['소속'].isin(['x', 'X'])]
-            
-        if '학년' in df.columns:
-            df['학년'] = df['학년'].astype(str).str.strip()
-
-        return df
-
+        return load_signup_data()
     except Exception as e:
         st.error(f"데이터 로드 중 오류 발생: {e}")
         return None
@@ -165,9 +111,10 @@ with tab1:
             ten_days_ago = pd.Timestamp.now() - pd.Timedelta(days=30)
             recent_df = df[df['가입일'] >= ten_days_ago]
             if not recent_df.empty:
-                daily_counts = recent_df.groupby(recent_df['가입일'].dt.date).size().reset_index(name='가입자수')
-                daily_counts.columns = ['날짜', '가입자수']
-                fig_trend = px.line(daily_counts, x='날짜', y='가입자수', markers=True, text='가입자수', template=THEME_TEMPLATE)
+                daily_counts, freq = aggregate_counts(recent_df['가입일'], y_name='가입자수')
+                daily_counts = downsample(daily_counts, '날짜', '가입자수')
+                fig_trend = px.line(daily_counts, x='날짜', y='가입자수', markers=True, text='가입자수', template=THEME_TEMPLATE,
+                                    render_mode=render_mode(len(daily_counts)))
                 fig_trend.update_traces(line_color='#FF4B4B', textposition="bottom center")
 
                 fig_trend.update_layout(
@@ -183,6 +130,7 @@ with tab1:
                 fig_trend.update_xaxes(rangeslider_visible=True)
 
                 st.plotly_chart(fig_trend, use_container_width=True)
+                st.caption(size_caption(fig_trend, freq))
     
     with col_right:
         st.subheader("🏢 소속별 가입자 분포")
@@ -224,18 +172,26 @@ with tab2:
             summary_df = pd.DataFrame(summary_data, index=['비중', '가입자 수'])
             summary_df['합계'] = ['100%', f"{total_filtered:,}"]
             st.dataframe(summary_df, use_container_width=True)
+            export_menu(summary_df, "지점별_가입_비중", "summary_export",
+                        token=frame_token(summary_df), index=True)
             
             st.divider()
 
             # 2. 지점별 꺾은선
             st.markdown("##### 2️⃣ 지점별 신규 가입 추이")
-            daily_branch_trend = filtered_df.groupby([filtered_df['가입일'].dt.date, '소속']).size().reset_index(name='가입자수')
-            daily_branch_trend.columns = ['날짜', '소속', '가입자수']
+            # 기간이 길어지면 주/월 단위로 묶고, 지점별 선마다 점 수를 제한 (utils.charts)
+            branch_freq_label = st.radio("집계 단위", list(FREQ_OPTIONS), horizontal=True, key="branch_freq")
+            daily_branch_trend, freq = aggregate_counts(filtered_df['가입일'], FREQ_OPTIONS[branch_freq_label],
+                                                        by=filtered_df['소속'], y_name='가입자수')
+            daily_branch_trend = downsample(daily_branch_trend, '날짜', '가입자수', by='소속')
+            title_unit = {"D": "매일", "W-MON": "주별", "MS": "월별"}[freq]
             fig_line_branch = px.line(daily_branch_trend, x='날짜', y='가입자수', color='소속', markers=True,
-                                      title="매일 신규 가입자 수 (지점별 비교)", template=THEME_TEMPLATE, color_discrete_sequence=MY_COLORS)
+                                      title=f"{title_unit} 신규 가입자 수 (지점별 비교)", template=THEME_TEMPLATE, color_discrete_sequence=MY_COLORS,
+                                      render_mode=render_mode(len(daily_branch_trend)))
             fig_line_branch.update_traces(marker_size=8, line_width=2)
             
             st.plotly_chart(fig_line_branch, use_container_width=True)
+            st.caption(size_caption(fig_line_branch, freq))
             
             st.divider()
 
@@ -260,7 +216,8 @@ with tab2:
             
             final_columns = ['요일'] + target_order + ['일일 합계', '누적 합계']
             pivot_df = pivot_df[final_columns]
-            st.dataframe(pivot_df, use_container_width=True, height=500)
+            data_grid(pivot_df, key="pivot_grid", token=(data_version(df), "pivot"), sort_by=INDEX_LABEL, ascending=True, show_index=True,
+                      export_name="일별_가입_집계표")
     else:
         st.error("필요한 컬럼이 부족합니다.")
 
@@ -390,20 +347,9 @@ with tab3:
         st.markdown("##### 2️⃣ 일별 누적 상세표 (초1~5 한정)")
 
         # 표를 보기 좋게 날짜 내림차순(최신순)으로 정렬하여 표시
-        display_table_sorted = display_table.sort_index(ascending=False)
-        st.dataframe(display_table_sorted, use_container_width=True, height=500)
-
-        # 엑셀(CSV) 다운로드 기능
-        # 한국어 깨짐 방지를 위해 utf-8-sig 인코딩 사용
-        csv = display_table_sorted.to_csv().encode('utf-8-sig')
-
-        st.download_button(
-            label="💾 상세표 엑셀 다운로드 (비교용)",
-            data=csv,
-            file_name=f"초등_참여율_상세현황_{pd.Timestamp.now().strftime('%m%d_%H%M')}.csv",
-            mime="text/csv",
-            help="다운로드한 파일을 엑셀에서 열어 수치를 비교해보세요."
-        )
+        # 다운로드(CSV/엑셀/Parquet)는 표 아래 '내보내기' 메뉴에서, 누를 때만 파일을 만듭니다.
+        data_grid(display_table, key="ratio_grid", token=(data_version(df), "ratio"), sort_by=INDEX_LABEL, ascending=False, show_index=True,
+                  export_name="초등_참여율_상세현황")
 
 
 # --- 탭 4: 원본 데이터 ---
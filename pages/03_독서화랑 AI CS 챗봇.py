@@ -2,7 +2,13 @@ import streamlit as st
 import os
 import pandas as pd
 import datetime
-import google.generativeai as genai
+from utils.chat_memory import RENDER_WINDOW, new_memory
+from utils.chatbot import PromptCache, answer_question
+from utils.knowledge_store import FILES, KnowledgeError, get_store
+from utils.data_grid import data_grid
+from utils.export import export_menu
+from utils import chat_log_analytics as log_analytics
+from utils.llm_backend import resolve_mode, get_backend
 
 # ==========================================
 # [설정] 0. 페이지 설정
@@ -10,101 +16,72 @@ import google.generativeai as genai
 st.set_page_config(page_title="독서화랑 AI 챗봇", page_icon="🤖", layout="wide")
 
 # ==========================================
-# [설정] 1. API 키 설정
+# [설정] 1. 모델 백엔드 설정
 # ==========================================
-MY_API_KEY = st.secrets["gemini_api_key"]
+# CHATBOT_LLM_MODE=live|record|replay|fake (기본 live). replay/fake는 API 키 없이 동작합니다.
+LLM_MODE = resolve_mode()
 
-if MY_API_KEY == "여기에_API_키를_붙여넣으세요" or not MY_API_KEY:
-    st.error("🚨 API 키가 설정되지 않았습니다.")
-    st.stop()
+if LLM_MODE in ("live", "record"):
+    MY_API_KEY = st.secrets["gemini_api_key"]
+
+    if MY_API_KEY == "여기에_API_키를_붙여넣으세요" or not MY_API_KEY:
+        st.error("🚨 API 키가 설정되지 않았습니다.")
+        st.stop()
 else:
-    genai.configure(api_key=MY_API_KEY.strip())
+    MY_API_KEY = None
+
+@st.cache_resource
+def load_backend(mode, api_key):
+    return get_backend(mode, api_key)
+
+# 페르소나+정책(고정 접두부)은 지식 버전마다 한 번만 모델 측 캐시에 등록 (프로세스 공용, 모드별 캐시 이름)
+@st.cache_resource
+def load_prompt_cache(mode):
+    return PromptCache(prefix=f"dsh-kb-{mode}")
+
+backend = load_backend(LLM_MODE, MY_API_KEY)
+prompt_cache = load_prompt_cache(LLM_MODE)
 
 # ==========================================
 # [설정] 2. 파일 경로 설정
 # ==========================================
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# 지식 데이터 파일들
-FILES = {
-    "policy": {"path": os.path.join(CURRENT_DIR, "policy.md"), "name": "운영 정책", "type": "md"},
-    "faq": {"path": os.path.join(CURRENT_DIR, "faq.csv"), "name": "FAQ DB", "type": "csv"},
-    "persona": {"path": os.path.join(CURRENT_DIR, "persona.txt"), "name": "페르소나", "type": "txt"}
-}
+# 지식 데이터 파일들은 버전별 스냅샷(pages/kb_snapshots)으로 관리합니다. (utils.knowledge_store)
+kb_store = get_store()
 
 # [NEW] 로그 저장용 DB 파일 경로 (서버 저장소)
 DB_PATH = os.path.join(CURRENT_DIR, "chat_history_db.csv")
 
-# ==========================================
-# [함수] 백엔드 로직
-# ==========================================
-def save_file(uploaded_file, path):
-    try:
-        with open(path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        return True
-    except Exception as e:
-        st.error(f"저장 실패: {e}")
-        return False
-
-def get_file_info(path):
-    if os.path.exists(path):
-        return datetime.datetime.fromtimestamp(os.path.getmtime(path)).strftime('%Y-%m-%d %H:%M')
-    return None 
-
-def create_rag_prompt():
-    persona = "당신은 '독서화랑'의 친절한 AI 상담원입니다."
-    if os.path.exists(FILES['persona']['path']):
-        with open(FILES['persona']['path'], "r", encoding="utf-8") as f:
-            persona = f.read()
-    
-    knowledge = ""
-    if os.path.exists(FILES['policy']['path']):
-        with open(FILES['policy']['path'], "r", encoding="utf-8") as f:
-            knowledge += f"\n[운영 정책]\n{f.read()}\n"
-    
-    if os.path.exists(FILES['faq']['path']):
-        try:
-            try:
-                df = pd.read_csv(FILES['faq']['path'], encoding='utf-8')
-            except UnicodeDecodeError:
-                df = pd.read_csv(FILES['faq']['path'], encoding='cp949')
-            q_col = next((c for c in df.columns if any(k in c for k in ['질문', 'Q'])), None)
-            a_col = next((c for c in df.columns if any(k in c for k in ['답변', 'A'])), None)
-            if q_col and a_col:
-                faq_text = "\n".join([f"Q: {row[q_col]} / A: {row[a_col]}" for _, row in df.iterrows()])
-                knowledge += f"\n[FAQ 데이터베이스]\n{faq_text}\n"
-        except:
-            pass 
-
-    return f"""
-    {persona}
-    [참고 지식 데이터]
-    {knowledge}
-    [지시사항]
-    1. 위 지식 데이터를 기반으로 답변하세요.
-    2. 지식에 없는 내용은 "죄송합니다, 상담원 연결이 필요합니다."라고 답하세요.
-    """
-
 # ==========================================
 # [UI] 화면 구성
 # ==========================================
 st.title("🤖 독서화랑 AI CS 챗봇")
 st.markdown("RAG(검색 증강 생성) 기술을 적용하여 **운영 정책**과 **FAQ**를 기반으로 답변합니다.")
+if LLM_MODE != "live":
+    st.caption(f"🧪 모델 백엔드: `{LLM_MODE}` 모드로 동작 중입니다.")
 
-tab1, tab2, tab3 = st.tabs(["💬 채팅 상담", "⚙️ 관리자 설정", "📂 상담 내역 (Server DB)"])
+tab1, tab2, tab3, tab4 = st.tabs(["💬 채팅 상담", "⚙️ 관리자 설정", "📂 상담 내역 (Server DB)", "📊 상담 로그 분석"])
 
 # --- 탭 1: 채팅 인터페이스 ---
 with tab1:
     if "messages" not in st.session_state:
         st.session_state.messages = []
+    if "chat_memory" not in st.session_state:
+        st.session_state.chat_memory = new_memory()
 
-    for msg in st.session_state.messages:
+    # 긴 세션에서도 가볍게: 최근 RENDER_WINDOW개 메시지만 다시 그립니다.
+    hidden_count = max(0, len(st.session_state.messages) - RENDER_WINDOW)
+    if hidden_count:
+        st.caption(f"이전 대화 {hidden_count}건은 화면에서 접어두었습니다. (전체 내역은 '상담 내역' 탭에서 저장/조회)")
+
+    for msg in st.session_state.messages[-RENDER_WINDOW:]:
         with st.chat_message(msg["role"]):
             st.write(msg["content"])
 
     if user_input := st.chat_input("문의사항을 입력해주세요..."):
         now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        history = list(st.session_state.messages)  # 이번 질문 이전까지의 대화
         st.session_state.messages.append({"role": "user", "content": user_input, "timestamp": now})
         
         with st.chat_message("user"):
@@ -113,13 +90,12 @@ with tab1:
         with st.chat_message("assistant"):
             with st.spinner("생각 중..."):
                 try:
-                    system_prompt = create_rag_prompt()
-                    model = genai.GenerativeModel('gemini-2.5-flash') 
-                    response = model.generate_content(f"{system_prompt}\n\n사용자 질문: {user_input}")
+                    # 오래된 대화는 누적 요약으로 접고, 최근 대화만 원문으로 함께 보냅니다.
+                    answer, _ = answer_question(backend, st.session_state.chat_memory, history, user_input, prompt_cache)
                     
-                    st.write(response.text)
+                    st.write(answer)
                     now_ai = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    st.session_state.messages.append({"role": "assistant", "content": response.text, "timestamp": now_ai})
+                    st.session_state.messages.append({"role": "assistant", "content": answer, "timestamp": now_ai})
                     
                 except Exception as e:
                     st.error(f"오류: {e}")
@@ -127,15 +103,23 @@ with tab1:
 # --- 탭 2: 관리자 설정 ---
 with tab2:
     st.header("⚙️ 지식 데이터 관리")
-    st.markdown("학습용 파일을 관리합니다.")
+    st.markdown("학습용 파일을 관리합니다. 업로드한 파일은 **검증 → 백그라운드 컴파일 → 새 버전으로 교체** 순서로 반영되며, 진행 중인 상담은 기존 버전으로 끝까지 답변합니다.")
+
+    try:
+        active = kb_store.active()
+    except KnowledgeError as e:
+        st.error(f"❌ {e}")
+        st.stop()
+    st.info(f"📦 현재 적용 버전: **{active.version}** ({active.manifest['created_at']}) · "
+            f"FAQ {active.manifest['faq_count']}건 · 정책 섹션 {active.manifest['policy_chunks']}개")
     st.divider()
+
     col1, col2, col3 = st.columns(3)
     for i, (key, info) in enumerate(FILES.items()):
         with [col1, col2, col3][i]:
-            last_modified = get_file_info(info['path'])
-            if last_modified:
+            if os.path.exists(active.path(key)):
                 st.success(f"✅ **{info['name']}**")
-                st.caption(f"반영 중 ({last_modified})")
+                st.caption(f"반영 중 ({active.version})")
             else:
                 st.error(f"❌ **{info['name']}**")
                 st.caption("⚠️ 파일 없음")
@@ -146,10 +130,41 @@ with tab2:
 
             uploaded = st.file_uploader(f"{info['name']} 선택", type=info['type'], key=unique_key)
             if uploaded:
-                if save_file(uploaded, info['path']):
+                try:
+                    kb_store.submit_upload(key, uploaded.getvalue())
                     st.session_state[f"uploader_key_{key}"] += 1
-                    st.toast(f"{info['name']} 업로드 성공!", icon="🎉")
+                    st.toast(f"{info['name']} 검증 완료! 새 버전을 준비하고 있습니다.", icon="🎉")
                     st.rerun()
+                except KnowledgeError as e:
+                    st.error(f"업로드 거부: {e}")
+
+    # 백그라운드 컴파일 진행 상황
+    jobs = kb_store.recent_jobs(5)
+    if jobs:
+        st.divider()
+        st.markdown("##### 🛠️ 최근 반영 작업")
+        for job in reversed(jobs):
+            icon = {"building": "⏳", "done": "✅", "failed": "❌"}[job["status"]]
+            st.caption(f"{icon} {FILES[job['key']]['name']} - {job['message']}")
+        if any(job["status"] == "building" for job in jobs):
+            st.button("🔄 진행 상황 새로고침")
+
+    # 버전 이력 및 롤백
+    st.divider()
+    st.markdown("##### 🗂️ 버전 이력")
+    prev_version = kb_store.previous_version()
+    if prev_version and st.button(f"↩️ 이전 버전({prev_version})으로 롤백", type="primary"):
+        kb_store.activate(prev_version)
+        st.toast(f"{prev_version}으로 되돌렸습니다.", icon="↩️")
+        st.rerun()
+
+    for manifest in kb_store.manifests():
+        c_info, c_btn = st.columns([4, 1])
+        is_active = manifest["version"] == active.version
+        c_info.markdown(f"{'🟢' if is_active else '⚪'} **{manifest['version']}** · {manifest['created_at']} · {manifest['note']}")
+        if not is_active and c_btn.button("이 버전 적용", key=f"activate_{manifest['version']}"):
+            kb_store.activate(manifest["version"])
+            st.rerun()
 
 # --- 탭 3: 상담 내역 (DB 자동 연동) ---
 with tab3:
@@ -197,7 +212,9 @@ with tab3:
                     # 최신순 정렬 (선택사항)
                     # display_df = display_df.sort_index(ascending=False)
                     
-                    st.dataframe(display_df, use_container_width=True, height=500)
+                    # 전체 로그는 서버에 두고 보고 있는 페이지만 전송 (파일 수정 시각으로 검색/정렬 결과 캐시)
+                    data_grid(display_df, key="chat_history_grid", token=os.path.getmtime(DB_PATH),
+                              export_name="상담_내역")
                     
                     # (보너스) DB 파일 통째로 다운로드
                     with open(DB_PATH, "rb") as f:
@@ -212,4 +229,57 @@ with tab3:
             except Exception as e:
                 st.error(f"DB 읽기 오류: {e}")
         else:
-            st.info("아직 저장된 상담 내역(DB)이 없습니다. 왼쪽의 '저장하기' 버튼을 눌러보세요!")
\ No newline at end of file
+            st.info("아직 저장된 상담 내역(DB)이 없습니다. 왼쪽의 '저장하기' 버튼을 눌러보세요!")
+
+# --- 탭 4: 상담 로그 분석 (증분 배치) ---
+with tab4:
+    st.header("📊 상담 로그 분석")
+    st.markdown("지난 분석 이후 **새로 추가된 메시지만** 읽어 FAQ 카테고리를 태깅하고, "
+                f"`{log_analytics.GAP_PHRASE}` 답변을 **지식 공백**으로 집계합니다. (LLM 호출 없음)")
+
+    col_run, col_meta = st.columns([1, 3])
+    with col_run:
+        run_clicked = st.button("🔄 증분 분석 실행")
+    if run_clicked or log_analytics.is_stale(DB_PATH):
+        with st.spinner("새로 추가된 상담 로그를 분석하는 중..."):
+            log_state, new_rows = log_analytics.run_batch(DB_PATH, only_if_stale=not run_clicked)
+        if run_clicked:
+            st.toast(f"새 메시지 {new_rows}건을 반영했습니다.", icon="✅")
+    else:
+        log_state = log_analytics.load_state()
+
+    with col_meta:
+        st.caption(f"마지막 분석: {log_state['updated_at'] or '-'} · 누적 메시지 {log_state['messages']:,}건")
+
+    daily_df = log_analytics.daily_summary(log_state)
+    if daily_df.empty:
+        st.info("아직 분석할 상담 로그가 없습니다.")
+    else:
+        total_q = int(daily_df["질문 수"].sum())
+        total_gap = int(daily_df["지식 공백"].sum())
+        k1, k2, k3 = st.columns(3)
+        k1.metric("누적 질문", f"{total_q:,}건")
+        k2.metric("지식 공백", f"{total_gap:,}건")
+        k3.metric("공백률", f"{(total_gap / total_q * 100 if total_q else 0):.1f}%")
+
+        st.markdown("##### 📅 일별 질문량 및 공백률")
+        st.bar_chart(daily_df.set_index("날짜")[["질문 수", "지식 공백"]])
+        daily_table = daily_df.sort_values("날짜", ascending=False)
+        st.dataframe(daily_table, use_container_width=True, hide_index=True)
+        # 분석 상태가 갱신될 때만 내보내기 파일을 새로 만듦 (updated_at 을 데이터 버전으로 사용)
+        export_menu(daily_table, "상담_일별_요약", "daily_export", token=log_state["updated_at"])
+
+        st.markdown("##### 🏷️ FAQ 카테고리별 분포")
+        category_df = log_analytics.category_summary(log_state)
+        st.dataframe(category_df, use_container_width=True, hide_index=True)
+        export_menu(category_df, "상담_카테고리별_분포", "category_export", token=log_state["updated_at"])
+
+        st.markdown("##### 🕳️ 최근 지식 공백 질문 (FAQ/정책 보강 후보)")
+        gap_df = log_analytics.load_gap_questions()
+        if gap_df.empty:
+            st.success("지식 공백으로 분류된 질문이 없습니다.")
+        else:
+            gap_table = gap_df[["timestamp", "category", "question"]].rename(
+                columns={"timestamp": "일시", "category": "추정 카테고리", "question": "질문"})
+            st.dataframe(gap_table, use_container_width=True, hide_index=True)
+            export_menu(gap_table, "지식_공백_질문", "gap_export", token=log_state["updated_at"])
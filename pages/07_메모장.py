@@ -1,11 +1,18 @@
 import streamlit as st
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 from datetime import datetime
-import pandas as pd
+from utils.rca_notes import get_note_store
+from utils.note_search import NoteSearchIndex, highlight_snippet
+
+# [설정] 히스토리 한 페이지에 보여줄 노트 수
+PAGE_SIZE = 10
 
 st.set_page_config(page_title="CS 논리 분석", page_icon="🧠", layout="wide")
 
+# 검색 색인은 프로세스 전체에서 하나를 두고, 노트가 바뀔 때만 증분 갱신
+@st.cache_resource
+def get_search_index():
+    return NoteSearchIndex()
+
 st.title("🧠 CS 논리/원인 분석실 (RCA)")
 st.caption("현상(Data) 뒤에 숨겨진 원인(Logic)을 파헤쳐서 기록하는 공간입니다.")
 
@@ -33,31 +40,17 @@ with st.expander("📝 새로운 분석 기록하기", expanded=True):
         submit_btn = st.form_submit_button("💾 분석 노트 저장")
 
 # -------------------------------------------------------------------
-# [2] 저장 로직 (구글 시트 'CS_논리노트' 탭에 저장)
+# [2] 저장 로직 (로컬 outbox에 먼저 기록 -> 백그라운드에서 'CS_논리노트' 탭으로 전송)
 # -------------------------------------------------------------------
+store = get_note_store()
+
 if submit_btn:
     if not topic or not logic_content:
         st.warning("주제와 분석 내용은 필수입니다!")
     else:
         try:
-            scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-            creds = ServiceAccountCredentials.from_json_keyfile_name('service-account.json', scope)
-            client = gspread.authorize(creds)
-            
-            sh = client.open_by_url("https://docs.google.com/spreadsheets/d/1MQVn2jcKiHagQqUyyHR3ew9BLhD520Cv3UTwVMo5_6g/edit?usp=sharing")
-            
-            # 'CS_논리노트' 시트가 없으면 생성
-            try:
-                worksheet = sh.worksheet("CS_논리노트")
-            except:
-                worksheet = sh.add_worksheet(title="CS_논리노트", rows="100", cols="5")
-                worksheet.append_row(["작성일", "주제", "카테고리", "논리분석내용", "결론(Action)"])
-            
-            # 데이터 저장
-            worksheet.append_row([date_now, topic, category, logic_content, conclusion])
-            st.success("✅ 논리적인 분석이 자산으로 저장되었습니다!")
-            st.rerun() # 저장 후 바로 아래 리스트에 뜨게 새로고침
-            
+            store.submit([date_now, topic, category, logic_content, conclusion])
+            st.success("✅ 논리적인 분석이 자산으로 저장되었습니다! (시트에는 잠시 후 자동 반영)")
         except Exception as e:
             st.error(f"저장 실패: {e}")
 
@@ -68,30 +61,51 @@ st.divider()
 st.subheader("📚 우리의 분석 히스토리")
 
 try:
-    scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-    creds = ServiceAccountCredentials.from_json_keyfile_name('service-account.json', scope)
-    client = gspread.authorize(creds)
-    sh = client.open_by_url("https://docs.google.com/spreadsheets/d/1MQVn2jcKiHagQqUyyHR3ew9BLhD520Cv3UTwVMo5_6g/edit?usp=sharing")
-    worksheet = sh.worksheet("CS_논리노트")
-    
-    data = worksheet.get_all_records()
-    df_logic = pd.DataFrame(data)
-    
-    if not df_logic.empty:
-        # 최신순 정렬
-        df_logic = df_logic.sort_index(ascending=False)
-        
-        for index, row in df_logic.iterrows():
-            with st.chat_message("assistant"): # 아이콘을 로봇이나 뇌 모양으로 하면 간지남
-                st.markdown(f"**[{row['작성일']}] {row['주제']}** <span style='background-color:#f0f2f6; padding:2px 6px; border-radius:4px; font-size:0.8em'>{row['카테고리']}</span>", unsafe_allow_html=True)
-                
+    store.sync()  # 마지막 동기화 이후 추가된 행만 가져옴 (30초 간격)
+except Exception as e:
+    st.caption(f"⚠️ 시트 동기화 실패 (저장된 로컬 사본으로 표시): {e}")
+
+pending_count = len(store.pending())
+if pending_count:
+    retry_msg = f" · 최근 오류: {store.last_error}" if store.last_error else ""
+    st.caption(f"🕓 시트 전송 대기 중인 노트 {pending_count}건{retry_msg}")
+
+index = get_search_index()
+index.update(store.all_notes(), store.state())
+
+# 검색 + 패싯 필터
+cat_counts, month_counts = index.facets()
+col_q, col_cat, col_month = st.columns([2, 1, 1])
+with col_q:
+    query = st.text_input("🔎 노트 검색 (주제/분석 내용/결론)", placeholder="예: 완독, 지성의별, 로그인 연동")
+with col_cat:
+    sel_cats = st.multiselect("카테고리", sorted(cat_counts), format_func=lambda c: f"{c} ({cat_counts[c]})")
+with col_month:
+    sel_months = st.multiselect("작성월", sorted(month_counts, reverse=True), format_func=lambda m: f"{m} ({month_counts[m]})")
+
+notes = index.search(query, set(sel_cats), set(sel_months))  # 검색어가 있으면 관련도순, 없으면 최신순
+
+if notes:
+    total_pages = (len(notes) - 1) // PAGE_SIZE + 1
+    page = st.number_input(f"페이지 (총 {total_pages}쪽 · {len(notes)}건)", min_value=1, max_value=total_pages, value=1)
+
+    for row in notes[(page - 1) * PAGE_SIZE: page * PAGE_SIZE]:
+        with st.chat_message("assistant"): # 아이콘을 로봇이나 뇌 모양으로 하면 간지남
+            pending_badge = " 🕓" if row["_pending"] else ""
+            title = highlight_snippet(row['주제'], query, radius=200)
+            st.markdown(f"**[{row['작성일']}] {title}**{pending_badge} <span style='background-color:#f0f2f6; padding:2px 6px; border-radius:4px; font-size:0.8em'>{row['카테고리']}</span>", unsafe_allow_html=True)
+            
+            if query.strip():
+                # 검색 중에는 일치 부분 주변만 하이라이트해서 보여줌
+                st.markdown(highlight_snippet(row['논리분석내용'], query), unsafe_allow_html=True)
+                st.markdown(f"👉 **결론:** {highlight_snippet(row['결론(Action)'], query, radius=200)}", unsafe_allow_html=True)
+            else:
                 # 분석 내용은 박스 안에 예쁘게
-                st.info(row['논리분석내용'].replace("\n", "  \n")) 
+                st.info(str(row['논리분석내용']).replace("\n", "  \n")) 
                 
                 # 결론은 강조
                 st.markdown(f"👉 **결론:** :red[{row['결론(Action)']}]")
-    else:
-        st.info("아직 저장된 분석 노트가 없습니다. 첫 분석을 기록해보세요!")
-
-except:
-    st.write("데이터를 불러오는 중이거나 시트가 아직 없습니다.")
\ No newline at end of file
+elif query or sel_cats or sel_months:
+    st.info("조건에 맞는 분석 노트가 없습니다.")
+else:
+    st.info("아직 저장된 분석 노트가 없습니다. 첫 분석을 기록해보세요!")
@@ -0,0 +1,156 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+from utils.cache_registry import budgeted_cache
+from utils.data_sources import CS_SHEETS, load_chat_log, load_cs_data, load_signup_data
+from utils.export import export_menu, frame_token
+from utils.rca_notes import get_note_store
+from utils.sql_workspace import (
+    EXAMPLE_QUERIES, PREVIEW_ROWS, QUERY_TIMEOUT, QueryError, QueryTimeout, SqlWorkspace,
+    chartable_columns, delete_query, load_saved_queries, save_query, to_arrow,
+)
+
+# ==========================================
+# [설정] 페이지 설정
+# ==========================================
+st.set_page_config(page_title="Data Playground", page_icon="🧪", layout="wide")
+st.title("🧪 Data Playground (SQL)")
+st.caption("캐시에 올라와 있는 CS / 가입자 / RCA 노트 / 챗봇 로그 데이터를 SQL로 바로 조회합니다. (DuckDB, 조회 전용)")
+
+
+# ==========================================
+# [함수] 테이블 준비 (프로세스 공용, 1분 캐시)
+# ==========================================
+# Arrow 변환은 1분에 한 번만 하고, 모든 세션이 같은 Arrow 테이블을 DuckDB에 등록해 씁니다.
+@budgeted_cache(ttl=60, copy_result=False)
+def load_tables():
+    tables, errors = {}, {}
+
+    def add(name, build):
+        try:
+            df = build()
+            if df is not None:
+                tables[name] = to_arrow(df)
+        except Exception as e:
+            errors[name] = str(e)
+
+    def cs():
+        frames = []
+        for label, sheet_name in CS_SHEETS.items():
+            df = load_cs_data(sheet_name)
+            if df is not None and not df.empty:
+                frames.append(df.assign(출처=label))
+        return pd.concat(frames, ignore_index=True) if frames else None
+
+    def notes():
+        store = get_note_store()
+        store.sync()
+        rows = store.all_notes()
+        return pd.DataFrame(rows).drop(columns=["_id"], errors="ignore").rename(columns={"_pending": "전송대기"})
+
+    add("cs", cs)
+    add("signups", load_signup_data)
+    add("rca_notes", notes)
+    add("chat_log", load_chat_log)
+    return tables, errors
+
+
+def get_workspace():
+    # DuckDB 연결은 세션마다 따로 둡니다. (한 사람의 긴 쿼리/중단이 다른 사람에게 영향 없음)
+    if "sql_workspace" not in st.session_state:
+        st.session_state.sql_workspace = SqlWorkspace()
+    return st.session_state.sql_workspace
+
+
+try:
+    workspace = get_workspace()
+except ImportError:
+    st.error("duckdb / pyarrow 패키지가 필요합니다. `pip install duckdb pyarrow`")
+    st.stop()
+except QueryError as e:
+    st.error(f"❌ {e}")
+    st.stop()
+
+with st.spinner("데이터를 준비하는 중..."):
+    tables, load_errors = load_tables()
+for name, table in tables.items():
+    workspace.register(name, table)
+
+# ==========================================
+# [UI] 사이드바: 테이블 목록 + 저장된 쿼리
+# ==========================================
+if "sql_text" not in st.session_state:
+    st.session_state.sql_text = next(iter(EXAMPLE_QUERIES.values()))
+
+with st.sidebar:
+    st.header("📚 테이블")
+    for name, info in workspace.tables.items():
+        with st.expander(f"`{name}` · {info['rows']:,}행"):
+            st.caption(", ".join(info["columns"]))
+    for name, error in load_errors.items():
+        st.warning(f"`{name}` 불러오기 실패: {error}")
+
+    st.divider()
+    st.header("💾 저장된 쿼리")
+    saved = load_saved_queries()
+    choices = {f"예시 · {k}": v for k, v in EXAMPLE_QUERIES.items()}
+    choices.update({f"저장 · {k}": v for k, v in saved.items()})
+    picked = st.selectbox("불러올 쿼리", list(choices), index=None, placeholder="선택하세요")
+    c1, c2 = st.columns(2)
+    if c1.button("불러오기", disabled=picked is None, width="stretch"):
+        st.session_state.sql_text = choices[picked]
+        st.rerun()
+    if c2.button("삭제", disabled=not (picked or "").startswith("저장 · "), width="stretch"):
+        delete_query(picked.removeprefix("저장 · "))
+        st.rerun()
+
+# ==========================================
+# [UI] 쿼리 편집 + 실행
+# ==========================================
+sql = st.text_area("SQL", key="sql_text", height=180,
+                   help='한글 컬럼은 큰따옴표로 감싸세요. 예: SELECT "처리 상태", COUNT(*) FROM cs GROUP BY 1')
+
+col_run, col_name, col_save = st.columns([1, 2, 1])
+run_clicked = col_run.button("▶️ 실행", type="primary", width="stretch")
+query_name = col_name.text_input("저장 이름", label_visibility="collapsed", placeholder="저장할 이름")
+if col_save.button("💾 저장", disabled=not query_name.strip(), width="stretch"):
+    save_query(query_name.strip(), sql)
+    st.toast(f"'{query_name.strip()}' 쿼리를 저장했습니다.", icon="💾")
+
+if run_clicked:
+    try:
+        result, truncated, elapsed = workspace.run(sql)
+        st.session_state.sql_result = (result, truncated, elapsed)
+    except QueryTimeout as e:
+        st.session_state.pop("sql_result", None)
+        st.error(f"⏱️ {e} 조건을 좁히거나 집계해서 다시 실행해 보세요.")
+    except QueryError as e:
+        st.session_state.pop("sql_result", None)
+        st.error(f"❌ {e}")
+
+# ==========================================
+# [UI] 결과: 표 + 차트
+# ==========================================
+if "sql_result" in st.session_state:
+    result, truncated, elapsed = st.session_state.sql_result
+    note = f" (앞 {PREVIEW_ROWS:,}행만 표시)" if truncated else ""
+    st.caption(f"{len(result):,}행{note} · {elapsed * 1000:.0f}ms · 제한 시간 {QUERY_TIMEOUT}초")
+
+    tab_table, tab_chart = st.tabs(["📋 결과", "📈 차트"])
+    with tab_table:
+        st.dataframe(result, width="stretch", hide_index=True)
+        export_menu(result, "query_result", "sql_result_export", token=frame_token(result))
+
+    with tab_chart:
+        columns, numeric = chartable_columns(result)
+        if result.empty or not numeric:
+            st.info("차트를 그리려면 숫자 컬럼이 하나 이상 필요합니다.")
+        else:
+            c1, c2, c3, c4 = st.columns(4)
+            kind = c1.selectbox("차트", ["막대", "선", "산점도"])
+            x = c2.selectbox("X축", columns)
+            y = c3.selectbox("Y축", numeric, index=len(numeric) - 1)
+            color = c4.selectbox("색상 구분", [None] + [c for c in columns if c not in (x, y)])
+            draw = {"막대": px.bar, "선": px.line, "산점도": px.scatter}[kind]
+            st.plotly_chart(draw(result, x=x, y=y, color=color), width="stretch")
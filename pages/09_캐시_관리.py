@@ -0,0 +1,101 @@
+import streamlit as st
+import pandas as pd
+
+from utils.cache_registry import process_memory, registry
+from utils.disk_cache import PROCESS_ID, disk_cache
+
+# ==========================================
+# [설정] 페이지 설정
+# ==========================================
+st.set_page_config(page_title="캐시 관리", page_icon="🧹", layout="wide")
+st.title("🧹 캐시 메모리 관리")
+st.caption("용량 제한 캐시(utils.cache_registry)에 올라와 있는 데이터셋의 크기, 적중률, 나이를 확인합니다. (이 서버 프로세스 기준)")
+
+
+def mb(n):
+    return f"{n / 1024 / 1024:,.1f} MB"
+
+
+# ==========================================
+# [UI] 1. 요약 지표
+# ==========================================
+used, budget = registry.total_bytes, registry.budget_bytes
+entries = registry.entries()
+summary = registry.summary()
+
+k1, k2, k3, k4 = st.columns(4)
+k1.metric("캐시 사용량", mb(used), f"예산 {mb(budget)}", delta_color="off")
+k2.metric("캐시 항목 수", f"{len(entries)}개")
+hits = sum(s["hits"] for s in summary)
+calls = hits + sum(s["misses"] for s in summary)
+k3.metric("전체 적중률", f"{hits / calls:.0%}" if calls else "-")
+k4.metric("프로세스 메모리(RSS)", mb(process_memory()))
+st.progress(min(used / budget, 1.0) if budget else 0.0, text=f"예산 대비 {used / budget:.0%} 사용" if budget else None)
+
+# ==========================================
+# [UI] 2. 함수별 통계
+# ==========================================
+st.subheader("📦 함수별 통계")
+if summary:
+    summary_df = pd.DataFrame(summary).sort_values("크기(bytes)", ascending=False)
+    summary_df["크기"] = summary_df["크기(bytes)"].map(mb)
+    st.dataframe(
+        summary_df[["함수", "항목 수", "크기", "hits", "misses", "적중률", "evictions", "expired"]],
+        use_container_width=True, hide_index=True,
+        column_config={"적중률": st.column_config.ProgressColumn("적중률", min_value=0.0, max_value=1.0, format="percent")},
+    )
+else:
+    st.info("아직 캐시된 데이터가 없습니다. 대시보드 페이지를 한 번 열어보세요.")
+
+# ==========================================
+# [UI] 3. 항목 목록 (최근 사용 순)
+# ==========================================
+st.subheader("🗂️ 캐시 항목 (최근 사용 순)")
+if entries:
+    entries_df = pd.DataFrame(entries)
+    entries_df["크기"] = entries_df["크기(bytes)"].map(mb)
+    st.dataframe(
+        entries_df[["함수", "인자", "크기", "적중", "나이(초)", "마지막 사용(초 전)", "남은 TTL(초)"]],
+        use_container_width=True, hide_index=True,
+    )
+
+# ==========================================
+# [UI] 4. 디스크 캐시 (같은 서버의 모든 앱 프로세스 공용)
+# ==========================================
+st.subheader("💽 디스크 캐시 (프로세스 공용)")
+disk_summary = disk_cache.summary()
+disk_used = disk_cache.total_bytes()
+d1, d2, d3, d4 = st.columns(4)
+d1.metric("디스크 사용량", mb(disk_used), f"예산 {mb(disk_cache.budget_bytes)}", delta_color="off")
+disk_hits = sum(s["hits"] for s in disk_summary)
+disk_calls = disk_hits + sum(s["misses"] for s in disk_summary)
+d2.metric("디스크 적중률", f"{disk_hits / disk_calls:.0%}" if disk_calls else "-")
+cross_hits = sum(s["cross_hits"] for s in disk_summary)
+d3.metric("다른 프로세스 결과 적중", f"{cross_hits:,}회",
+          help="다른 앱 프로세스(레플리카)가 계산해 둔 결과를 이 디스크 캐시에서 꺼내 쓴 횟수 (모든 프로세스 누적)")
+d4.metric("이 프로세스", PROCESS_ID)
+if disk_summary:
+    disk_df = pd.DataFrame(disk_summary).sort_values("크기(bytes)", ascending=False)
+    disk_df["크기"] = disk_df["크기(bytes)"].map(mb)
+    st.dataframe(
+        disk_df[["함수", "항목 수", "크기", "hits", "cross_hits", "misses", "적중률", "writes", "evictions", "expired"]],
+        use_container_width=True, hide_index=True,
+        column_config={"적중률": st.column_config.ProgressColumn("적중률", min_value=0.0, max_value=1.0, format="percent")},
+    )
+else:
+    st.caption("디스크 캐시를 쓰는 함수가 아직 호출되지 않았습니다. (budgeted_cache(disk=True))")
+
+# ==========================================
+# [UI] 5. 비우기
+# ==========================================
+st.divider()
+c1, c2, c3 = st.columns([2, 1, 1])
+names = sorted({s["함수"] for s in summary} | {s["함수"] for s in disk_summary})
+target = c1.selectbox("비울 대상", ["전체"] + names)
+with_disk = c3.checkbox("디스크 캐시도 비우기", help="다른 앱 프로세스가 함께 쓰는 캐시입니다.")
+if c2.button("🧹 캐시 비우기", use_container_width=True, disabled=not (entries or (with_disk and disk_used))):
+    registry.clear(None if target == "전체" else target)
+    if with_disk:
+        disk_cache.clear(None if target == "전체" else target)
+    st.toast(f"'{target}' 캐시를 비웠습니다.", icon="🧹")
+    st.rerun()
@@ -1,8 +1,11 @@
 import streamlit as st
 import os
+import time
+import datetime
 import pandas as pd
-from google.analytics.data_v1beta import BetaAnalyticsDataClient
-from google.analytics.data_v1beta.types import RunReportRequest
+from utils.cache_registry import budgeted_cache
+from utils.export import export_menu, frame_token
+from utils.ga4 import PANEL_REPORTS, DailyReportStore, create_client, diff_counts, fetch_realtime
 
 # [설정] 키 파일 경로 (이름 일치해야 함!)
 os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = 'service-account.json'
@@ -10,29 +13,163 @@ os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = 'service-account.json'
 # [설정] 내 GA4 속성 ID (숫자로 된 것!)
 MY_PROPERTY_ID = "523128479" 
 
+# [설정] 조회 가능 기간 (과거 데이터는 날짜별로 한 번만 받아 로컬에 저장)
+MAX_HISTORY_DAYS = 365 * 3
+
+# [설정] 실시간 위젯 폴링 (유휴 상태가 길어지면 간격을 2배씩 늘림)
+REALTIME_INTERVALS = [15, 30, 60, 120]   # 선택 가능한 기본 폴링 간격(초)
+IDLE_AFTER = 5 * 60                      # 이 시간 동안 조작이 없으면 유휴로 판단
+MAX_BACKOFF = 8                          # 최대 간격 배수
+
+# [설정] GA4_FAKE=1 이면 실제 API 대신 가짜 클라이언트로 동작 (오프라인 테스트용)
+USE_FAKE = os.environ.get("GA4_FAKE") == "1"
+
 st.title("🚀 GA4 데이터 대시보드")
 
-try:
-    client = BetaAnalyticsDataClient()
-    request = RunReportRequest(
-        property=f"properties/{MY_PROPERTY_ID}",
-        date_ranges=[{"start_date": "30daysAgo", "end_date": "today"}],
-        dimensions=[{"name": "date"}],
-        metrics=[{"name": "activeUsers"}]
+# 전체 페이지가 다시 실행됐다 = 사용자가 무언가를 조작했다 (프래그먼트 자동 실행은 여기를 지나지 않음)
+st.session_state.rt_last_interaction = time.time()
+
+# 클라이언트는 프로세스 전체에서 한 번만 생성해서 공유
+@st.cache_resource
+def get_client(fake):
+    return create_client(fake)
+
+@st.cache_resource
+def get_store():
+    return DailyReportStore()
+
+# 여러 리포트를 한 번에(배치 + 동시 실행) 받아 하나의 데이터셋으로 캐시
+@budgeted_cache(ttl=300, max_entries=8, disk=True)
+def load_panel(start_date, end_date, report_names, fake):
+    specs = [PANEL_REPORTS[name] for name in report_names]
+    rows, requests_made = get_store().load_panel(get_client(fake), MY_PROPERTY_ID, specs, start_date, end_date)
+    return pd.DataFrame(rows, columns=["report", "date", "dimension", "value", "metric", "amount"]), requests_made
+
+today = datetime.date.today()
+col_date, col_reports = st.columns([1, 2])
+with col_date:
+    date_range = st.date_input(
+        "조회 기간",
+        value=(today - datetime.timedelta(days=30), today),
+        min_value=today - datetime.timedelta(days=MAX_HISTORY_DAYS),
+        max_value=today,
     )
-    response = client.run_report(request)
-
-    data = []
-    for row in response.rows:
-        data.append({"Date": row.dimension_values[0].value, "Users": int(row.metric_values[0].value)})
-    
-    if data:
-        df = pd.DataFrame(data)
-        st.write("### 📈 일별 방문자 수")
-        st.line_chart(df.set_index("Date"))
-        st.dataframe(df)
-    else:
+with col_reports:
+    selected_reports = st.multiselect("표시할 리포트", list(PANEL_REPORTS), default=list(PANEL_REPORTS))
+
+if not isinstance(date_range, (tuple, list)) or len(date_range) != 2:
+    st.info("시작일과 종료일을 모두 선택해주세요.")
+    st.stop()
+
+start_date, end_date = date_range
+if USE_FAKE:
+    st.caption("🧪 가짜 GA4 클라이언트로 동작 중입니다. (GA4_FAKE=1)")
+
+try:
+    with st.spinner("GA4 리포트를 불러오는 중..."):
+        panel_df, requests_made = load_panel(start_date, end_date, tuple(selected_reports), USE_FAKE)
+    st.caption(f"GA4에 새로 요청한 리포트 구간: {requests_made}개 (나머지는 로컬 저장본 사용)")
+
+    if panel_df.empty:
         st.warning("데이터가 없어요. 블로그에 접속 좀 해주세요!")
 
+    for name in selected_reports:
+        spec = PANEL_REPORTS[name]
+        report_df = panel_df[panel_df["report"] == spec["name"]]
+        if report_df.empty:
+            continue
+
+        st.write(f"### 📈 {name}")
+        metric = spec["metrics"][0]
+        if len(spec["dimensions"]) == 1:
+            # 날짜만 있는 리포트: 일별 추이
+            df = report_df.pivot_table(index="date", columns="metric", values="amount", aggfunc="sum")
+            st.line_chart(df)
+            st.dataframe(df)
+            export_menu(df, f"GA4_{spec['name']}", f"ga_{spec['name']}_export",
+                        token=frame_token(df), index=True)
+        else:
+            # 차원이 있는 리포트: 기간 합계 순위 + 일별 추이
+            totals = (report_df[report_df["metric"] == metric]
+                      .groupby("value")["amount"].sum().sort_values(ascending=False).head(20))
+            c_left, c_right = st.columns(2)
+            with c_left:
+                st.bar_chart(totals)
+            with c_right:
+                trend = report_df[report_df["value"].isin(totals.head(5).index)].pivot_table(
+                    index="date", columns="value", values="amount", aggfunc="sum")
+                st.line_chart(trend)
+
 except Exception as e:
-    st.error(f"에러 발생: {e}")
\ No newline at end of file
+    st.error(f"에러 발생: {e}")
+
+# ==========================================
+# [UI] 실시간 위젯 (이 영역만 주기적으로 다시 실행)
+# ==========================================
+st.divider()
+st.write("### 🔴 실시간 (최근 30분 활성 사용자)")
+rt_on = st.toggle("실시간 모니터링 켜기", value=False, help="캠페인 발송 중에만 켜두는 것을 권장합니다.")
+rt_interval = st.select_slider("폴링 간격(초)", options=REALTIME_INTERVALS, value=30, disabled=not rt_on)
+
+
+def next_poll_delay(base_interval):
+    # 조작이 없거나 값이 계속 그대로면 폴링 간격을 점점 늘립니다.
+    idle_for = time.time() - st.session_state.get("rt_last_interaction", time.time())
+    factor = 1
+    if idle_for > IDLE_AFTER:
+        factor *= 2 ** int(idle_for // IDLE_AFTER)
+    factor *= 2 ** min(st.session_state.get("rt_unchanged_polls", 0), 3)
+    return base_interval * min(factor, MAX_BACKOFF)
+
+
+@st.fragment(run_every=rt_interval if rt_on else None)
+def realtime_widget():
+    if not rt_on:
+        st.caption("모니터링이 꺼져 있습니다.")
+        return
+
+    now = time.time()
+    state = st.session_state.get("rt_state")
+    if state is None or now >= st.session_state.get("rt_next_poll", 0):
+        try:
+            current = fetch_realtime(get_client(USE_FAKE), MY_PROPERTY_ID)
+        except Exception as e:
+            st.error(f"실시간 조회 실패: {e}")
+            return
+        previous = state["data"] if state else {}
+        changes = {label: diff_counts(previous.get(label), counts) for label, counts in current.items()}
+        changed = any(changes.values())
+        st.session_state.rt_unchanged_polls = 0 if changed else st.session_state.get("rt_unchanged_polls", 0) + 1
+        state = {"data": current, "changes": changes, "fetched_at": now}
+        st.session_state.rt_state = state
+        st.session_state.rt_next_poll = now + next_poll_delay(rt_interval)
+
+    data, changes = state["data"], state["changes"]
+    wait = max(0, int(st.session_state.rt_next_poll - time.time()))
+    st.caption(f"마지막 조회: {datetime.datetime.fromtimestamp(state['fetched_at']).strftime('%H:%M:%S')} · "
+               f"다음 조회까지 약 {wait}초")
+
+    total = sum(data.get("페이지", {}).values())
+    total_delta = sum(cur - prev for prev, cur in changes.get("페이지", {}).values())
+    st.metric("활성 사용자 (30분)", f"{total:,}명", delta=total_delta or None)
+
+    cols = st.columns(len(data))
+    for col, (label, counts) in zip(cols, data.items()):
+        with col:
+            st.markdown(f"**{label}별**")
+            changed = changes.get(label, {})
+            df = pd.DataFrame(
+                [{label: k, "활성 사용자": v, "변화": v - changed[k][0] if k in changed else 0}
+                 for k, v in sorted(counts.items(), key=lambda x: x[1], reverse=True)]
+            )
+            if df.empty:
+                st.caption("현재 활성 사용자가 없습니다.")
+                continue
+            # 바뀐 값만 강조 표시
+            st.dataframe(
+                df.style.apply(lambda r: ["background-color:#fff3cd" if r["변화"] else "" for _ in r], axis=1),
+                use_container_width=True, hide_index=True,
+            )
+
+
+realtime_widget()
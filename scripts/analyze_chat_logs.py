@@ -0,0 +1,38 @@
+# ==========================================
+# 상담 로그 증분 배치 분석
+# ==========================================
+# 지난 실행 이후 chat_history_db.csv에 추가된 메시지만 읽어
+# FAQ 카테고리 태깅 / 지식 공백 표시 / 일별 집계를 갱신합니다. (LLM 호출 없음)
+#
+#   python -m scripts.analyze_chat_logs
+#   python -m scripts.analyze_chat_logs --log other_log.csv --reset
+import argparse
+import os
+import time
+
+from utils.chat_log_analytics import LOG_PATH, STATE_PATH, TAGGED_PATH, run_batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="상담 로그 증분 배치 분석")
+    parser.add_argument("--log", default=LOG_PATH, help="분석할 상담 로그 CSV 경로")
+    parser.add_argument("--reset", action="store_true", help="이전 상태를 지우고 처음부터 다시 분석")
+    args = parser.parse_args()
+
+    if args.reset:
+        for path in (STATE_PATH, TAGGED_PATH):
+            if os.path.exists(path):
+                os.remove(path)
+
+    started = time.perf_counter()
+    state, new_rows = run_batch(args.log)
+    elapsed = time.perf_counter() - started
+
+    questions = sum(v.get("questions", 0) for v in state["daily"].values())
+    gaps = sum(v.get("gaps", 0) for v in state["daily"].values())
+    print(f"new_messages={new_rows} total_messages={state['messages']} elapsed={elapsed * 1000:.1f}ms")
+    print(f"questions={questions} gaps={gaps} gap_rate={(gaps / questions * 100 if questions else 0):.1f}%")
+
+
+if __name__ == "__main__":
+    main()
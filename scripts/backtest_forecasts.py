@@ -0,0 +1,47 @@
+# ==========================================
+# CS 인입량 예측 모델 백테스트 리포트
+# ==========================================
+# CSV(시트에서 내려받은 CS 접수기록 등)의 날짜 컬럼을 일별 건수로 묶어
+# Prophet / 지난주 반복 / 요일 평균 / ETS 를 rolling-origin 방식으로 비교합니다.
+#
+#   python -m scripts.backtest_forecasts --csv cs_export.csv
+#   python -m scripts.backtest_forecasts --csv cs_export.csv --date-col 일시 --horizon 7 --folds 8 --no-prophet
+import argparse
+import time
+
+import pandas as pd
+
+from utils.forecasting import FOLDS, HORIZON, STEP, available_models, backtest, best_model, daily_series
+
+
+def main():
+    parser = argparse.ArgumentParser(description="예측 모델 백테스트")
+    parser.add_argument("--csv", required=True, help="날짜 컬럼이 있는 CSV 경로")
+    parser.add_argument("--date-col", default="일시")
+    parser.add_argument("--horizon", type=int, default=HORIZON, help="폴드마다 예측할 일수")
+    parser.add_argument("--folds", type=int, default=FOLDS)
+    parser.add_argument("--step", type=int, default=STEP, help="폴드 사이 간격(일)")
+    parser.add_argument("--no-prophet", action="store_true", help="Prophet 제외 (빠른 모델만 비교)")
+    args = parser.parse_args()
+
+    raw = pd.read_csv(args.csv, dtype=str)
+    dates = pd.to_datetime(raw[args.date_col].str.replace(".", "-", regex=False), errors="coerce")
+    series = daily_series(dates)
+    models = [m for m in available_models() if not (args.no_prophet and m == "prophet")]
+    print(f"[데이터] {len(series)}일 ({series.index.min():%Y-%m-%d} ~ {series.index.max():%Y-%m-%d}), "
+          f"일평균 {series.mean():.1f}건")
+
+    started = time.perf_counter()
+    report = backtest(series, models, args.horizon, args.folds, args.step)
+    elapsed = time.perf_counter() - started
+    if report.empty:
+        print("백테스트할 데이터가 부족합니다.")
+        return
+
+    print(f"[백테스트] 모델 {len(models)}개 x 폴드 최대 {args.folds}개, 총 {elapsed:.1f}초")
+    print(report.drop(columns=["model"]).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    print(f"[추천] {best_model(report)} (초당 정확도 기준)")
+
+
+if __name__ == "__main__":
+    main()
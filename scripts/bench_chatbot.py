@@ -0,0 +1,84 @@
+# ==========================================
+# 챗봇 파이프라인 지연시간 벤치마크
+# ==========================================
+# 페이지와 같은 경로(answer_question: 관련 FAQ 검색 -> 대화 메모리 -> 모델 호출)를 FAQ 질문 묶음으로 돌려
+# p50/p95 지연시간과 프롬프트 크기를 출력합니다. API 키 없이 돌리려면 fake/replay 모드를 쓰세요.
+#
+#   python -m scripts.bench_chatbot --mode fake --latency 0.3 --jitter 0.1
+#   python -m scripts.bench_chatbot --mode replay --turns 4
+#   python -m scripts.bench_chatbot --mode fake --per-1k-chars 0.01 --no-cache   (캐시 효과 비교)
+import argparse
+import statistics
+import time
+
+from utils.chat_memory import estimate_tokens, new_memory
+from utils.chatbot import PromptCache, answer_question
+from utils.knowledge_store import get_active_snapshot
+from utils.llm_backend import MODES, get_backend
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def load_questions(limit):
+    # 현재 적용 중인 지식 스냅샷의 FAQ 질문을 그대로 사용합니다.
+    questions = [e["question"].strip() for e in get_active_snapshot().faq_entries if e["question"].strip()]
+    return questions[:limit] if limit else questions
+
+
+def run(backend, questions, turns, prompt_cache=None):
+    latencies, prompt_chars, prompt_tokens = [], [], []
+    # turns개 질문을 한 세션으로 묶어 멀티턴 메모리까지 함께 측정합니다.
+    for start in range(0, len(questions), turns):
+        memory, history = new_memory(), []
+        for question in questions[start:start + turns]:
+            started = time.perf_counter()
+            answer, prompt = answer_question(backend, memory, history, question, prompt_cache)
+            latencies.append(time.perf_counter() - started)
+            prompt_chars.append(len(prompt))
+            prompt_tokens.append(estimate_tokens(prompt))
+            history += [{"role": "user", "content": question}, {"role": "assistant", "content": answer}]
+    return latencies, prompt_chars, prompt_tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description="챗봇 파이프라인 벤치마크")
+    parser.add_argument("--mode", choices=MODES, default="fake")
+    parser.add_argument("--api-key", default=None, help="live/record 모드에서 사용할 Gemini API 키")
+    parser.add_argument("--latency", type=float, default=0.0, help="fake 답변 기본 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="fake 답변 지연 변동폭(초)")
+    parser.add_argument("--limit", type=int, default=0, help="사용할 FAQ 질문 수 (0이면 전체)")
+    parser.add_argument("--turns", type=int, default=1, help="한 세션에 묶을 질문 수")
+    parser.add_argument("--per-1k-chars", type=float, default=0.0, help="fake 입력 1,000자당 추가 지연(초)")
+    parser.add_argument("--no-cache", action="store_true", help="고정 접두부 캐시 없이 매번 전체 프롬프트 전송")
+    args = parser.parse_args()
+
+    backend = get_backend(args.mode, args.api_key, latency=args.latency, jitter=args.jitter,
+                          per_1k_chars=args.per_1k_chars)
+    prompt_cache = None if args.no_cache else PromptCache()
+    questions = load_questions(args.limit)
+
+    started = time.perf_counter()
+    latencies, prompt_chars, prompt_tokens = run(backend, questions, max(1, args.turns), prompt_cache)
+    elapsed = time.perf_counter() - started
+
+    print(f"mode={args.mode} requests={len(latencies)} turns/session={args.turns} "
+          f"cache={'off' if prompt_cache is None else 'on'} wall={elapsed:.2f}s")
+    print(f"latency  p50={percentile(latencies, 50) * 1000:.1f}ms  p95={percentile(latencies, 95) * 1000:.1f}ms  "
+          f"max={max(latencies) * 1000:.1f}ms")
+    print(f"prompt   chars p50={percentile(prompt_chars, 50):,}  p95={percentile(prompt_chars, 95):,}  "
+          f"mean={statistics.mean(prompt_chars):,.0f}")
+    print(f"prompt   tokens(est) p50={percentile(prompt_tokens, 50):,}  p95={percentile(prompt_tokens, 95):,}")
+    if prompt_cache is not None:
+        print(f"cache    registrations={prompt_cache.registrations}")
+    if getattr(backend, "hits", None) is not None:
+        print(f"replay   hits={backend.hits} misses={backend.misses}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# ==========================================
+# 무거운 라이브러리 import 시간 측정
+# ==========================================
+# 모듈마다 새 파이썬 프로세스에서 `python -X importtime`으로 불러와 누적 시간을 잽니다.
+# "eager"는 기존 01_일반CS분석 페이지처럼 맨 위에서 전부 불러올 때,
+# "lazy"는 지금처럼 첫 화면에 필요한 것만 불러올 때의 비용입니다.
+#
+#   python -m scripts.measure_imports
+#   python -m scripts.measure_imports --repeat 5
+import argparse
+import statistics
+import subprocess
+import sys
+
+from utils.warmup import HEAVY_MODULES
+
+PAGE_BASE_MODULES = ["streamlit", "pandas", "plotly.express"]
+SCENARIOS = {
+    "eager (이전 01 페이지)": PAGE_BASE_MODULES + HEAVY_MODULES,
+    "lazy (첫 화면)": PAGE_BASE_MODULES,
+}
+
+
+def import_time(modules):
+    # -X importtime 출력(stderr)의 최상위 모듈 누적 시간(us)을 합산합니다.
+    code = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  ") and cumulative.strip().isdigit():  # 들여쓰기 없는 줄 = 최상위 import
+            total += int(cumulative)
+    return total / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="import 시간 측정")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("[모듈별]")
+    for module in PAGE_BASE_MODULES + HEAVY_MODULES:
+        try:
+            times = [import_time([module]) for _ in range(args.repeat)]
+            print(f"  {module:32s} {statistics.median(times):6.2f}s")
+        except RuntimeError as e:
+            print(f"  {module:32s} 실패: {e}")
+
+    print("[시나리오]")
+    for label, modules in SCENARIOS.items():
+        try:
+            times = [import_time(modules) for _ in range(args.repeat)]
+            print(f"  {label:24s} {statistics.median(times):6.2f}s")
+        except RuntimeError as e:
+            print(f"  {label:24s} 실패: {e}")
+
+
+if __name__ == "__main__":
+    main()
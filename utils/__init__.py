@@ -0,0 +1 @@
+# 여러 페이지에서 함께 쓰는 공통 모듈 모음입니다.
@@ -0,0 +1,207 @@
+import os
+import json
+import math
+import datetime
+import threading
+
+import pandas as pd
+
+# ==========================================
+# [설정] CS 인입량 이상 감지 (증분 EWMA + 요일 기준선)
+# ==========================================
+# 카테고리마다 '수준(EWMA)', '요일별 편차', '예측 오차의 분산'만 상태로 들고 있다가,
+# 하루가 끝날 때마다 그날 건수 하나로 O(1) 갱신합니다. 매번 모델을 다시 학습하지 않습니다.
+# 기대값 = EWMA 수준 + 그 요일의 평균 편차, 점수 z = (실제 - 기대값) / 오차 표준편차
+PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages")
+OUT_DIR = os.path.join(PAGES_DIR, "cs_anomaly")
+STATE_PATH = os.path.join(OUT_DIR, "state.json")
+
+ALPHA = 0.1             # 수준(EWMA) 반영 비율
+WEEKDAY_ALPHA = 0.2     # 요일별 편차 반영 비율
+Z_THRESHOLD = 3.0       # 이 점수 이상이면 이상 급증
+MIN_COUNT = 5           # 건수가 이보다 적으면 점수가 높아도 무시
+MIN_HISTORY = 14        # 이만큼 학습한 뒤부터 판정 (워밍업)
+MIN_STD = 1.0           # 분산이 0에 가까운 카테고리에서 점수가 튀지 않도록 하한
+FLAG_HISTORY_DAYS = 90  # 지난 이상 기록 보관 기간
+TOTAL = "전체"           # 카테고리 합계 시리즈 이름
+
+_lock = threading.Lock()
+_synced = {}            # 출처 -> (데이터 버전, 날짜, 그때 판정한 이상 목록) - 같은 데이터면 다시 계산하지 않음
+
+
+def new_state():
+    return {"sources": {}, "updated_at": None}
+
+
+def new_source():
+    return {"last_day": None, "series": {}, "flags": []}
+
+
+def new_series():
+    return {"level": None, "offset": [0.0] * 7, "var": 0.0, "days": 0}
+
+
+def load_state():
+    if os.path.exists(STATE_PATH):
+        with open(STATE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return new_state()
+
+
+def save_state(state):
+    os.makedirs(OUT_DIR, exist_ok=True)
+    tmp = f"{STATE_PATH}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp, STATE_PATH)
+
+
+# ==========================================
+# [함수] 시리즈 하나에 대한 O(1) 판정/갱신
+# ==========================================
+def expected(series, weekday):
+    if series["level"] is None:
+        return None, None
+    mean = max(series["level"] + series["offset"][weekday], 0.0)
+    return mean, max(math.sqrt(series["var"]), MIN_STD)
+
+
+def score(series, count, weekday):
+    # (기대값, z점수). 워밍업 중이면 z는 None
+    mean, std = expected(series, weekday)
+    if mean is None or series["days"] < MIN_HISTORY:
+        return mean, None
+    return mean, (count - mean) / std
+
+
+def update(series, count, weekday):
+    if series["level"] is None:
+        series["level"] = float(count)
+    mean, _ = expected(series, weekday)
+    residual = count - mean
+    series["var"] = (1 - ALPHA) * series["var"] + ALPHA * residual * residual
+    series["offset"][weekday] += WEEKDAY_ALPHA * ((count - series["level"]) - series["offset"][weekday])
+    series["level"] += ALPHA * (count - series["level"])
+    series["days"] += 1
+
+
+def is_anomaly(count, z):
+    return z is not None and z >= Z_THRESHOLD and count >= MIN_COUNT
+
+
+# ==========================================
+# [함수] 데이터 동기화 시 호출: 새로 끝난 날만 반영
+# ==========================================
+def daily_counts(df, after=None):
+    # {날짜: {카테고리: 건수}} - after 이후 날짜만 (문자열 'YYYY-MM-DD' 비교)
+    if df is None or df.empty or '일시' not in df.columns:
+        return {}
+    days = df['일시'].dt.strftime('%Y-%m-%d')
+    mask = days > after if after else pd.Series(True, index=df.index)
+    categories = df.loc[mask, '카테고리'].astype(str).str.strip() if '카테고리' in df.columns else None
+    if categories is None:
+        grouped = days[mask].value_counts()
+        return {day: {TOTAL: int(n)} for day, n in grouped.items()}
+    counts = {}
+    for (day, category), n in pd.crosstab(days[mask], categories).stack().items():
+        if n:
+            counts.setdefault(day, {})[category or "미분류"] = int(n)
+    for day, by_cat in counts.items():
+        by_cat[TOTAL] = sum(by_cat.values())
+    return counts
+
+
+def _flag(source, category, day, count, mean, z, partial):
+    return {"source": source, "category": category, "day": day, "count": count,
+            "expected": round(mean, 1), "z": round(z, 1), "partial": partial}
+
+
+def sync_source(state, source, df, today=None):
+    """source(시트) 하나의 새로 끝난 날들을 반영하고, 오늘(진행 중) 판정까지 돌려줍니다.
+
+    돌려주는 값: (상태가 바뀌었는지, 현재 유효한 이상 목록)
+    """
+    today = (today or datetime.date.today()).isoformat()
+    src = state["sources"].setdefault(source, new_source())
+    counts = daily_counts(df, src["last_day"])
+    complete = sorted(day for day in counts if day < today)
+    changed = False
+
+    if complete:
+        day = datetime.date.fromisoformat(src["last_day"]) + datetime.timedelta(days=1) if src["last_day"] \
+            else datetime.date.fromisoformat(complete[0])
+        end = datetime.date.fromisoformat(complete[-1])
+        while day <= end:
+            key = day.isoformat()
+            by_cat = counts.get(key, {})
+            weekday = day.weekday()
+            for category in set(src["series"]) | set(by_cat):
+                series = src["series"].setdefault(category, new_series())
+                count = by_cat.get(category, 0)
+                mean, z = score(series, count, weekday)
+                if is_anomaly(count, z):
+                    src["flags"].append(_flag(source, category, key, count, mean, z, False))
+                update(series, count, weekday)
+            day += datetime.timedelta(days=1)
+        src["last_day"] = end.isoformat()
+        cutoff = (end - datetime.timedelta(days=FLAG_HISTORY_DAYS)).isoformat()
+        src["flags"] = [f for f in src["flags"] if f["day"] >= cutoff]
+        changed = True
+
+    # 오늘은 아직 끝나지 않았으므로 상태에 넣지 않고, 지금까지 건수가 이미 기준을 넘었는지만 봅니다.
+    active = [f for f in src["flags"] if f["day"] == src["last_day"]]
+    weekday = datetime.date.fromisoformat(today).weekday()
+    for category, count in counts.get(today, {}).items():
+        series = src["series"].get(category)
+        if series is None:
+            continue
+        mean, z = score(series, count, weekday)
+        if is_anomaly(count, z):
+            active.append(_flag(source, category, today, count, mean, z, True))
+    return changed, active
+
+
+def sync(frames, today=None, versions=None):
+    # frames: {출처 이름: CS DataFrame}. 새로 끝난 날이 있을 때만 상태 파일을 다시 씁니다.
+    # versions: {출처 이름: 데이터 버전}. 이 프로세스가 마지막으로 동기화한 버전(같은 날)과 같으면
+    # 상태 파일을 읽거나 날짜를 다시 세지 않고 그때 결과를 그대로 씁니다. (다시 그리기는 O(1))
+    today = today or datetime.date.today()
+    versions = versions or {}
+    with _lock:
+        flags, todo = [], {}
+        for source, df in frames.items():
+            memo = _synced.get(source)
+            if versions.get(source) is not None and memo and memo[:2] == (versions[source], today):
+                flags += memo[2]
+            else:
+                todo[source] = df
+        if todo:
+            state = load_state()
+            any_changed = False
+            for source, df in todo.items():
+                changed, active = sync_source(state, source, df, today)
+                any_changed |= changed
+                flags += active
+                if versions.get(source) is not None:
+                    _synced[source] = (versions[source], today, active)
+            if any_changed:
+                state["updated_at"] = datetime.datetime.now().isoformat(timespec="seconds")
+                save_state(state)
+    return sorted(flags, key=lambda f: (f["category"] == TOTAL, -f["z"]))
+
+
+def recent_flags(source=None, days=30):
+    # 대시보드 기록용: 최근 days일 동안의 (완료된 날) 이상 목록
+    state = load_state()
+    cutoff = (datetime.date.today() - datetime.timedelta(days=days)).isoformat()
+    flags = []
+    for name, src in state["sources"].items():
+        if source is None or name == source:
+            flags += [f for f in src["flags"] if f["day"] >= cutoff]
+    return sorted(flags, key=lambda f: f["day"], reverse=True)
+
+
+def describe(flag):
+    when = "오늘(진행 중)" if flag["partial"] else flag["day"]
+    return (f"[{flag['source']}] {flag['category']} · {when}: {flag['count']}건 "
+            f"(평소 {flag['expected']}건, z={flag['z']})")
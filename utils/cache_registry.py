@@ -0,0 +1,267 @@
+import os
+import sys
+import copy
+import time
+import numbers
+import datetime
+import functools
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict
+
+from utils.disk_cache import disk_cache
+
+# ==========================================
+# [설정] 용량 제한 캐시 (프로세스 공용)
+# ==========================================
+# st.cache_data 는 항목 수/크기 제한이 없어, 시트 이름이나 필터 조합마다 DataFrame이 하나씩
+# 계속 쌓입니다. 여기서는 모든 캐시 항목의 실제 메모리 크기(deep)를 재서 합계가 예산을 넘으면
+# 가장 오래 안 쓴 항목부터 버립니다(LRU). 항목별 크기/적중/나이는 관리 페이지에서 봅니다.
+DEFAULT_BUDGET_MB = 256
+BUDGET_BYTES = int(float(os.environ.get("CACHE_BUDGET_MB", DEFAULT_BUDGET_MB)) * 1024 * 1024)
+
+
+def deep_size(obj, _seen=None):
+    # 객체가 실제로 차지하는 메모리(bytes) 추정
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if hasattr(obj, "to_plotly_json"):                                # plotly Figure (그림 데이터 기준)
+        return sys.getsizeof(obj) + deep_size(obj.to_plotly_json(), seen)
+    if hasattr(obj, "memory_usage") and hasattr(obj, "columns"):      # pandas DataFrame
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if hasattr(obj, "memory_usage") and hasattr(obj, "dtype"):        # pandas Series / Index
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    if hasattr(obj, "nbytes") and not isinstance(obj, (bytes, bytearray)):  # numpy 배열, pyarrow Table
+        return int(obj.nbytes) + sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(deep_size(v, seen) for v in obj)
+    return sys.getsizeof(obj)
+
+
+def _copy(value):
+    # st.cache_data 처럼 호출하는 쪽이 결과를 고쳐도 캐시 원본은 그대로 두기 위한 복사
+    if value is None or isinstance(value, (str, bytes, int, float, bool)):
+        return value
+    if hasattr(value, "copy") and hasattr(value, "columns"):
+        return value.copy()
+    return copy.deepcopy(value)
+
+
+class _Entry:
+    __slots__ = ("name", "key", "value", "size", "hits", "created", "last_access", "expires")
+
+    def __init__(self, name, key, value, size, ttl):
+        now = time.time()
+        self.name, self.key, self.value, self.size = name, key, value, size
+        self.hits = 0
+        self.created = self.last_access = now
+        self.expires = now + ttl if ttl else None
+
+
+# ==========================================
+# [클래스] 캐시 레지스트리
+# ==========================================
+class CacheRegistry:
+
+    def __init__(self, budget_bytes=BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # (함수 이름, 인자 키) -> _Entry, 앞쪽일수록 오래 안 쓴 항목
+        self.total_bytes = 0
+        self.stats = {}                 # 함수 이름 -> {"hits", "misses", "evictions", "expired"}
+
+    def _stat(self, name):
+        return self.stats.setdefault(name, {"hits": 0, "misses": 0, "evictions": 0, "expired": 0})
+
+    def _drop(self, full_key):
+        entry = self._entries.pop(full_key)
+        self.total_bytes -= entry.size
+        return entry
+
+    def get(self, name, key):
+        full_key = (name, key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None and entry.expires is not None and entry.expires < time.time():
+                self._drop(full_key)
+                self._stat(name)["expired"] += 1
+                entry = None
+            if entry is None:
+                self._stat(name)["misses"] += 1
+                return False, None
+            entry.hits += 1
+            entry.last_access = time.time()
+            self._entries.move_to_end(full_key)
+            self._stat(name)["hits"] += 1
+            return True, entry.value
+
+    def put(self, name, key, value, ttl=None, max_entries=None):
+        size = deep_size(value)
+        full_key = (name, key)
+        with self._lock:
+            if full_key in self._entries:
+                self._drop(full_key)
+            if size > self.budget_bytes:
+                return   # 혼자서 예산을 넘는 값은 캐시하지 않음
+            self._entries[full_key] = _Entry(name, key, value, size, ttl)
+            self.total_bytes += size
+            if max_entries:
+                own = [k for k in self._entries if k[0] == name]
+                for old in own[:-max_entries]:
+                    self._drop(old)
+                    self._stat(name)["evictions"] += 1
+            while self.total_bytes > self.budget_bytes and len(self._entries) > 1:
+                old_key = next(iter(self._entries))
+                self._drop(old_key)
+                self._stat(old_key[0])["evictions"] += 1
+
+    def clear(self, name=None):
+        with self._lock:
+            for full_key in [k for k in self._entries if name is None or k[0] == name]:
+                self._drop(full_key)
+
+    def entries(self):
+        # 관리 화면용 스냅샷 (최근에 쓴 순서)
+        now = time.time()
+        with self._lock:
+            return [
+                {"함수": e.name, "인자": repr(e.key), "크기(bytes)": e.size, "적중": e.hits,
+                 "나이(초)": int(now - e.created), "마지막 사용(초 전)": int(now - e.last_access),
+                 "남은 TTL(초)": None if e.expires is None else max(0, int(e.expires - now))}
+                for e in reversed(self._entries.values())
+            ]
+
+    def summary(self):
+        with self._lock:
+            rows = []
+            for name, s in self.stats.items():
+                calls = s["hits"] + s["misses"]
+                size = sum(e.size for e in self._entries.values() if e.name == name)
+                count = sum(1 for e in self._entries.values() if e.name == name)
+                rows.append({"함수": name, "항목 수": count, "크기(bytes)": size, **s,
+                             "적중률": s["hits"] / calls if calls else 0.0})
+            return rows
+
+
+registry = CacheRegistry()
+
+
+# 캐시 키로 받는 인자 종류 (값이 같으면 hash/repr 도 같아서 프로세스가 달라도 같은 디스크 키가 됨)
+KEY_TYPES = (type(None), bool, numbers.Number, str, bytes, datetime.date, datetime.time, datetime.timedelta)
+
+
+def _check_key(value, path):
+    if isinstance(value, (tuple, frozenset)):
+        for item in value:
+            _check_key(item, path)
+    elif not isinstance(value, KEY_TYPES):
+        raise TypeError(f"{path}: 캐시 키로 쓸 수 없는 인자 타입입니다 ({type(value).__name__}). "
+                        "숫자/문자열/날짜나 그 튜플로 넘겨주세요.")
+
+
+def _make_key(fn_name, args, kwargs):
+    # 리스트/DataFrame 처럼 해시가 안 되거나, 객체 주소로 비교되는 알 수 없는 타입은 받지 않음
+    key = (args, tuple(sorted(kwargs.items())))
+    _check_key(key, fn_name)
+    return key
+
+
+_flights = {}                   # (함수 이름, 인자 키) -> [잠금, 기다리는 호출 수]
+_flights_lock = threading.Lock()
+
+
+@contextmanager
+def _single_flight(full_key):
+    # 같은 키를 동시에 계산하지 않도록 키마다 잠금 (먼저 온 호출이 계산하고, 나머지는 끝나면 캐시에서 꺼냄)
+    with _flights_lock:
+        flight = _flights.setdefault(full_key, [threading.Lock(), 0])
+        flight[1] += 1
+    try:
+        with flight[0]:
+            yield
+    finally:
+        with _flights_lock:
+            flight[1] -= 1
+            if not flight[1]:
+                del _flights[full_key]
+
+
+def _default_name(fn):
+    # 스트림릿 페이지 스크립트는 모두 __main__ 으로 실행되므로, 그때는 페이지 파일 이름으로 구분
+    # (다른 페이지의 같은 이름 함수가 메모리/디스크 캐시를 함께 쓰지 않도록)
+    module = fn.__module__
+    if module == "__main__":
+        module = os.path.splitext(os.path.basename(fn.__code__.co_filename))[0]
+    return f"{module}.{fn.__qualname__}"
+
+
+def budgeted_cache(ttl=None, max_entries=None, copy_result=True, name=None, disk=False):
+    """st.cache_data 대신 쓰는 용량 제한 캐시 데코레이터
+
+    결과는 프로세스 공용 registry 에 저장되며, 전체 크기가 예산(CACHE_BUDGET_MB)을 넘으면
+    가장 오래 안 쓴 항목부터 버립니다. copy_result=False 이면 캐시된 객체를 그대로 돌려줍니다.
+    (pyarrow Table 처럼 바뀌지 않는 객체용)
+    disk=True 이면 메모리에 없을 때 디스크 캐시(utils.disk_cache)를 먼저 보고, 새로 계산한 결과도
+    디스크에 써서 같은 서버의 다른 앱 프로세스와 나눠 씁니다. (시트 다운로드, 모델 학습 등 비싼 계산용)
+    같은 인자로 동시에 불리면 한 번만 계산하고, 나머지 호출은 그 결과를 기다렸다가 씁니다.
+    """
+    def decorator(fn):
+        fn_name = name or _default_name(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = _make_key(fn_name, args, kwargs)
+            hit, value = registry.get(fn_name, key)
+            if not hit:
+                with _single_flight((fn_name, key)):
+                    value = _load(key, args, kwargs)
+            return _copy(value) if copy_result else value
+
+        def _load(key, args, kwargs):
+            # 잠금을 기다리는 동안 다른 호출이 채웠을 수 있으므로 다시 확인
+            hit, value = registry.get(fn_name, key)
+            if hit:
+                return value
+            if disk:
+                hit, value, expires = disk_cache.get(fn_name, key)
+                if hit:
+                    # 디스크 항목에 남은 시간만큼만 메모리에 둠 (처음부터 ttl 을 다시 세지 않음)
+                    remaining = None if expires is None else max(expires - time.time(), 0.001)
+                    registry.put(fn_name, key, value, ttl=remaining, max_entries=max_entries)
+                    return value
+            value = fn(*args, **kwargs)
+            registry.put(fn_name, key, value, ttl=ttl, max_entries=max_entries)
+            if disk:
+                disk_cache.put(fn_name, key, value, ttl=ttl)
+            return value
+
+        def clear():
+            registry.clear(fn_name)
+            if disk:
+                disk_cache.clear(fn_name)
+
+        wrapper.clear = clear
+        wrapper.cache_name = fn_name
+        return wrapper
+
+    return decorator
+
+
+def process_memory():
+    # 현재 프로세스 상주 메모리(RSS, bytes). /proc 이 없으면 최대 RSS 로 대신함
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# [설정] 긴 시계열 차트 도우미
+# ==========================================
+# 기간이 길어질수록 일 -> 주 -> 월 단위로 묶고, 그래도 점이 많으면 LTTB로 모양을 유지하며
+# 점 수를 줄입니다. 점이 많은 선/점 그래프는 WebGL(Scattergl)로 그려 브라우저 부담을 줄입니다.
+POINT_BUDGET = 2000         # 한 시리즈(선)당 최대 점 수
+WEBGL_POINTS = 1000         # 그림 전체 점 수가 이보다 많으면 WebGL로 그림
+DAILY_MAX_DAYS = 120        # 이 기간까지는 일 단위
+WEEKLY_MAX_DAYS = 730       # 이 기간까지는 주 단위, 넘으면 월 단위
+
+FREQ_LABELS = {"D": "일", "W-MON": "주", "MS": "월"}
+FREQ_OPTIONS = {"자동": None, "일": "D", "주": "W-MON", "월": "MS"}
+
+
+def choose_freq(start, end):
+    # 보고 있는 기간(줌 범위)에 맞춰 집계 단위를 고릅니다.
+    span = (pd.Timestamp(end) - pd.Timestamp(start)).days
+    if span <= DAILY_MAX_DAYS:
+        return "D"
+    if span <= WEEKLY_MAX_DAYS:
+        return "W-MON"
+    return "MS"
+
+
+def aggregate_counts(dates, freq=None, by=None, x_name="날짜", y_name="건수"):
+    # dates(날짜 Series)를 freq 단위 건수로 묶습니다. by(Series)를 주면 그룹별로 따로 셉니다.
+    # 돌려주는 값: (집계 DataFrame, 실제로 쓴 freq)
+    dates = pd.to_datetime(pd.Series(dates)).dropna()
+    if dates.empty:
+        columns = [x_name, y_name] if by is None else [x_name, by.name, y_name]
+        return pd.DataFrame(columns=columns), freq or "D"
+    freq = freq or choose_freq(dates.min(), dates.max())
+    # 주 단위는 해당 주의 월요일, 월 단위는 1일로 맞춰서 묶음
+    period = dates.dt.to_period("W-SUN" if freq == "W-MON" else freq[0]).dt.start_time
+    keys = [period.rename(x_name)] if by is None else [period.rename(x_name), by.loc[dates.index]]
+    counts = dates.groupby(keys).size().reset_index(name=y_name)
+    return counts, freq
+
+
+def lttb(x, y, n_out):
+    # Largest-Triangle-Three-Buckets: 남길 점의 인덱스를 돌려줍니다. (처음/끝 점은 항상 유지)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    bucket = (n - 2) / (n_out - 2)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+        next_end = min(int((i + 2) * bucket) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def downsample(df, x, y, budget=POINT_BUDGET, by=None):
+    # 시리즈(그룹)마다 budget개 이하로 줄입니다. x는 날짜 또는 숫자 컬럼.
+    def reduce(part):
+        part = part.sort_values(x)
+        if len(part) <= budget:
+            return part
+        xs = pd.to_datetime(part[x]).astype("int64") if not pd.api.types.is_numeric_dtype(part[x]) else part[x]
+        return part.iloc[lttb(xs.to_numpy(), part[y].to_numpy(), budget)]
+
+    if by is None:
+        return reduce(df)
+    return pd.concat([reduce(part) for _, part in df.groupby(by, sort=False)], ignore_index=True)
+
+
+def render_mode(n_points):
+    # px.line / px.scatter 의 render_mode 값
+    return "webgl" if n_points > WEBGL_POINTS else "svg"
+
+
+def scatter_class(n_points):
+    # go.Scatter / go.Scattergl 중 점 수에 맞는 것
+    import plotly.graph_objects as go
+    return go.Scattergl if n_points > WEBGL_POINTS else go.Scatter
+
+
+def band_xy(x, upper, lower):
+    # 예측 범위(fill='toself')용 닫힌 다각형 좌표: 위쪽 선을 따라갔다가 아래쪽 선으로 되돌아옴
+    x = np.asarray(x)
+    return np.concatenate([x, x[::-1]]), np.concatenate([np.asarray(upper), np.asarray(lower)[::-1]])
+
+
+def figure_stats(fig):
+    # (점 수, 직렬화된 그림 크기 bytes) - 브라우저로 보내는 양을 확인하는 용도
+    points = sum(len(trace.x) for trace in fig.data if getattr(trace, "x", None) is not None)
+    return points, len(fig.to_json().encode("utf-8"))
+
+
+def size_caption(fig, freq=None):
+    points, size = figure_stats(fig)
+    unit = f"{FREQ_LABELS.get(freq, freq)} 단위 · " if freq else ""
+    return f"{unit}{points:,}개 점 · 차트 데이터 {size / 1024:,.1f} KB"
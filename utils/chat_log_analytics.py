@@ -0,0 +1,228 @@
+import io
+import os
+import csv
+import json
+import time
+import fcntl
+from contextlib import contextmanager
+
+from utils.knowledge_store import get_active_snapshot
+
+# ==========================================
+# [설정] 상담 로그 배치 분석
+# ==========================================
+# chat_history_db.csv는 '저장하기' 버튼으로 뒤에 이어 붙여지기만 하므로,
+# 마지막으로 읽은 바이트 위치(offset)를 기억해 두고 그 이후에 추가된 메시지만 처리합니다.
+PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages")
+LOG_PATH = os.path.join(PAGES_DIR, "chat_history_db.csv")
+OUT_DIR = os.path.join(PAGES_DIR, "chat_analytics")
+STATE_PATH = os.path.join(OUT_DIR, "state.json")
+TAGGED_PATH = os.path.join(OUT_DIR, "tagged_questions.csv")
+LOCK_PATH = os.path.join(OUT_DIR, "batch.lock")
+
+GAP_PHRASE = "상담원 연결이 필요합니다"   # 지식 공백(답변 불가)으로 보는 문구
+MIN_MATCH_SCORE = 0.5                     # 이보다 낮으면 '미분류'
+UNKNOWN_CATEGORY = "미분류"
+UNKNOWN_DATE = "날짜미상"
+TAGGED_COLUMNS = ["timestamp", "date", "category", "match_score", "gap", "question"]
+
+
+def new_state():
+    return {
+        "offset": 0,            # 로그 파일에서 처리 완료한 바이트 위치
+        "header": None,
+        "head_bytes": "",       # 파일이 통째로 바뀌었는지 확인용 (앞부분)
+        "tagged_size": 0,       # tagged_questions.csv의 정상 크기 (중단 시 잘라내기용)
+        "pending": None,        # 답변을 아직 못 만난 마지막 사용자 질문
+        "messages": 0,
+        "daily": {},            # date -> {"questions", "answers", "gaps"}
+        "categories": {},       # category -> {"questions", "gaps"}
+        "updated_at": None,
+    }
+
+
+def load_state():
+    if os.path.exists(STATE_PATH):
+        with open(STATE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return new_state()
+
+
+def save_state(state):
+    tmp = f"{STATE_PATH}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp, STATE_PATH)
+
+
+# ==========================================
+# [함수] FAQ 카테고리 태깅 (LLM 호출 없음)
+# ==========================================
+class CategoryTagger:
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self._memo = {}
+
+    def tag(self, question):
+        if question not in self._memo:
+            hits = self.snapshot.faq_index.search(question, k=1, min_score=MIN_MATCH_SCORE)
+            if hits:
+                doc_id, score = hits[0]
+                category = self.snapshot.faq_entries[doc_id].get("category") or UNKNOWN_CATEGORY
+                self._memo[question] = (category, round(score, 3))
+            else:
+                self._memo[question] = (UNKNOWN_CATEGORY, 0.0)
+        return self._memo[question]
+
+
+# ==========================================
+# [함수] 증분 배치 실행
+# ==========================================
+def _bump(table, key, field, amount=1):
+    row = table.setdefault(key, {})
+    row[field] = row.get(field, 0) + amount
+
+
+def _read_new_rows(state, log_path):
+    size = os.path.getsize(log_path)
+    with open(log_path, "rb") as f:
+        head = f.read(256).hex()
+        known = state["head_bytes"]
+        n = min(len(head), len(known))
+        # 파일이 줄었거나 앞부분이 달라졌으면(새로 만들어진 DB) 처음부터 다시 처리
+        if size < state["offset"] or head[:n] != known[:n]:
+            return None, size
+        f.seek(state["offset"])
+        tail = f.read()
+
+    text = io.StringIO(tail.decode("utf-8-sig" if state["offset"] == 0 else "utf-8"), newline="")
+    reader = csv.reader(text)
+    if state["offset"] == 0:
+        state["header"] = next(reader, None)
+        state["head_bytes"] = head
+    return list(reader), size
+
+
+@contextmanager
+def _batch_lock():
+    # 여러 세션/프로세스가 동시에 배치를 돌리지 않도록 (offset 읽기 -> 처리 -> 상태 저장 전체를 잠금)
+    os.makedirs(OUT_DIR, exist_ok=True)
+    with open(LOCK_PATH, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def run_batch(log_path=LOG_PATH, snapshot=None, only_if_stale=False):
+    # only_if_stale=True 이면 잠금을 잡은 뒤 다시 확인해서, 다른 세션이 이미 처리했으면 건너뜀
+    with _batch_lock():
+        if only_if_stale and not is_stale(log_path):
+            return load_state(), 0
+        return _run_batch(log_path, snapshot)
+
+
+def _run_batch(log_path, snapshot):
+    state = load_state()
+    if not os.path.exists(log_path):
+        return state, 0
+
+    rows, size = _read_new_rows(state, log_path)
+    if rows is None:
+        state = new_state()
+        if os.path.exists(TAGGED_PATH):
+            os.remove(TAGGED_PATH)
+        rows, size = _read_new_rows(state, log_path)
+
+    # 지난 실행이 중간에 끊겼다면, 상태에 기록된 지점까지 결과 파일을 되돌립니다.
+    if os.path.exists(TAGGED_PATH) and os.path.getsize(TAGGED_PATH) != state["tagged_size"]:
+        with open(TAGGED_PATH, "r+b") as f:
+            f.truncate(state["tagged_size"])
+
+    header = state["header"] or ["role", "content", "timestamp"]
+    i_role, i_content, i_ts = (header.index(c) if c in header else None for c in ("role", "content", "timestamp"))
+    tagger = CategoryTagger(snapshot or get_active_snapshot())
+
+    tagged = []
+
+    def flush_pending(gap):
+        pending = state["pending"]
+        if pending is None:
+            return
+        category, score = tagger.tag(pending["question"])
+        tagged.append([pending["timestamp"], pending["date"], category, score, int(gap), pending["question"]])
+        _bump(state["categories"], category, "questions")
+        if gap:
+            _bump(state["daily"], pending["date"], "gaps")
+            _bump(state["categories"], category, "gaps")
+        state["pending"] = None
+
+    for row in rows:
+        if not row or i_role is None or i_content is None or len(row) <= max(i_role, i_content):
+            continue
+        role, content = row[i_role], row[i_content]
+        timestamp = row[i_ts] if i_ts is not None and len(row) > i_ts else "-"
+        date = timestamp[:10] if timestamp[:4].isdigit() else UNKNOWN_DATE
+        state["messages"] += 1
+
+        if role == "user":
+            flush_pending(gap=False)  # 답변 없이 끝난 이전 질문
+            state["pending"] = {"question": content.strip(), "timestamp": timestamp, "date": date}
+            _bump(state["daily"], date, "questions")
+        elif role == "assistant":
+            _bump(state["daily"], date, "answers")
+            flush_pending(gap=GAP_PHRASE in content)
+
+    if tagged:
+        write_header = not os.path.exists(TAGGED_PATH) or os.path.getsize(TAGGED_PATH) == 0
+        with open(TAGGED_PATH, "a", encoding="utf-8-sig" if write_header else "utf-8", newline="") as f:
+            writer = csv.writer(f)
+            if write_header:
+                writer.writerow(TAGGED_COLUMNS)
+            writer.writerows(tagged)
+
+    state["offset"] = size
+    state["tagged_size"] = os.path.getsize(TAGGED_PATH) if os.path.exists(TAGGED_PATH) else 0
+    state["updated_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+    save_state(state)
+    return state, len(rows)
+
+
+def is_stale(log_path=LOG_PATH):
+    # 마지막 실행 이후 로그에 새 메시지가 붙었는지 (파일 크기만 비교)
+    return os.path.exists(log_path) and os.path.getsize(log_path) != load_state()["offset"]
+
+
+# ==========================================
+# [함수] 결과 집계 (대시보드용)
+# ==========================================
+def daily_summary(state):
+    import pandas as pd
+    rows = [
+        {"날짜": date, "질문 수": v.get("questions", 0), "답변 수": v.get("answers", 0), "지식 공백": v.get("gaps", 0)}
+        for date, v in state["daily"].items()
+    ]
+    df = pd.DataFrame(rows, columns=["날짜", "질문 수", "답변 수", "지식 공백"])
+    df["공백률(%)"] = (df["지식 공백"] / df["질문 수"].where(df["질문 수"] > 0) * 100).round(1).fillna(0)
+    return df.sort_values("날짜")
+
+
+def category_summary(state):
+    import pandas as pd
+    rows = [
+        {"카테고리": cat, "질문 수": v.get("questions", 0), "지식 공백": v.get("gaps", 0)}
+        for cat, v in state["categories"].items()
+    ]
+    df = pd.DataFrame(rows, columns=["카테고리", "질문 수", "지식 공백"])
+    df["공백률(%)"] = (df["지식 공백"] / df["질문 수"].where(df["질문 수"] > 0) * 100).round(1).fillna(0)
+    return df.sort_values("질문 수", ascending=False)
+
+
+def load_gap_questions(limit=200):
+    import pandas as pd
+    if not os.path.exists(TAGGED_PATH):
+        return pd.DataFrame(columns=TAGGED_COLUMNS)
+    df = pd.read_csv(TAGGED_PATH, encoding="utf-8-sig")
+    return df[df["gap"] == 1].tail(limit).iloc[::-1]
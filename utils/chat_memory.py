@@ -0,0 +1,106 @@
+import re
+
+# ==========================================
+# [설정] 대화 메모리 토큰 예산
+# ==========================================
+# 최근 대화는 원문 그대로, 그보다 오래된 대화는 요약본으로만 프롬프트에 들어갑니다.
+HISTORY_TOKEN_BUDGET = 1500   # 원문으로 보내는 최근 대화의 최대 토큰
+HISTORY_KEEP_RATIO = 0.6      # 예산 초과 시 이 비율까지 줄이고 나머지는 요약으로 이동 (매 턴 요약 호출 방지)
+SUMMARY_TOKEN_BUDGET = 400    # 누적 요약본의 최대 토큰
+RENDER_WINDOW = 30            # 화면에 다시 그리는 최근 메시지 수
+
+_HANGUL = re.compile(r"[가-힣]")
+
+ROLE_LABELS = {"user": "사용자", "assistant": "상담원"}
+
+
+# ==========================================
+# [함수] 토큰 추정
+# ==========================================
+def estimate_tokens(text):
+    # 한글은 글자당 약 1토큰, 그 외(영문/숫자/공백)는 4글자당 약 1토큰으로 근사합니다.
+    text = str(text or "")
+    hangul = len(_HANGUL.findall(text))
+    return hangul + (len(text) - hangul) // 4 + 1
+
+
+def new_memory():
+    # summarized_upto: messages 중 요약본에 이미 반영된 마지막 위치(미포함)
+    return {"summary": "", "summarized_upto": 0}
+
+
+def format_turns(messages):
+    return "\n".join(f"{ROLE_LABELS.get(m['role'], m['role'])}: {m['content']}" for m in messages)
+
+
+def truncate_to_budget(text, budget):
+    # 요약 호출이 실패했을 때 쓰는 보조 수단: 앞부분(오래된 내용)부터 잘라 예산에 맞춥니다.
+    while text and estimate_tokens(text) > budget:
+        cut = max(1, len(text) // 10)
+        text = text[cut:]
+    return text
+
+
+# ==========================================
+# [함수] 최근 대화 창 / 누적 요약
+# ==========================================
+def recent_window_start(messages, start, budget=HISTORY_TOKEN_BUDGET):
+    # 뒤에서부터 예산이 허락하는 만큼 메시지를 담고, 원문 창의 시작 위치를 돌려줍니다.
+    used = 0
+    idx = len(messages)
+    while idx > start:
+        cost = estimate_tokens(messages[idx - 1]["content"])
+        if used + cost > budget:
+            break
+        used += cost
+        idx -= 1
+    return idx
+
+
+def update_memory(memory, history, summarize_fn):
+    # 원문 창에서 밀려난 대화만 기존 요약에 접어 넣습니다 (증분 갱신).
+    # summarize_fn(previous_summary, new_turns_text) -> 새 요약 문자열
+    start = memory["summarized_upto"]
+    if recent_window_start(history, start) == start:
+        return memory  # 아직 예산 안쪽이면 요약 호출 없음
+
+    cut = recent_window_start(history, start, int(HISTORY_TOKEN_BUDGET * HISTORY_KEEP_RATIO))
+    overflow = history[start:cut]
+    if not overflow:
+        return memory
+
+    new_turns = format_turns(overflow)
+    try:
+        summary = summarize_fn(memory["summary"], new_turns)
+    except Exception:
+        summary = f"{memory['summary']}\n{new_turns}".strip()
+
+    memory["summary"] = truncate_to_budget(summary.strip(), SUMMARY_TOKEN_BUDGET)
+    memory["summarized_upto"] = cut
+    return memory
+
+
+def build_summary_prompt(previous_summary, new_turns):
+    return f"""
+    아래는 고객 상담 대화의 기존 요약과 새로 추가된 대화입니다.
+    기존 요약에 새 대화를 반영하여, 고객의 상황/요청/이미 안내한 내용을 중심으로 5문장 이내로 다시 요약하세요.
+
+    [기존 요약]
+    {previous_summary or "(없음)"}
+
+    [새 대화]
+    {new_turns}
+    """
+
+
+def build_conversation_prompt(system_prompt, memory, history, user_input):
+    # history: 이번 질문을 제외한 이전 메시지 목록
+    recent = history[recent_window_start(history, memory["summarized_upto"]):]
+
+    parts = [system_prompt]
+    if memory["summary"]:
+        parts.append(f"[이전 대화 요약]\n{memory['summary']}")
+    if recent:
+        parts.append(f"[최근 대화]\n{format_turns(recent)}")
+    parts.append(f"사용자 질문: {user_input}")
+    return "\n\n".join(parts)
@@ -0,0 +1,119 @@
+import time
+import hashlib
+import threading
+
+from utils.chat_memory import update_memory, build_summary_prompt, build_conversation_prompt
+from utils.knowledge_store import get_active_snapshot
+from utils.llm_backend import CACHE_TTL_SECONDS
+
+# ==========================================
+# [설정] 프롬프트 구성
+# ==========================================
+FAQ_TOP_K = 5                     # 질문마다 함께 보내는 FAQ 개수
+CACHE_REFRESH_MARGIN = 5 * 60     # 만료 5분 전에 모델 측 캐시를 다시 등록
+CACHE_GRACE_SECONDS = 10 * 60     # 이전 지식 버전 캐시를 이만큼 안 쓰면 삭제
+MAX_CACHED_VERSIONS = 3           # 동시에 유지하는 지식 버전 캐시 수
+
+
+# ==========================================
+# [함수] 프롬프트 구성 (페이지/벤치마크 공용)
+# ==========================================
+def build_faq_context(question, snapshot, k=FAQ_TOP_K):
+    # 질문과 관련된 FAQ만 골라 보냅니다.
+    hits = snapshot.search_faq(question, k)
+    if not hits:
+        return ""
+    return "[관련 FAQ]\n" + "\n".join(f"Q: {h['question']} / A: {h['answer']}" for h in hits)
+
+
+def knowledge_version(static_prefix):
+    return hashlib.sha256(static_prefix.encode("utf-8")).hexdigest()[:16]
+
+
+# ==========================================
+# [클래스] 고정 접두부 캐시 관리
+# ==========================================
+class PromptCache:
+    # 지식 버전(고정 접두부 해시)마다 모델 측 캐시를 한 번만 등록해 둡니다.
+    # 관리자 업로드로 내용이 바뀌면 해시가 달라져 새로 등록되지만, 이전 버전 캐시는 바로 지우지 않고
+    # 한동안(GRACE) 쓰이지 않았을 때만 지웁니다. (이전 스냅샷으로 진행 중인 요청, 버전이 왔다 갔다 하는 경우 대비)
+
+    def __init__(self, ttl=CACHE_TTL_SECONDS, prefix="dsh-kb"):
+        self.ttl = ttl
+        self.prefix = prefix
+        self._lock = threading.Lock()       # 목록(_caches) 용 - 모델 API 호출 중에는 잡지 않음
+        self._caches = {}          # version -> {"cache", "created_at", "last_used"}
+        self._creating = {}        # version -> 등록이 끝나면 set 되는 Event (같은 버전은 한 번만 등록)
+        self.registrations = 0
+
+    def get(self, backend, static_prefix):
+        version = knowledge_version(static_prefix)
+        register = False
+        while True:
+            now = time.time()
+            with self._lock:
+                entry = self._caches.get(version)
+                fresh = entry is not None and now - entry["created_at"] < self.ttl - CACHE_REFRESH_MARGIN
+                usable = entry is not None and now - entry["created_at"] < self.ttl
+                creating = self._creating.get(version)
+                if fresh or (usable and creating is not None):
+                    # 새로 등록하는 중이면 아직 만료 전인 기존 캐시를 그대로 씀
+                    entry["last_used"] = now
+                    victims = self._evict(version, now)
+                    break
+                if creating is None:
+                    self._creating[version] = threading.Event()
+                    register = True
+                    break
+            creating.wait()   # 다른 요청이 처음 등록하는 중 -> 끝나면 다시 확인
+
+        if register:
+            # 만료가 가까운 캐시는 새로 등록하고, 이전 것은 모델 측 TTL 이 지나면 저절로 사라짐
+            try:
+                cache = backend.create_cache(f"{self.prefix}-{version}", static_prefix, self.ttl)
+            except BaseException:
+                with self._lock:
+                    self._creating.pop(version).set()
+                raise
+            with self._lock:
+                self._creating.pop(version).set()
+                entry = self._caches[version] = {"cache": cache, "created_at": now, "last_used": now}
+                self.registrations += 1
+                victims = self._evict(version, now)
+
+        # 오래된 버전 캐시 삭제도 잠금 밖에서 (느린 API 호출이 다른 세션을 막지 않도록)
+        for old in victims:
+            backend.delete_cache(old)
+        return entry["cache"]
+
+    def _evict(self, current, now):
+        # 지금 버전이 아니고 GRACE 동안 쓰이지 않은 캐시를 목록에서 빼고, 모델 측에서 지울 캐시를 돌려줌
+        # (TTL 이 지난 것은 모델 측에서 이미 사라졌으므로 목록에서만 뺌)
+        idle = sorted((e["last_used"], v) for v, e in self._caches.items() if v != current)
+        victims = []
+        for i, (last_used, version) in enumerate(idle):
+            entry = self._caches[version]
+            if now - entry["created_at"] >= self.ttl:
+                del self._caches[version]
+            elif now - last_used >= CACHE_GRACE_SECONDS or len(idle) - i > MAX_CACHED_VERSIONS - 1:
+                if entry["cache"]:
+                    victims.append(entry["cache"])
+                del self._caches[version]
+        return victims
+
+
+def answer_question(backend, memory, history, user_input, prompt_cache=None, snapshot=None):
+    # 페이지와 벤치마크가 같은 경로(프롬프트 구성 -> 메모리 -> 모델 호출)를 타도록 묶어둔 함수
+    # 요청 시작 시점의 지식 스냅샷을 끝까지 사용합니다. (도중에 새 버전이 적용돼도 섞이지 않음)
+    snapshot = snapshot or get_active_snapshot()
+    faq_context = build_faq_context(user_input, snapshot)
+    cache = prompt_cache.get(backend, snapshot.static_prefix) if prompt_cache else None
+
+    # 캐시가 등록됐으면 질문/관련 FAQ만, 아니면 고정 접두부까지 직접 붙여 보냅니다.
+    base = faq_context if cache else f"{snapshot.static_prefix}\n{faq_context}"
+    memory = update_memory(
+        memory, history,
+        lambda prev, turns: backend.generate(build_summary_prompt(prev, turns))
+    )
+    prompt = build_conversation_prompt(base, memory, history, user_input)
+    return backend.generate(prompt, cache), prompt
@@ -0,0 +1,96 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.export import export_menu
+
+# ==========================================
+# [설정] 서버 측 페이지 표 (공용 컴포넌트)
+# ==========================================
+# 전체 DataFrame은 서버에 두고, 검색/정렬 결과(행 위치 배열)만 세션에 캐시한 뒤
+# 지금 보고 있는 한 페이지만 브라우저로 보냅니다. 그래서 표가 500행이든 50만 행이든
+# 화면에 전송되는 양은 페이지 크기만큼으로 일정합니다.
+PAGE_SIZES = [25, 50, 100, 200]
+VIEW_CACHE_SIZE = 8          # 세션당 기억해 두는 검색/정렬 결과 수
+INDEX_LABEL = "(인덱스)"      # 정렬 기준으로 인덱스를 고를 때 표시 이름
+ROW_HEIGHT = 35              # st.dataframe 한 행 높이(px), 표 높이 계산용
+
+
+def _view_positions(df, token, query, column, sort_col, ascending):
+    # 검색 + 정렬을 적용한 행 위치 배열. 같은 조건이면 세션 캐시에서 바로 꺼냅니다.
+    cache = st.session_state.setdefault("_grid_views", OrderedDict())
+    key = (token, query, column, sort_col, ascending)
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+
+    positions = np.arange(len(df))
+    if query:
+        columns = [column] if column else list(df.columns)
+        mask = np.zeros(len(df), dtype=bool)
+        for c in columns:
+            mask |= df[c].astype(str).str.contains(query, case=False, regex=False, na=False).to_numpy()
+        positions = np.flatnonzero(mask)
+
+    if sort_col is not None and len(positions):
+        keys = df.index if sort_col == INDEX_LABEL else df[sort_col]
+        order = pd.Series(np.asarray(keys)[positions]).sort_values(
+            ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+        positions = positions[order]
+
+    cache[key] = positions
+    while len(cache) > VIEW_CACHE_SIZE:
+        cache.popitem(last=False)
+    return positions
+
+
+def data_grid(df, key, token, sort_by=None, ascending=False, page_size=50, show_index=False, export_name=None):
+    """큰 표를 페이지 단위로 보여줍니다. 돌려주는 값: 검색/정렬이 적용된 전체 결과 행 수
+
+    token 은 표 내용이 같은지 가리는 싼 값입니다. (데이터 버전 + 보기 조건, 파일 수정 시각 등 - 표를 해시하지 않음)
+    같은 token 을 쓰는 표끼리 검색/정렬 결과와 내보내기 파일을 함께 쓰므로 표마다 구분되게 줍니다.
+    sort_by 에 컬럼 이름(또는 INDEX_LABEL)을 주면 처음 열었을 때 그 기준으로 정렬합니다.
+    export_name 을 주면 지금 검색/정렬 상태 그대로 내보내기 메뉴를 붙입니다. (utils.export)
+    """
+    sort_options = ([INDEX_LABEL] if show_index else []) + [str(c) for c in df.columns]
+    columns_by_label = {str(c): c for c in df.columns}
+
+    c_query, c_col, c_sort, c_dir = st.columns([3, 2, 2, 1])
+    query = c_query.text_input("검색", key=f"{key}_q", placeholder="검색어 (대소문자 무시)").strip()
+    column_label = c_col.selectbox("검색 대상", ["전체 컬럼"] + [str(c) for c in df.columns], key=f"{key}_col")
+    sort_label = c_sort.selectbox("정렬 기준", ["(정렬 안 함)"] + sort_options, key=f"{key}_sort",
+                                  index=sort_options.index(sort_by) + 1 if sort_by in sort_options else 0)
+    descending = c_dir.toggle("내림차순", value=not ascending, key=f"{key}_desc")
+
+    column = columns_by_label.get(column_label)
+    sort_col = None if sort_label == "(정렬 안 함)" else columns_by_label.get(sort_label, sort_label)
+    positions = _view_positions(df, token, query, column, sort_col, not descending)
+
+    # 검색/정렬 조건이 바뀌면 첫 페이지로
+    view_key = (token, query, column, sort_col, descending)
+    if st.session_state.get(f"{key}_view") != view_key:
+        st.session_state[f"{key}_view"] = view_key
+        st.session_state[f"{key}_page"] = 1
+
+    total = len(positions)
+    c_info, c_size, c_page = st.columns([4, 1, 1])
+    size = c_size.selectbox("페이지당 행", PAGE_SIZES, key=f"{key}_size",
+                            index=PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 1)
+    pages = max(1, -(-total // size))
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages
+    page = c_page.number_input("페이지", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+
+    start = (page - 1) * size
+    page_df = df.iloc[positions[start:start + size]]
+    first = start + 1 if total else 0
+    c_info.caption(f"총 {total:,}행 중 {first:,}–{start + len(page_df):,}행 · {page}/{pages} 페이지")
+
+    st.dataframe(page_df, use_container_width=True, hide_index=not show_index,
+                 height=min(len(page_df) + 1, 21) * ROW_HEIGHT + 3)
+    if export_name:
+        export_menu(lambda: df.iloc[positions], export_name, key, filters=view_key[1:], token=token,
+                    index=show_index, rows=total)
+    return total
@@ -0,0 +1,206 @@
+import os
+import datetime
+
+import pandas as pd
+import streamlit as st
+
+from utils import anomaly
+from utils.cache_registry import budgeted_cache
+
+# ==========================================
+# [설정] 여러 페이지가 함께 쓰는 데이터 원본
+# ==========================================
+# 캐시 함수가 이 모듈 하나에만 있으므로, 랜딩 페이지에서 불러온 데이터를
+# 상세 페이지(01 일반CS / 02 가입자)가 그대로 재사용합니다. (반대도 마찬가지)
+# 오류는 여기서 화면에 찍지 않고 그대로 올려보내며, 보여주는 방식은 각 페이지가 정합니다.
+# 캐시는 용량 제한이 있는 utils.cache_registry 를 씁니다. (관리 페이지에서 크기/적중률 확인)
+CS_SHEET_URL = "https://docs.google.com/spreadsheets/d/1MQVn2jcKiHagQqUyyHR3ew9BLhD520Cv3UTwVMo5_6g/edit?usp=sharing"
+SIGNUP_SHEET_URL = "https://docs.google.com/spreadsheets/d/1gQ9kS_gVrcvDFA7cZEy6Ch5pSxRSbSwUaPX-ZwVUVV0/edit?usp=sharing"
+SIGNUP_WORKSHEET = '가입자_RAW_DATA(신규)'
+CS_SHEETS = {"관리부": "CS 접수기록(관리부)", "선생님": "CS 접수기록(선생님)"}
+SCOPE = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages")
+CHAT_LOG_PATH = os.path.join(PAGES_DIR, "chat_history_db.csv")
+SESSION_GAP_MINUTES = 30   # 사용자 질문 사이가 이보다 벌어지면 새 상담 세션으로 봅니다.
+DONE_STATUS = "처리완료"
+
+
+def _open_sheet(url):
+    # gspread는 불러오는 데 시간이 걸리므로 실제로 시트를 열 때 import 합니다.
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+
+    creds_dict = dict(st.secrets["gcp_service_account"])
+    creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, SCOPE)
+    return gspread.authorize(creds).open_by_url(url)
+
+
+def _stamp(df):
+    # 불러올 때 한 번만 내용 해시를 계산해 데이터 버전으로 붙여 둠 (캐시/디스크 캐시에도 같이 저장됨)
+    df.attrs["version"] = (len(df), int(pd.util.hash_pandas_object(df, index=False).sum()))
+    return df
+
+
+def data_version(df):
+    """load_cs_data / load_signup_data 결과의 데이터 버전 (화면을 다시 그릴 때마다 표를 해시하지 않도록)"""
+    if "version" not in df.attrs:
+        _stamp(df)
+    return df.attrs["version"]
+
+
+# ==========================================
+# [함수] 일반 CS 접수기록 (시트 이름별)
+# ==========================================
+@budgeted_cache(ttl=60, disk=True)
+def load_cs_data(target_sheet_name):
+    # 시트가 없으면 None, 내용이 없거나 형식이 맞지 않으면 빈 DataFrame
+    import gspread
+
+    sh = _open_sheet(CS_SHEET_URL)
+    try:
+        worksheet = sh.worksheet(target_sheet_name)
+    except gspread.exceptions.WorksheetNotFound:
+        return None
+
+    raw_data = worksheet.get_all_values()
+    if len(raw_data) < 5:
+        return pd.DataFrame()
+
+    # 5행 헤더, 6행 데이터
+    df = pd.DataFrame(raw_data[5:], columns=raw_data[4])
+    df.columns = df.columns.str.strip()
+
+    if '일시' in df.columns:
+        df = df[df['일시'].str.strip() != '']
+    else:
+        return pd.DataFrame()
+
+    # 날짜 변환 (점. 제거 및 변환)
+    for col_name in ('일시', '처리일'):
+        if col_name in df.columns:
+            df[col_name] = df[col_name].astype(str).str.replace('.', '-', regex=False)
+            df[col_name] = pd.to_datetime(df[col_name], errors='coerce')
+
+    df = df.dropna(subset=['일시'])
+
+    # 파생 변수
+    if '처리일' in df.columns:
+        df['체류시간'] = (df['처리일'] - df['일시']).dt.total_seconds() / (60 * 60 * 24)
+
+    day_map = {0: '월', 1: '화', 2: '수', 3: '목', 4: '금', 5: '토', 6: '일'}
+    df['요일'] = df['일시'].dt.dayofweek.map(day_map)
+    return _stamp(df)
+
+
+# ==========================================
+# [함수] 신규 가입자 RAW 데이터
+# ==========================================
+@budgeted_cache(ttl=60, disk=True)
+def load_signup_data():
+    data = _open_sheet(SIGNUP_SHEET_URL).worksheet(SIGNUP_WORKSHEET).get_all_values()
+    if len(data) < 2:
+        return pd.DataFrame()
+
+    # 중복 컬럼명 해결
+    seen_count = {}
+    new_header = []
+    for col_name in data[0]:
+        if col_name in seen_count:
+            seen_count[col_name] += 1
+            new_header.append(f"{col_name}_{seen_count[col_name]}")
+        else:
+            seen_count[col_name] = 0
+            new_header.append(col_name)
+
+    df = pd.DataFrame(data[1:], columns=new_header)
+
+    if '가입일' in df.columns:
+        df['가입일'] = pd.to_datetime(df['가입일'], errors='coerce')
+
+    if '소속' in df.columns:
+        df['소속'] = df['소속'].astype(str).str.strip()
+        df['소속'] = df['소속'].replace({
+            '대치': '대치점', '잠실': '잠실점', '서초': '서초점', '분당': '분당점'
+        })
+        df = df[~df['소속'].isin(['x', 'X'])]
+
+    if '학년' in df.columns:
+        df['학년'] = df['학년'].astype(str).str.strip()
+
+    return _stamp(df)
+
+
+# ==========================================
+# [함수] 챗봇 상담 로그 (CSV)
+# ==========================================
+@budgeted_cache(max_entries=1)
+def _read_chat_log(path, mtime):
+    # 파일 수정 시각(mtime)을 캐시 키에 넣어, 로그가 추가될 때만 다시 읽습니다. (이전 버전은 바로 버림)
+    df = pd.read_csv(path)
+    if "timestamp" in df.columns:
+        df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
+    return df
+
+
+def load_chat_log(path=CHAT_LOG_PATH):
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=["role", "content", "timestamp"])
+    return _read_chat_log(path, os.path.getmtime(path))
+
+
+def count_sessions(timestamps, gap_minutes=SESSION_GAP_MINUTES):
+    # 로그에 세션 ID가 없으므로, 사용자 질문 사이 간격이 gap_minutes를 넘으면 새 세션으로 셉니다.
+    ts = pd.Series(timestamps).dropna().sort_values()
+    if ts.empty:
+        return 0
+    return int((ts.diff() > pd.Timedelta(minutes=gap_minutes)).sum()) + 1
+
+
+# ==========================================
+# [함수] 랜딩 페이지 요약 지표
+# ==========================================
+def cs_anomalies(frames=None, today=None):
+    # 새로 불러온 데이터(데이터 버전이 바뀐 경우)일 때만 이상 감지 상태를 새로 끝난 날만큼 갱신하고,
+    # 현재 이상 목록을 돌려줍니다. 같은 버전이면 지난번 결과를 그대로 씀
+    if frames is None:
+        frames = {label: load_cs_data(sheet_name) for label, sheet_name in CS_SHEETS.items()}
+    frames = {label: df for label, df in frames.items() if df is not None}
+    return anomaly.sync(frames, today, {label: data_version(df) for label, df in frames.items()})
+
+
+def cs_summary(today=None):
+    today = today or datetime.date.today()
+    intake, unsolved = 0, 0
+    frames = {label: load_cs_data(sheet_name) for label, sheet_name in CS_SHEETS.items()}
+    for df in frames.values():
+        if df is None or df.empty:
+            continue
+        intake += int((df['일시'].dt.date == today).sum())
+        if '처리 상태' in df.columns:
+            unsolved += int((df['처리 상태'] != DONE_STATUS).sum())
+    return {"today": intake, "unsolved": unsolved, "anomalies": cs_anomalies(frames, today)}
+
+
+def signup_summary(today=None):
+    today = today or datetime.date.today()
+    df = load_signup_data()
+    if df.empty or '가입일' not in df.columns:
+        return {"month": 0, "total": len(df)}
+    joined = df['가입일'].dropna()
+    this_month = (joined.dt.year == today.year) & (joined.dt.month == today.month)
+    return {"month": int(this_month.sum()), "total": len(df)}
+
+
+def chatbot_summary(today=None):
+    today = today or datetime.date.today()
+    df = load_chat_log()
+    if df.empty or not {"role", "timestamp"} <= set(df.columns):
+        return {"today": 0, "total": 0, "questions_today": 0}
+    asked = df.loc[df["role"] == "user", "timestamp"].dropna()
+    asked_today = asked[asked.dt.date == today]
+    return {
+        "today": count_sessions(asked_today),
+        "total": count_sessions(asked),
+        "questions_today": len(asked_today),
+    }
@@ -0,0 +1,224 @@
+import os
+import time
+import uuid
+import atexit
+import pickle
+import sqlite3
+import hashlib
+import logging
+import threading
+
+# ==========================================
+# [설정] 디스크 캐시 (같은 서버의 여러 앱 프로세스가 함께 쓰는 2단계 캐시)
+# ==========================================
+# 프로세스마다 메모리 캐시(utils.cache_registry)를 따로 들고 있으면, 레플리카마다 같은 시트를 받고
+# 같은 모델을 학습합니다. 메모리 캐시에 없을 때 여기(SQLite 파일 하나)를 먼저 보고, 새로 계산한 결과는
+# 여기에도 써 둬서 같은 서버의 다른 프로세스가 꺼내 쓰게 합니다. 동시 읽기/쓰기는 SQLite(WAL) 잠금에 맡깁니다.
+# 키는 (함수 이름, 인자) 의 해시, 값은 pickle 입니다. 디스크 캐시 오류는 캐시 없음으로 취급합니다.
+# 읽기는 쓰기 트랜잭션을 열지 않습니다. 적중/미스 횟수와 마지막 사용 시각은 메모리에 모았다가
+# STATS_FLUSH_SECONDS 마다(또는 쓰기/요약 때) 한 번에 반영합니다. (사용 기록은 최선 노력 - 실패하면 버림)
+PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages")
+CACHE_DIR = os.environ.get("DISK_CACHE_DIR", os.path.join(PAGES_DIR, "disk_cache"))
+DB_PATH = os.path.join(CACHE_DIR, "cache.sqlite3")
+DEFAULT_BUDGET_MB = 512
+BUDGET_BYTES = int(float(os.environ.get("DISK_CACHE_MB", DEFAULT_BUDGET_MB)) * 1024 * 1024)
+ENABLED = os.environ.get("DISK_CACHE", "1") != "0"
+BUSY_TIMEOUT = 5.0      # 다른 프로세스가 쓰는 중일 때 기다리는 최대 시간(초)
+STATS_FLUSH_SECONDS = 10.0
+
+# 이 프로세스를 구분하는 값 (컨테이너마다 pid 가 같을 수 있어 임의 값을 붙임)
+PROCESS_ID = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY, name TEXT NOT NULL, value BLOB NOT NULL, size INTEGER NOT NULL,
+    writer TEXT NOT NULL, created REAL NOT NULL, last_access REAL NOT NULL, expires REAL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries(last_access);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY, hits INTEGER NOT NULL DEFAULT 0, cross_hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0, writes INTEGER NOT NULL DEFAULT 0,
+    evictions INTEGER NOT NULL DEFAULT 0, expired INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def disk_key(name, key):
+    # 프로세스가 달라도 같은 인자면 같은 키 (repr 기준)
+    return hashlib.sha256(repr((name, key)).encode("utf-8")).hexdigest()
+
+
+# ==========================================
+# [클래스] SQLite 디스크 캐시
+# ==========================================
+class DiskCache:
+
+    def __init__(self, path=DB_PATH, budget_bytes=BUDGET_BYTES):
+        self.path = path
+        self.budget_bytes = budget_bytes
+        self._local = threading.local()    # sqlite 연결은 스레드마다 따로
+        self._stats_lock = threading.Lock()
+        self._counts = {}                   # (함수 이름, 통계 컬럼) -> 아직 반영 안 한 횟수
+        self._touched = {}                  # 항목 키 -> [마지막 사용 시각, 아직 반영 안 한 적중 수]
+        self._flushed_at = time.time()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _count(conn, name, column, n=1):
+        conn.execute(f"INSERT INTO stats(name, {column}) VALUES (?, ?) "
+                     f"ON CONFLICT(name) DO UPDATE SET {column} = {column} + excluded.{column}", (name, n))
+
+    def _note(self, name, *columns, key=None, now=None):
+        # 통계는 메모리에만 더해 두고, 주기가 지났으면 한 번에 반영
+        with self._stats_lock:
+            for column in columns:
+                self._counts[(name, column)] = self._counts.get((name, column), 0) + 1
+            if key is not None:
+                touched = self._touched.setdefault(key, [now, 0])
+                touched[0], touched[1] = now, touched[1] + 1
+            due = time.time() - self._flushed_at >= STATS_FLUSH_SECONDS
+        if due:
+            self.flush()
+
+    def _take_stats(self):
+        with self._stats_lock:
+            counts, touched = self._counts, self._touched
+            self._counts, self._touched, self._flushed_at = {}, {}, time.time()
+        return counts, touched
+
+    def _write_stats(self, conn, counts, touched):
+        for (name, column), n in counts.items():
+            self._count(conn, name, column, n)
+        conn.executemany("UPDATE entries SET hits = hits + ?, last_access = MAX(last_access, ?) WHERE key = ?",
+                         [(hits, last, k) for k, (last, hits) in touched.items()])
+
+    def flush(self):
+        # 모아 둔 통계/사용 기록 반영. 잠금 대기 등으로 실패하면 그 기록은 버림 (캐시 동작에는 영향 없음)
+        counts, touched = self._take_stats()
+        if not counts and not touched:
+            return
+        try:
+            conn = self._conn()
+            with conn:
+                self._write_stats(conn, counts, touched)
+        except sqlite3.Error as e:
+            log.warning("disk cache stats flush failed: %s", e)
+
+    def get(self, name, key):
+        # (적중 여부, 값, 만료 시각) - 만료 시각은 메모리 캐시에 남은 TTL 만큼만 두려고 같이 돌려줌
+        # 읽기만 합니다. 만료된 항목은 다음 쓰기(_prune) 때 지워집니다.
+        if not ENABLED:
+            return False, None, None
+        k = disk_key(name, key)
+        now = time.time()
+        try:
+            row = self._conn().execute("SELECT value, writer, expires FROM entries WHERE key = ?", (k,)).fetchone()
+            if row is not None and row[2] is not None and row[2] < now:
+                self._note(name, "misses")   # expired 는 실제로 지울 때(_prune) 셈
+                return False, None, None
+            if row is None:
+                self._note(name, "misses")
+                return False, None, None
+            value = pickle.loads(row[0])
+            # 다른 프로세스가 계산해 둔 결과를 쓴 경우는 cross_hits 도 셈
+            self._note(name, "hits", *(["cross_hits"] if row[1] != PROCESS_ID else []), key=k, now=now)
+            return True, value, row[2]
+        except (sqlite3.Error, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError) as e:
+            log.warning("disk cache read failed (%s): %s", name, e)
+            return False, None, None
+
+    def put(self, name, key, value, ttl=None):
+        if not ENABLED:
+            return
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            log.warning("disk cache skipped unpicklable value (%s): %s", name, e)
+            return
+        if len(blob) > self.budget_bytes:
+            return   # 혼자서 예산을 넘는 값은 저장하지 않음
+        now = time.time()
+        counts, touched = self._take_stats()   # 쓰는 김에 모아 둔 통계도 같은 트랜잭션으로
+        try:
+            conn = self._conn()
+            with conn:
+                self._write_stats(conn, counts, touched)
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries(key, name, value, size, writer, created, last_access, expires) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (disk_key(name, key), name, blob, len(blob), PROCESS_ID, now, now, now + ttl if ttl else None))
+                self._count(conn, name, "writes")
+                self._prune(conn, now)
+        except sqlite3.Error as e:
+            log.warning("disk cache write failed (%s): %s", name, e)
+
+    def _prune(self, conn, now):
+        # 만료된 항목을 먼저 지우고, 그래도 예산을 넘으면 가장 오래 안 쓴 항목부터 삭제 (같은 트랜잭션 안)
+        for name, n in conn.execute("SELECT name, COUNT(*) FROM entries WHERE expires < ? GROUP BY name", (now,)).fetchall():
+            self._count(conn, name, "expired", n)
+        conn.execute("DELETE FROM entries WHERE expires < ?", (now,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.budget_bytes:
+            return
+        for k, name, size in conn.execute("SELECT key, name, size FROM entries ORDER BY last_access").fetchall():
+            if total <= self.budget_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (k,))
+            self._count(conn, name, "evictions")
+            total -= size
+
+    def clear(self, name=None):
+        try:
+            conn = self._conn()
+            with conn:
+                if name is None:
+                    conn.execute("DELETE FROM entries")
+                else:
+                    conn.execute("DELETE FROM entries WHERE name = ?", (name,))
+            conn.execute("VACUUM")
+        except sqlite3.Error as e:
+            log.warning("disk cache clear failed: %s", e)
+
+    def summary(self):
+        # 관리 화면용: 함수별 항목 수/크기 + 누적 적중(다른 프로세스가 쓴 결과 적중 포함)
+        self.flush()
+        try:
+            conn = self._conn()
+            sizes = {name: (count, size) for name, count, size in
+                     conn.execute("SELECT name, COUNT(*), SUM(size) FROM entries GROUP BY name")}
+            rows = []
+            for name, hits, cross, misses, writes, evictions, expired in conn.execute(
+                    "SELECT name, hits, cross_hits, misses, writes, evictions, expired FROM stats ORDER BY name"):
+                count, size = sizes.get(name, (0, 0))
+                calls = hits + misses
+                rows.append({"함수": name, "항목 수": count, "크기(bytes)": size or 0, "hits": hits,
+                             "cross_hits": cross, "misses": misses, "writes": writes,
+                             "evictions": evictions, "expired": expired,
+                             "적중률": hits / calls if calls else 0.0})
+            return rows
+        except sqlite3.Error as e:
+            log.warning("disk cache summary failed: %s", e)
+            return []
+
+    def total_bytes(self):
+        try:
+            return self._conn().execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+
+disk_cache = DiskCache()
+atexit.register(disk_cache.flush)   # 종료할 때 남은 통계 반영
@@ -0,0 +1,203 @@
+import os
+import hashlib
+import threading
+
+import pandas as pd
+import streamlit as st
+
+# ==========================================
+# [설정] 표 내보내기 (CSV / Excel / Parquet)
+# ==========================================
+# 다운로드 파일은 '파일 만들기'를 눌렀을 때만 만들고, (데이터 버전, 필터 상태, 형식)이 같으면
+# 디스크에 만들어 둔 파일을 그대로 다시 씁니다. 큰 표도 한 번에 메모리에 올리지 않도록
+# CSV/Excel은 CHUNK_ROWS 행씩 파일에 이어 쓰고, Parquet은 row group 단위로 씁니다.
+PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages")
+EXPORT_DIR = os.path.join(PAGES_DIR, "export_cache")
+CHUNK_ROWS = 50_000
+MAX_CACHE_BYTES = 200 * 1024 * 1024   # 내보내기 캐시 폴더 최대 크기 (넘으면 오래된 파일부터 삭제)
+
+FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def frame_token(df):
+    # 같은 내용의 표인지 확인하는 값 (호출하는 쪽에서 더 싼 값(파일 수정 시각 등)을 주면 그걸 씀)
+    try:
+        return (len(df), int(pd.util.hash_pandas_object(df, index=True).sum()))
+    except TypeError:
+        return (len(df), id(df))
+
+
+def export_key(token, filters, fmt, index):
+    raw = repr((token, filters, fmt, index, list(FORMATS))).encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()
+
+
+# ==========================================
+# [함수] 형식별 파일 쓰기 (조각 단위)
+# ==========================================
+def _chunks(df):
+    for start in range(0, max(len(df), 1), CHUNK_ROWS):
+        yield start, df.iloc[start:start + CHUNK_ROWS]
+
+
+def _write_csv(df, path):
+    # utf-8-sig: 엑셀에서 열어도 한글이 깨지지 않음 (BOM은 파일 맨 앞에 한 번만 써짐)
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        for start, chunk in _chunks(df):
+            chunk.to_csv(f, header=start == 0, index=False)
+
+
+def _excel_value(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.tz_localize(None).to_pydatetime() if value.tzinfo else value.to_pydatetime()
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    if hasattr(value, "item"):        # numpy 숫자
+        return value.item()
+    if hasattr(value, "isoformat"):   # date / datetime
+        return value
+    return str(value)
+
+
+def _write_xlsx(df, path):
+    # write_only 모드: 행을 하나씩 흘려 보내므로 표 전체를 엑셀 객체로 만들지 않음
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("data")
+    ws.append([str(c) for c in df.columns])
+    for _, chunk in _chunks(df):
+        for row in chunk.itertuples(index=False, name=None):
+            ws.append([_excel_value(v) for v in row])
+    wb.save(path)
+
+
+def _write_parquet(df, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # object 컬럼은 문자열로 고정해서 조각마다 스키마가 달라지지 않게 함 (row group = 조각 하나)
+    as_string = {c: "string" for c in df.columns if df[c].dtype == object}
+    writer = None
+    try:
+        for _, chunk in _chunks(df):
+            table = pa.Table.from_pandas(chunk.astype(as_string), preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+WRITERS = {"CSV": _write_csv, "Excel": _write_xlsx, "Parquet": _write_parquet}
+
+
+def write_export(df, fmt, key):
+    # 캐시 폴더에 파일을 만들고 경로를 돌려줍니다. (임시 파일에 쓴 뒤 이름 바꾸기)
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    path = export_path(key, fmt)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        WRITERS[fmt](df, tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    _prune()
+    return path
+
+
+def _prune():
+    # 다른 프로세스가 먼저 지운 파일은 건너뜀
+    sized = []
+    for n in os.listdir(EXPORT_DIR):
+        path = os.path.join(EXPORT_DIR, n)
+        if n.endswith(".tmp"):
+            continue
+        try:
+            sized.append((os.path.getmtime(path), os.path.getsize(path), path))
+        except FileNotFoundError:
+            continue
+    total = 0
+    for _, size, path in sorted(sized, reverse=True):
+        total += size
+        if total > MAX_CACHE_BYTES:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def export_path(key, fmt):
+    return os.path.join(EXPORT_DIR, f"{key}.{FORMATS[fmt][0]}")
+
+
+def cached_path(key, fmt):
+    path = export_path(key, fmt)
+    return path if os.path.exists(path) else None
+
+
+def _frame(df, index):
+    out = df() if callable(df) else df
+    return out.reset_index() if index else out
+
+
+def _prepare(state_key, df, fmt, cache_key, index):
+    # '파일 만들기' 콜백: 같은 조건의 파일이 없을 때만 만들고, 이 세션에 준비됨 표시
+    try:
+        if cached_path(cache_key, fmt) is None:
+            write_export(_frame(df, index), fmt, cache_key)
+        st.session_state[state_key] = cache_key
+    except ImportError as e:
+        st.session_state[f"{state_key}_error"] = f"{fmt} 형식에 필요한 패키지가 없습니다: {e.name}"
+
+
+def _read_export(df, fmt, cache_key, index):
+    # 다운로드를 누른 순간에만 파일을 읽음. 그사이 정리(_prune)로 지워졌으면 다시 만듦
+    try:
+        with open(export_path(cache_key, fmt), "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        with open(write_export(_frame(df, index), fmt, cache_key), "rb") as f:
+            return f.read()
+
+
+# ==========================================
+# [UI] 내보내기 메뉴 (모든 표 공용)
+# ==========================================
+def export_menu(df, name, key, token, filters=None, index=False, rows=None):
+    """표 옆에 붙이는 '📥 내보내기' 메뉴
+
+    name: 다운로드 파일 이름(확장자 제외), token: 데이터 버전 (데이터를 불러올 때 정해진 값처럼 싼 값),
+    filters: 지금 화면의 필터/정렬 상태 (캐시 키에 포함), index: 인덱스도 컬럼으로 내보낼지
+    df 대신 DataFrame을 돌려주는 함수를 주면 파일을 만들 때만 표를 만듭니다. (rows 필요)
+    다시 그릴 때는 표를 해시하거나 파일을 읽지 않고, '파일 만들기'/'다운로드'를 누를 때만 일합니다.
+    """
+    with st.popover("📥 내보내기"):
+        fmt = st.radio("형식", list(FORMATS), horizontal=True, key=f"{key}_export_fmt")
+        ext, mime = FORMATS[fmt]
+        cache_key = export_key(token, filters, fmt, index)
+        state_key = f"{key}_export_ready"
+
+        if st.session_state.get(state_key) != cache_key:
+            rows = len(df) if rows is None else rows
+            st.caption(f"{rows:,}행 · 버튼을 누르면 파일을 만듭니다. (같은 조건이면 다시 만들지 않음)")
+            st.button("파일 만들기", key=f"{key}_export_build", use_container_width=True,
+                      on_click=_prepare, args=(state_key, df, fmt, cache_key, index))
+            error = st.session_state.pop(f"{state_key}_error", None)
+            if error:
+                st.error(error)
+            return
+
+        st.download_button(
+            f"{fmt} 다운로드", lambda: _read_export(df, fmt, cache_key, index),
+            file_name=f"{name}.{ext}", mime=mime, key=f"{key}_export_dl",
+            use_container_width=True, on_click="ignore",
+        )
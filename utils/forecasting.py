@@ -0,0 +1,309 @@
+import os
+import time
+import hashlib
+import threading
+import logging
+import importlib.util
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from utils.cache_registry import registry
+
+# ==========================================
+# [설정] 일별 CS 건수 예측 모델 + 백테스트
+# ==========================================
+# Prophet 외에 가벼운 모델 3개를 같은 방식(rolling-origin)으로 평가해서,
+# 정확도와 학습 시간을 함께 비교합니다. 폴드 x 모델 조합은 여러 CPU 코어에서 동시에 돌립니다.
+SEASON = 7              # 주간 계절성 (일 단위)
+INTERVAL_Z = 1.28       # 예측 범위 80% (Prophet 기본 interval_width 와 같음)
+HORIZON = 14            # 백테스트 폴드마다 맞혀 볼 기간(일)
+FOLDS = 6               # 백테스트 폴드 수
+STEP = 7                # 폴드 사이 간격(일)
+MIN_TRAIN = 28          # 폴드 학습 구간 최소 길이(일)
+WEEKS = 8               # 요일 평균 모델이 보는 최근 주 수
+MIN_SECONDS = 0.05      # 초당 정확도 계산 시 학습 시간 하한 (너무 빠른 모델끼리는 정확도로 비교)
+SERIES_CACHE = "utils.forecasting.forecast_many"   # 시리즈별 예측 결과 캐시 이름 (cache_registry)
+SERIES_CACHE_TTL = 6 * 3600
+TASK_TIMEOUT = 120      # 작업 하나(폴드 x 모델, 시리즈 하나)를 기다리는 최대 시간(초)
+
+MODEL_LABELS = {
+    "seasonal_naive": "지난주 반복 (Seasonal naive)",
+    "weekday_mean": "요일 평균",
+    "ets": "지수평활 ETS (수준+요일)",
+    "prophet": "Prophet",
+}
+
+
+def daily_series(dates):
+    # 날짜 Series -> 빈 날짜는 0건으로 채운 일별 건수 Series (DatetimeIndex)
+    days = pd.to_datetime(pd.Series(dates)).dropna().dt.normalize()
+    if days.empty:
+        return pd.Series(dtype=float)
+    counts = days.value_counts().sort_index()
+    full = pd.date_range(counts.index.min(), counts.index.max(), freq="D")
+    return counts.reindex(full, fill_value=0).astype(float)
+
+
+def _interval(yhat, residuals):
+    std = float(np.std(residuals)) if len(residuals) else 0.0
+    yhat = np.clip(yhat, 0, None)
+    return yhat, np.clip(yhat - INTERVAL_Z * std, 0, None), yhat + INTERVAL_Z * std
+
+
+# ==========================================
+# [함수] 모델들: (start 날짜, 학습 값 배열, 예측 일수) -> (yhat, lower, upper)
+# ==========================================
+def seasonal_naive(start, y, horizon):
+    last = y[-SEASON:]
+    return _interval(np.resize(last, horizon), y[SEASON:] - y[:-SEASON])
+
+
+def weekday_mean(start, y, horizon):
+    n = len(y)
+    window = np.arange(max(0, n - WEEKS * SEASON), n)
+    means = np.array([y[window[window % SEASON == p]].mean() for p in range(SEASON)])
+    fitted = means[window % SEASON]
+    return _interval(means[(n + np.arange(horizon)) % SEASON], y[window] - fitted)
+
+
+def _ets_pass(y, alpha, gamma):
+    level = y[:SEASON].mean()
+    season = y[:SEASON] - level
+    errors = np.empty(len(y) - SEASON)
+    for t in range(SEASON, len(y)):
+        s = season[t % SEASON]
+        errors[t - SEASON] = y[t] - (level + s)
+        new_level = alpha * (y[t] - s) + (1 - alpha) * level
+        season[t % SEASON] = gamma * (y[t] - new_level) + (1 - gamma) * s
+        level = new_level
+    return level, season, errors
+
+
+def ets(start, y, horizon):
+    # 수준 + 요일 계절성(가법) 지수평활. alpha/gamma는 한 단계 예측 오차가 가장 작은 값으로 고름
+    best = None
+    for alpha in (0.1, 0.3, 0.5):
+        for gamma in (0.05, 0.2):
+            level, season, errors = _ets_pass(y, alpha, gamma)
+            sse = float(np.square(errors).sum())
+            if best is None or sse < best[0]:
+                best = (sse, level, season, errors)
+    _, level, season, errors = best
+    n = len(y)
+    return _interval(level + season[(n + np.arange(horizon)) % SEASON], errors)
+
+
+def prophet(start, y, horizon):
+    from prophet import Prophet
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+
+    history = pd.DataFrame({"ds": pd.date_range(start, periods=len(y), freq="D"), "y": y})
+    m = Prophet()
+    m.fit(history)
+    future = m.make_future_dataframe(periods=horizon, include_history=False)
+    forecast = m.predict(future)
+    return (np.clip(forecast["yhat"].to_numpy(), 0, None),
+            np.clip(forecast["yhat_lower"].to_numpy(), 0, None),
+            forecast["yhat_upper"].to_numpy())
+
+
+MODELS = {"seasonal_naive": seasonal_naive, "weekday_mean": weekday_mean, "ets": ets, "prophet": prophet}
+
+
+def available_models():
+    # prophet 은 설치돼 있을 때만 (import 하지 않고 확인만 함)
+    names = [n for n in MODELS if n != "prophet"]
+    if importlib.util.find_spec("prophet") is not None:
+        names.append("prophet")
+    return names
+
+
+def forecast(model, series, horizon=30):
+    # 예측 DataFrame(ds, yhat, yhat_lower, yhat_upper)과 학습+예측에 걸린 시간(초)
+    started = time.perf_counter()
+    yhat, lower, upper = MODELS[model](series.index[0], series.to_numpy(), horizon)
+    elapsed = time.perf_counter() - started
+    ds = pd.date_range(series.index[-1] + pd.Timedelta(days=1), periods=horizon, freq="D")
+    return pd.DataFrame({"ds": ds, "yhat": yhat, "yhat_lower": lower, "yhat_upper": upper}), elapsed
+
+
+# ==========================================
+# [함수] Rolling-origin 백테스트
+# ==========================================
+def fold_origins(n, horizon=HORIZON, folds=FOLDS, step=STEP, min_train=MIN_TRAIN):
+    # 학습 구간 끝 위치들 (뒤에서부터 step 간격), 학습 길이가 min_train 미만인 폴드는 제외
+    origins = [n - horizon - k * step for k in range(folds)]
+    return sorted(o for o in origins if o >= min_train)
+
+
+def _evaluate(model, start, train, actual):
+    # 프로세스 풀에서 실행됨: 폴드 하나 x 모델 하나
+    started = time.perf_counter()
+    try:
+        yhat, _, _ = MODELS[model](start, train, len(actual))
+    except Exception as e:
+        return {"model": model, "error": str(e)}
+    seconds = time.perf_counter() - started
+    errors = np.abs(actual - yhat)
+    nonzero = actual > 0   # 건수가 0인 날은 MAPE 계산에서 제외 (0으로 나눌 수 없음)
+    mape = float((errors[nonzero] / actual[nonzero]).mean()) if nonzero.any() else float("nan")
+    return {"model": model, "mae": float(errors.mean()), "mape": mape, "seconds": seconds}
+
+
+_pool_instance = None
+_pool_lock = threading.Lock()
+
+
+def _pool():
+    # 프로세스 풀은 한 번 만들어 계속 씁니다. (워커 기동 비용은 처음 한 번만)
+    # 스트림릿 서버는 스레드가 많아 fork 가 위험하므로 forkserver(없으면 spawn)로 워커를 만듭니다.
+    global _pool_instance
+    with _pool_lock:
+        if _pool_instance is None:
+            methods = multiprocessing.get_all_start_methods()
+            ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _pool_instance = ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=ctx)
+        return _pool_instance
+
+
+def _reset_pool(broken):
+    # 워커가 죽으면(예: 메모리 부족으로 강제 종료) 풀 전체가 BrokenProcessPool 이 되므로 새로 만듭니다.
+    global _pool_instance
+    with _pool_lock:
+        if _pool_instance is broken:
+            _pool_instance = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_all(calls):
+    """[(함수, 인자 튜플)] 을 프로세스 풀에서 동시에 실행하고, 같은 순서로 (결과 또는 예외) 목록을 돌려줍니다.
+
+    풀이 깨져 있으면 한 번 새로 만들어 다시 시도하고, TASK_TIMEOUT 안에 끝나지 않은 작업은 TimeoutError 로 둡니다.
+    """
+    if not calls:
+        return []
+    for attempt in range(2):
+        pool = _pool()
+        try:
+            futures = [pool.submit(fn, *args) for fn, args in calls]
+        except BrokenProcessPool:
+            _reset_pool(pool)
+            continue
+        deadline = time.monotonic() + TASK_TIMEOUT
+        results, broken = [], False
+        for future in futures:
+            try:
+                results.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+            except BrokenProcessPool as e:
+                broken = True
+                results.append(e)
+            except FutureTimeout:
+                future.cancel()
+                results.append(TimeoutError(f"{TASK_TIMEOUT}초 안에 끝나지 않았습니다."))
+            except Exception as e:
+                results.append(e)
+        if not broken:
+            return results
+        _reset_pool(pool)
+        if attempt == 1:
+            return results
+    return [BrokenProcessPool("프로세스 풀을 다시 만들 수 없습니다.") for _ in calls]
+
+
+def backtest(series, models=None, horizon=HORIZON, folds=FOLDS, step=STEP):
+    """모델별 평균 MAE / MAPE / 학습 시간(초)과 초당 정확도 리포트 (DataFrame, 좋은 순)"""
+    models = models or available_models()
+    y = series.to_numpy()
+    origins = fold_origins(len(y), horizon, folds, step)
+    if not origins:
+        return pd.DataFrame()
+
+    start = series.index[0]
+    calls = [(_evaluate, (m, start, y[:o], y[o:o + horizon])) for o in origins for m in models]
+    results = [r if isinstance(r, dict) else {"model": args[0], "error": str(r)}
+               for (_, args), r in zip(calls, _run_all(calls))]
+
+    rows = []
+    for model in models:
+        runs = [r for r in results if r["model"] == model and "error" not in r]
+        if not runs:
+            continue
+        mae = float(np.mean([r["mae"] for r in runs]))
+        mapes = [r["mape"] for r in runs if not np.isnan(r["mape"])]
+        seconds = float(np.mean([r["seconds"] for r in runs]))
+        rows.append({
+            "model": model, "모델": MODEL_LABELS[model], "MAE": mae,
+            "MAPE": float(np.mean(mapes)) if mapes else float("nan"),
+            "학습 시간(초)": seconds, "폴드 수": len(runs),
+            # 정확도(1/MAE)를 학습 시간으로 나눈 값: 클수록 같은 계산 시간에 더 정확함
+            "초당 정확도": (1 / max(mae, 1e-9)) / max(seconds, MIN_SECONDS),
+        })
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).sort_values("초당 정확도", ascending=False, ignore_index=True)
+
+
+def best_model(report):
+    return report["model"].iloc[0] if not report.empty else "ets"
+
+
+# ==========================================
+# [함수] 여러 시리즈 일괄 예측 (카테고리 / 부서별)
+# ==========================================
+def series_hash(model, series, horizon):
+    # 모델 + 시작일 + 예측 기간 + 값 배열이 같으면 같은 예측 -> 다시 학습하지 않음
+    head = f"{model}|{series.index[0]:%Y-%m-%d}|{horizon}|".encode("utf-8")
+    return hashlib.sha1(head + np.ascontiguousarray(series.to_numpy(dtype=float)).tobytes()).hexdigest()
+
+
+def _forecast_task(model, start, values, horizon):
+    # 프로세스 풀에서 실행됨: 시리즈 하나 학습 + 예측
+    return MODELS[model](start, values, horizon)
+
+
+def forecast_many(series_by_name, model, horizon=30):
+    """{이름: 일별 Series} 를 한꺼번에 예측합니다.
+
+    바뀌지 않은 시리즈는 캐시에서 꺼내고, 나머지만 프로세스 풀에 동시에 넣습니다.
+    돌려주는 값: ({이름: 예측 DataFrame}, {"fitted", "cached", "failed", "seconds"})
+    """
+    started = time.perf_counter()
+    results, failed, todo = {}, {}, {}
+    for name, series in series_by_name.items():
+        key = series_hash(model, series, horizon)
+        hit, cached = registry.get(SERIES_CACHE, key)
+        if hit:
+            results[name] = cached
+        else:
+            todo[name] = (key, series)
+
+    calls = [(_forecast_task, (model, s.index[0], s.to_numpy(dtype=float), horizon)) for _, s in todo.values()]
+    for (name, (key, series)), result in zip(todo.items(), _run_all(calls)):
+        if isinstance(result, Exception):
+            failed[name] = str(result) or type(result).__name__
+            continue
+        yhat, lower, upper = result
+        ds = pd.date_range(series.index[-1] + pd.Timedelta(days=1), periods=horizon, freq="D")
+        frame = pd.DataFrame({"ds": ds, "yhat": yhat, "yhat_lower": lower, "yhat_upper": upper})
+        registry.put(SERIES_CACHE, key, frame, ttl=SERIES_CACHE_TTL)
+        results[name] = frame
+
+    stats = {"fitted": len(todo) - len(failed), "cached": len(series_by_name) - len(todo),
+             "failed": failed, "seconds": time.perf_counter() - started}
+    return {name: results[name] for name in series_by_name if name in results}, stats
+
+
+def split_series(df, column, index, top=None):
+    # column 값별 일별 건수 시리즈 (index 날짜 범위 전체, 없는 날은 0). 건수 많은 순으로 top개
+    values = df[column].astype(str).str.strip()
+    days = df['일시'].dt.normalize()
+    mask = values != ''
+    table = pd.crosstab(days[mask], values[mask]).reindex(index, fill_value=0).astype(float)
+    order = table.sum().sort_values(ascending=False).index
+    if top:
+        order = order[:top]
+    return {name: table[name] for name in order}
@@ -0,0 +1,343 @@
+import os
+import json
+import time
+import random
+import hashlib
+import datetime
+import threading
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+
+# ==========================================
+# [설정] GA4 일자 파티션 캐시
+# ==========================================
+# 리포트 결과를 날짜별 파일로 저장해 두고, 이미 확정된 과거 날짜는 다시 조회하지 않습니다.
+# GA4는 최근 이틀치 수치가 계속 보정되므로 오늘/어제만 매번 다시 가져옵니다.
+#   ga4_cache/<리포트 이름>/2026-01-31.json
+PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages")
+CACHE_DIR = os.path.join(PAGES_DIR, "ga4_cache")
+REFRESH_DAYS = 2          # 오늘 포함, 매번 다시 조회하는 최근 일수
+PAGE_LIMIT = 100000       # run_report 한 번에 받는 최대 행 수
+BATCH_LIMIT = 5           # batchRunReports 한 번에 넣을 수 있는 최대 리포트 수 (API 제한)
+MAX_WORKERS = 4           # 동시에 보내는 배치 요청 수
+
+
+def report_spec(name, dimensions, metrics):
+    # 'date'는 파티션 기준이라 항상 첫 번째 차원으로 들어갑니다.
+    dims = ["date"] + [d for d in dimensions if d != "date"]
+    return {"name": name, "dimensions": dims, "metrics": list(metrics)}
+
+
+DAILY_USERS = report_spec("daily_users", ["date"], ["activeUsers"])
+
+# 대시보드 패널 구성 (이름 -> 리포트). 항목을 추가/삭제하면 패널에 그대로 반영됩니다.
+PANEL_REPORTS = {
+    "일별 활성 사용자": DAILY_USERS,
+    "소스/매체별 세션": report_spec("sessions_by_source", ["sessionSourceMedium"], ["sessions"]),
+    "페이지별 조회수": report_spec("views_by_page", ["pagePath"], ["screenPageViews"]),
+    "신규 vs 재방문": report_spec("new_vs_returning", ["newVsReturning"], ["activeUsers"]),
+    "이벤트": report_spec("events", ["eventName"], ["eventCount"]),
+}
+
+
+def create_client(fake=False):
+    if fake or os.environ.get("GA4_FAKE") == "1":
+        return FakeAnalyticsClient(latency=float(os.environ.get("GA4_FAKE_LATENCY", 0.3)))
+    from google.analytics.data_v1beta import BetaAnalyticsDataClient
+    return BetaAnalyticsDataClient()
+
+
+def build_request(property_id, spec, start, end, offset=0, fake=False):
+    fields = dict(
+        property=f"properties/{property_id}",
+        date_ranges=[{"start_date": start.isoformat(), "end_date": end.isoformat()}],
+        dimensions=[{"name": d} for d in spec["dimensions"]],
+        metrics=[{"name": m} for m in spec["metrics"]],
+        limit=PAGE_LIMIT,
+        offset=offset,
+    )
+    if fake:
+        return SimpleNamespace(**fields)
+    from google.analytics.data_v1beta.types import RunReportRequest
+    return RunReportRequest(**fields)
+
+
+def build_batch_request(property_id, requests, fake=False):
+    if fake:
+        return SimpleNamespace(property=f"properties/{property_id}", requests=requests)
+    from google.analytics.data_v1beta.types import BatchRunReportsRequest
+    return BatchRunReportsRequest(property=f"properties/{property_id}", requests=requests)
+
+
+def parse_rows(spec, response):
+    rows = []
+    for row in response.rows:
+        record = {d: v.value for d, v in zip(spec["dimensions"], row.dimension_values)}
+        raw_date = record["date"]
+        record["date"] = f"{raw_date[:4]}-{raw_date[4:6]}-{raw_date[6:]}"
+        for m, v in zip(spec["metrics"], row.metric_values):
+            record[m] = float(v.value) if "." in v.value else int(v.value)
+        rows.append(record)
+    return rows
+
+
+def is_fake(client):
+    return getattr(client, "is_fake", False)
+
+
+def run_paged(client, property_id, spec, start, end, offset=0, rows=None):
+    rows = rows or []
+    while True:
+        response = client.run_report(build_request(property_id, spec, start, end, offset, is_fake(client)))
+        rows += parse_rows(spec, response)
+        offset += len(response.rows)
+        if not response.rows or offset >= response.row_count:
+            return rows
+
+
+def split_batches(jobs, max_workers=MAX_WORKERS):
+    # 작업을 최대 BATCH_LIMIT개씩, 가능한 한 많은 배치로 고르게 나눠 동시에 보냅니다.
+    if not jobs:
+        return []
+    n_batches = min(len(jobs), max(-(-len(jobs) // BATCH_LIMIT), max_workers))
+    batches = [[] for _ in range(n_batches)]
+    for i, job in enumerate(jobs):
+        batches[i % n_batches].append(job)
+    return batches
+
+
+def run_batch(client, property_id, batch):
+    # batch: [(spec, start, end), ...] -> 같은 순서의 결과 행 목록
+    fake = is_fake(client)
+    requests = [build_request(property_id, spec, start, end, fake=fake) for spec, start, end in batch]
+    response = client.batch_run_reports(build_batch_request(property_id, requests, fake))
+    results = []
+    for (spec, start, end), report in zip(batch, response.reports):
+        rows = parse_rows(spec, report)
+        if report.row_count > len(report.rows):  # 한 번에 다 못 받은 큰 리포트는 이어서 페이지 조회
+            rows = run_paged(client, property_id, spec, start, end, len(report.rows), rows)
+        results.append(rows)
+    return results
+
+
+def contiguous_ranges(days):
+    # 조회가 필요한 날짜들을 연속 구간으로 묶어 요청 수를 줄입니다.
+    ranges = []
+    for day in sorted(days):
+        if ranges and day == ranges[-1][1] + datetime.timedelta(days=1):
+            ranges[-1][1] = day
+        else:
+            ranges.append([day, day])
+    return [tuple(r) for r in ranges]
+
+
+# ==========================================
+# [클래스] 일자 파티션 저장소
+# ==========================================
+class DailyReportStore:
+
+    def __init__(self, root=CACHE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _path(self, spec, day):
+        return os.path.join(self.root, spec["name"], f"{day.isoformat()}.json")
+
+    def has(self, spec, day):
+        return os.path.exists(self._path(spec, day))
+
+    def read(self, spec, day):
+        with open(self._path(spec, day), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def write(self, spec, day, rows):
+        path = self._path(spec, day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def missing_days(self, spec, start, end, today=None):
+        today = today or datetime.date.today()
+        refresh_from = today - datetime.timedelta(days=REFRESH_DAYS - 1)
+        day, missing = start, []
+        while day <= end:
+            if day >= refresh_from or not self.has(spec, day):
+                missing.append(day)
+            day += datetime.timedelta(days=1)
+        return missing
+
+    def _write_range(self, spec, start, end, rows):
+        # 구간 결과를 날짜별 파일로 나눠 저장합니다. (데이터 없는 날도 빈 파일로 저장)
+        by_day = {}
+        for row in rows:
+            by_day.setdefault(row["date"], []).append(row)
+        day = start
+        while day <= end:
+            self.write(spec, day, by_day.get(day.isoformat(), []))
+            day += datetime.timedelta(days=1)
+
+    def fetch(self, client, property_id, spec, days):
+        for start, end in contiguous_ranges(days):
+            self._write_range(spec, start, end, run_paged(client, property_id, spec, start, end))
+
+    def fetch_many(self, client, property_id, specs, start, end, today=None, max_workers=MAX_WORKERS):
+        # 여러 리포트의 빠진 구간을 batchRunReports로 묶고, 배치들은 스레드 풀에서 동시에 실행합니다.
+        # -> 패널 전체가 가장 느린 리포트 하나 정도의 시간 안에 채워집니다.
+        jobs = [
+            (spec, r_start, r_end)
+            for spec in specs
+            for r_start, r_end in contiguous_ranges(self.missing_days(spec, start, end, today))
+        ]
+        batches = split_batches(jobs, max_workers)
+        if batches:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as pool:
+                futures = [(batch, pool.submit(run_batch, client, property_id, batch)) for batch in batches]
+                for batch, future in futures:
+                    for (spec, r_start, r_end), rows in zip(batch, future.result()):
+                        self._write_range(spec, r_start, r_end, rows)
+        return len(jobs)
+
+    def read_range(self, spec, start, end):
+        rows, day = [], start
+        while day <= end:
+            rows += self.read(spec, day)
+            day += datetime.timedelta(days=1)
+        return rows
+
+    def load_range(self, client, property_id, spec, start, end, today=None):
+        with self._lock:
+            missing = self.missing_days(spec, start, end, today)
+            if missing:
+                self.fetch(client, property_id, spec, missing)
+        return self.read_range(spec, start, end), len(missing)
+
+    def load_panel(self, client, property_id, specs, start, end, today=None, max_workers=MAX_WORKERS):
+        # 모든 리포트를 하나의 긴(long) 형식 데이터로 합칩니다: report / date / dimension / value / metric / amount
+        with self._lock:
+            requests_made = self.fetch_many(client, property_id, specs, start, end, today, max_workers)
+        merged = []
+        for spec in specs:
+            dim = spec["dimensions"][1] if len(spec["dimensions"]) > 1 else None
+            for row in self.read_range(spec, start, end):
+                for metric in spec["metrics"]:
+                    merged.append({
+                        "report": spec["name"], "date": row["date"],
+                        "dimension": dim, "value": row.get(dim) if dim else None,
+                        "metric": metric, "amount": row[metric],
+                    })
+        return merged, requests_made
+
+
+# ==========================================
+# [함수] 실시간 리포트 (최근 30분)
+# ==========================================
+# Realtime API는 트래픽 소스(source/medium) 차원을 지원하지 않아, 유입 구분은 기기 유형으로 대신합니다.
+REALTIME_DIMENSIONS = {"페이지": "unifiedScreenName", "기기": "deviceCategory"}
+REALTIME_MINUTES = 30
+
+
+def build_realtime_request(property_id, dimension, fake=False):
+    fields = dict(
+        property=f"properties/{property_id}",
+        dimensions=[{"name": dimension}],
+        metrics=[{"name": "activeUsers"}],
+        minute_ranges=[{"start_minutes_ago": REALTIME_MINUTES - 1, "end_minutes_ago": 0}],
+    )
+    if fake:
+        return SimpleNamespace(**fields)
+    from google.analytics.data_v1beta.types import RunRealtimeReportRequest
+    return RunRealtimeReportRequest(**fields)
+
+
+def fetch_realtime(client, property_id):
+    # {"페이지": {값: 활성 사용자}, "기기": {...}} 형태로 돌려줍니다.
+    result = {}
+    for label, dimension in REALTIME_DIMENSIONS.items():
+        response = client.run_realtime_report(build_realtime_request(property_id, dimension, is_fake(client)))
+        result[label] = {
+            row.dimension_values[0].value: int(row.metric_values[0].value) for row in response.rows
+        }
+    return result
+
+
+def diff_counts(previous, current):
+    # 바뀐 항목만 골라냅니다: {값: (이전, 현재)}
+    previous = previous or {}
+    keys = set(previous) | set(current)
+    return {k: (previous.get(k, 0), current.get(k, 0)) for k in keys if previous.get(k, 0) != current.get(k, 0)}
+
+
+# ==========================================
+# [클래스] 오프라인 테스트용 가짜 GA4 클라이언트
+# ==========================================
+FAKE_VALUES = {
+    "sessionSourceMedium": ["google / organic", "naver / organic", "(direct) / (none)", "instagram / social", "kakao / referral"],
+    "pagePath": ["/", "/class", "/library", "/mypage", "/notice", "/event"],
+    "newVsReturning": ["new", "returning"],
+    "eventName": ["page_view", "session_start", "first_visit", "scroll", "click", "sign_up"],
+    "unifiedScreenName": ["독서화랑 홈", "클래스", "도서관", "마이페이지", "이벤트"],
+    "deviceCategory": ["mobile", "desktop", "tablet"],
+}
+
+
+class FakeAnalyticsClient:
+    # 실제 API와 같은 모양(rows/row_count/reports)의 응답을 결정적으로 만들어 줍니다.
+    is_fake = True
+
+    def __init__(self, latency=0.3, jitter=0.1):
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+
+    def _sleep(self):
+        self.calls += 1
+        time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+    @staticmethod
+    def _value(*parts):
+        digest = hashlib.md5("|".join(parts).encode("utf-8")).hexdigest()
+        return int(digest[:6], 16) % 500 + 10
+
+    def _report(self, request):
+        start = datetime.date.fromisoformat(request.date_ranges[0]["start_date"])
+        end = datetime.date.fromisoformat(request.date_ranges[0]["end_date"])
+        dims = [d["name"] for d in request.dimensions]
+        metrics = [m["name"] for m in request.metrics]
+        rows, day = [], start
+        while day <= end:
+            combos = [[]]
+            for dim in dims[1:]:
+                combos = [c + [v] for c in combos for v in FAKE_VALUES.get(dim, ["(not set)"])]
+            for combo in combos:
+                key = [day.isoformat()] + combo
+                rows.append(SimpleNamespace(
+                    dimension_values=[SimpleNamespace(value=v) for v in [day.strftime("%Y%m%d")] + combo],
+                    metric_values=[SimpleNamespace(value=str(self._value(m, *key))) for m in metrics],
+                ))
+            day += datetime.timedelta(days=1)
+        page = rows[request.offset:request.offset + request.limit]
+        return SimpleNamespace(rows=page, row_count=len(rows))
+
+    def run_report(self, request):
+        self._sleep()
+        return self._report(request)
+
+    def batch_run_reports(self, request):
+        self._sleep()
+        return SimpleNamespace(reports=[self._report(r) for r in request.requests])
+
+    def run_realtime_report(self, request):
+        # 분 단위로 값이 조금씩 바뀌도록 현재 시각(분)을 섞습니다.
+        self._sleep()
+        dim = request.dimensions[0]["name"]
+        minute = time.strftime("%Y%m%d%H%M")
+        rows = [
+            SimpleNamespace(
+                dimension_values=[SimpleNamespace(value=v)],
+                metric_values=[SimpleNamespace(value=str(self._value(minute[:-1], v) % 40))],
+            )
+            for v in FAKE_VALUES.get(dim, ["(not set)"])
+        ]
+        return SimpleNamespace(rows=rows, row_count=len(rows))
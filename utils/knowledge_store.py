@@ -0,0 +1,387 @@
+import io
+import os
+import re
+import json
+import time
+import fcntl
+import pickle
+import shutil
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from utils.retrieval import NgramIndex
+
+# ==========================================
+# [설정] 지식 스냅샷 저장소
+# ==========================================
+# 업로드된 지식 파일은 제자리에 덮어쓰지 않고, 검증/컴파일을 마친 뒤 새 버전 폴더로 만든 다음
+# CURRENT 포인터 파일만 원자적으로(os.replace) 바꿔 끼웁니다.
+#   kb_snapshots/
+#     CURRENT            -> "v0003"
+#     v0003/policy.md, faq.csv, persona.txt, compiled.pkl, manifest.json
+PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages")
+SNAPSHOT_DIR = os.path.join(PAGES_DIR, "kb_snapshots")
+POINTER_PATH = os.path.join(SNAPSHOT_DIR, "CURRENT")
+# 버전 번호 정하기 -> 만들기 -> 포인터 교체는 여러 프로세스(레플리카)가 겹치지 않도록 이 파일로 잠급니다.
+LOCK_NAME = "LOCK"
+
+# 스냅샷에 들어가는 지식 파일 (최초 버전은 pages/ 폴더의 기존 파일로 만듭니다)
+FILES = {
+    "policy": {"filename": "policy.md", "name": "운영 정책", "type": "md"},
+    "faq": {"filename": "faq.csv", "name": "FAQ DB", "type": "csv"},
+    "persona": {"filename": "persona.txt", "name": "페르소나", "type": "txt"}
+}
+SEED_PATHS = {key: os.path.join(PAGES_DIR, info["filename"]) for key, info in FILES.items()}
+
+MAX_UPLOAD_BYTES = 5 * 1024 * 1024
+KEEP_VERSIONS = 10                # 롤백용으로 보관하는 최근 버전 수
+KEEP_JOBS = 20                    # 화면에 보여주려고 기억하는 끝난 반영 작업 수
+
+DEFAULT_PERSONA = "당신은 '독서화랑'의 친절한 AI 상담원입니다."
+INSTRUCTIONS = """
+    [지시사항]
+    1. 위 지식 데이터와 함께 전달되는 [관련 FAQ]를 기반으로 답변하세요.
+    2. 지식에 없는 내용은 "죄송합니다, 상담원 연결이 필요합니다."라고 답하세요.
+    """
+
+
+class KnowledgeError(Exception):
+    pass
+
+
+# ==========================================
+# [함수] 파싱 / 검증
+# ==========================================
+def decode_text(raw):
+    try:
+        return raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return raw.decode("cp949")
+
+
+def read_faq(path_or_buffer):
+    try:
+        return pd.read_csv(path_or_buffer, encoding='utf-8')
+    except UnicodeDecodeError:
+        if hasattr(path_or_buffer, "seek"):
+            path_or_buffer.seek(0)
+        return pd.read_csv(path_or_buffer, encoding='cp949')
+
+
+def find_qa_columns(df):
+    q_col = next((c for c in df.columns if any(k in c for k in ['질문', 'Q'])), None)
+    a_col = next((c for c in df.columns if any(k in c for k in ['답변', 'A'])), None)
+    return q_col, a_col
+
+
+def validate_file(key, raw):
+    # 잘못된 업로드가 답변 품질을 떨어뜨리지 않도록, 스냅샷을 만들기 전에 막습니다.
+    if not raw:
+        raise KnowledgeError(f"{FILES[key]['name']} 파일이 비어 있습니다.")
+    if len(raw) > MAX_UPLOAD_BYTES:
+        raise KnowledgeError(f"{FILES[key]['name']} 파일이 너무 큽니다. (최대 {MAX_UPLOAD_BYTES // 1024 // 1024}MB)")
+
+    if key == "faq":
+        try:
+            df = read_faq(io.BytesIO(raw))
+        except Exception as e:
+            raise KnowledgeError(f"FAQ CSV를 읽을 수 없습니다: {e}")
+        q_col, a_col = find_qa_columns(df)
+        if not q_col or not a_col:
+            raise KnowledgeError("FAQ에 '질문'/'답변' 컬럼이 없습니다.")
+        if df[[q_col, a_col]].dropna().empty:
+            raise KnowledgeError("FAQ에 유효한 질문/답변 행이 없습니다.")
+    else:
+        try:
+            text = decode_text(raw)
+        except UnicodeDecodeError:
+            raise KnowledgeError(f"{FILES[key]['name']} 파일의 인코딩을 읽을 수 없습니다. (UTF-8 권장)")
+        if not text.strip():
+            raise KnowledgeError(f"{FILES[key]['name']} 파일에 내용이 없습니다.")
+
+
+# ==========================================
+# [함수] 컴파일 (FAQ 파싱 / 정책 청크 / 검색 색인 / 고정 접두부)
+# ==========================================
+def chunk_policy(policy):
+    # '## ' / '### ' 제목 단위로 정책 문서를 나눕니다.
+    chunks, current = [], []
+    for line in policy.splitlines():
+        if re.match(r"^#{2,3}\s", line) and current:
+            chunks.append("\n".join(current).strip())
+            current = []
+        current.append(line)
+    if current:
+        chunks.append("\n".join(current).strip())
+    return [c for c in chunks if c and c != "---"]
+
+
+def build_static_prefix(persona, policy):
+    # 요청마다 똑같은 부분(페르소나 + 운영 정책 + 지시사항) - 모델 측 캐시 대상
+    knowledge = f"\n[운영 정책]\n{policy}\n" if policy else ""
+    return f"""
+    {persona or DEFAULT_PERSONA}
+    [참고 지식 데이터]
+    {knowledge}
+    {INSTRUCTIONS}
+    """
+
+
+def compile_snapshot(folder):
+    texts = {}
+    for key, info in FILES.items():
+        path = os.path.join(folder, info["filename"])
+        if key != "faq" and os.path.exists(path):
+            with open(path, "rb") as f:
+                texts[key] = decode_text(f.read())
+
+    faq_entries, faq_index = [], NgramIndex()
+    faq_path = os.path.join(folder, FILES["faq"]["filename"])
+    if os.path.exists(faq_path):
+        df = read_faq(faq_path)
+        q_col, a_col = find_qa_columns(df)
+        if not q_col or not a_col:
+            raise KnowledgeError("FAQ에 '질문'/'답변' 컬럼이 없습니다.")
+        cat_col = "카테고리" if "카테고리" in df.columns else None
+        for q, a, cat in zip(df[q_col], df[a_col], df[cat_col] if cat_col else [None] * len(df)):
+            if pd.isna(q) or pd.isna(a):
+                continue
+            doc_id = len(faq_entries)
+            faq_entries.append({"question": str(q), "answer": str(a), "category": None if pd.isna(cat) else str(cat)})
+            faq_index.add(doc_id, f"{q} {q} {a}")  # 질문 쪽에 가중치
+
+    # 정책 전문은 고정 접두부에 그대로 들어가므로, 섹션은 관리 화면에 보여줄 개수만 셉니다.
+    return {
+        "static_prefix": build_static_prefix(texts.get("persona", ""), texts.get("policy", "")),
+        "faq_entries": faq_entries,
+        "faq_index": faq_index,
+        "policy_sections": len(chunk_policy(texts.get("policy", ""))),
+    }
+
+
+# ==========================================
+# [클래스] 불변 스냅샷
+# ==========================================
+class Snapshot:
+    # 한 번 만들어진 스냅샷은 바뀌지 않습니다. 요청은 시작할 때 잡은 스냅샷으로 끝까지 답변합니다.
+
+    def __init__(self, version, folder, manifest, compiled):
+        self.version = version
+        self.folder = folder
+        self.manifest = manifest
+        self.static_prefix = compiled["static_prefix"]
+        self.faq_entries = compiled["faq_entries"]
+        self.faq_index = compiled["faq_index"]
+
+    def path(self, key):
+        return os.path.join(self.folder, FILES[key]["filename"])
+
+    def search_faq(self, question, k):
+        return [self.faq_entries[doc_id] for doc_id, _ in self.faq_index.search(question, k=k)]
+
+
+# ==========================================
+# [클래스] 스냅샷 저장소
+# ==========================================
+class KnowledgeStore:
+
+    def __init__(self, root=SNAPSHOT_DIR):
+        self.root = root
+        self.pointer = os.path.join(root, "CURRENT")
+        self._lock = threading.RLock()
+        self._loaded = {}                 # version -> Snapshot (프로세스 내 캐시)
+        self._pointer_state = (None, None)  # (pointer mtime, version)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kb-build")
+        self.jobs = {}                    # job_id -> {"status", "message", "version", ...}
+        self._jobs_lock = threading.Lock()
+
+    # --- 버전 목록 / 포인터 ---
+    def versions(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root) if re.fullmatch(r"v\d{4,}", d))
+
+    def current_version(self):
+        try:
+            mtime = os.stat(self.pointer).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if self._pointer_state[0] != mtime:
+            with open(self.pointer, "r", encoding="utf-8") as f:
+                self._pointer_state = (mtime, f.read().strip())
+        return self._pointer_state[1]
+
+    def _write_pointer(self, version):
+        tmp = f"{self.pointer}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.pointer)  # 원자적 교체: 읽는 쪽은 항상 이전 또는 새 버전 중 하나만 봅니다.
+
+    @contextmanager
+    def _exclusive(self):
+        # 다른 프로세스와도 겹치지 않게 (버전 번호 -> 만들기 -> 포인터 교체 -> 정리 전체를 잠금)
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, LOCK_NAME), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _next_version(self):
+        existing = [int(v[1:]) for v in self.versions()]
+        return f"v{(max(existing) + 1 if existing else 1):04d}"
+
+    # --- 읽기 ---
+    def load(self, version):
+        snap = self._loaded.get(version)
+        if snap is None:
+            folder = os.path.join(self.root, version)
+            with open(os.path.join(folder, "manifest.json"), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            with open(os.path.join(folder, "compiled.pkl"), "rb") as f:
+                compiled = pickle.load(f)
+            snap = Snapshot(version, folder, manifest, compiled)
+            self._loaded[version] = snap
+        return snap
+
+    def active(self):
+        version = self.current_version()
+        if version is None:
+            version = self.bootstrap()
+        return self.load(version)
+
+    def bootstrap(self):
+        # 스냅샷이 하나도 없으면 pages/ 폴더의 기존 파일로 첫 버전을 만듭니다.
+        # 잠금을 잡은 뒤 다시 확인해서, 다른 프로세스가 먼저 만들었으면 그 버전을 씁니다.
+        with self._lock, self._exclusive():
+            version = self.current_version()
+            if version is None:
+                sources = {key: path for key, path in SEED_PATHS.items() if os.path.exists(path)}
+                for key, path in sources.items():
+                    with open(path, "rb") as f:
+                        try:
+                            validate_file(key, f.read())
+                        except KnowledgeError as e:
+                            raise KnowledgeError(f"초기 파일({FILES[key]['filename']})로 첫 버전을 만들 수 없습니다: {e}")
+                version = self._build(sources, {}, note="초기 파일에서 생성")
+                self._write_pointer(version)
+            return version
+
+    # --- 쓰기 ---
+    def _build(self, sources, uploads, note):
+        version = self._next_version()
+        final_dir = os.path.join(self.root, version)
+        staging = f"{final_dir}.building.{os.getpid()}"
+        os.makedirs(staging, exist_ok=True)
+        try:
+            for key, path in sources.items():
+                shutil.copy2(path, os.path.join(staging, FILES[key]["filename"]))
+            for key, raw in uploads.items():
+                with open(os.path.join(staging, FILES[key]["filename"]), "wb") as f:
+                    f.write(raw)
+
+            compiled = compile_snapshot(staging)
+            if not compiled["faq_entries"] and os.path.exists(os.path.join(staging, FILES["faq"]["filename"])):
+                raise KnowledgeError("FAQ 컴파일 결과가 비어 있습니다.")
+
+            with open(os.path.join(staging, "compiled.pkl"), "wb") as f:
+                pickle.dump(compiled, f)
+            manifest = {
+                "version": version,
+                "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "note": note,
+                "files": {key: FILES[key]["filename"] for key in list(sources) + list(uploads)},
+                "faq_count": len(compiled["faq_entries"]),
+                "policy_chunks": compiled["policy_sections"],
+            }
+            with open(os.path.join(staging, "manifest.json"), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+            os.replace(staging, final_dir)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return version
+
+    def submit_upload(self, key, raw):
+        # 검증은 즉시, 컴파일/교체는 백그라운드에서 진행합니다. 그동안 채팅은 현재 버전으로 계속 답변합니다.
+        validate_file(key, raw)
+        job_id = f"{key}-{time.time_ns()}"
+        with self._jobs_lock:
+            self.jobs[job_id] = {"status": "building", "key": key, "message": "컴파일 중", "version": None}
+            # 끝난 작업은 최근 KEEP_JOBS 개만 남김 (진행 중인 작업은 지우지 않음)
+            finished = [j for j, job in self.jobs.items() if job["status"] != "building"]
+            for j in finished[:-KEEP_JOBS]:
+                del self.jobs[j]
+        self._executor.submit(self._run_upload, job_id, key, raw)
+        return job_id
+
+    def recent_jobs(self, n=5):
+        with self._jobs_lock:
+            return [dict(job) for job in list(self.jobs.values())[-n:]]
+
+    def _run_upload(self, job_id, key, raw):
+        try:
+            self.active()  # 스냅샷이 없으면 먼저 만들어 둠 (bootstrap 이 따로 잠금)
+            with self._lock, self._exclusive():
+                base = self.load(self.current_version())
+                sources = {k: base.path(k) for k in FILES if k != key and os.path.exists(base.path(k))}
+                version = self._build(sources, {key: raw}, note=f"{FILES[key]['name']} 업로드 (기반 {base.version})")
+                self.load(version)  # 교체 전에 미리 올려두어 첫 요청이 기다리지 않게 함
+                self._write_pointer(version)
+                self._prune()
+            self.jobs[job_id].update(status="done", version=version, message=f"{version} 적용 완료")
+        except Exception as e:
+            self.jobs[job_id].update(status="failed", message=str(e))
+
+    def activate(self, version):
+        # 원클릭 롤백: 이미 컴파일된 버전으로 포인터만 되돌립니다.
+        if version not in self.versions():
+            raise KnowledgeError(f"존재하지 않는 버전입니다: {version}")
+        with self._lock, self._exclusive():
+            self.load(version)
+            self._write_pointer(version)
+
+    def previous_version(self):
+        versions, current = self.versions(), self.current_version()
+        if current in versions and versions.index(current) > 0:
+            return versions[versions.index(current) - 1]
+        return None
+
+    def manifests(self):
+        result = []
+        for version in reversed(self.versions()):
+            try:
+                with open(os.path.join(self.root, version, "manifest.json"), "r", encoding="utf-8") as f:
+                    result.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return result
+
+    def _prune(self):
+        current = self.current_version()
+        for version in self.versions()[:-KEEP_VERSIONS]:
+            if version != current:
+                shutil.rmtree(os.path.join(self.root, version), ignore_errors=True)
+                self._loaded.pop(version, None)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = KnowledgeStore()
+        return _store
+
+
+def get_active_snapshot():
+    return get_store().active()
@@ -0,0 +1,195 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+# ==========================================
+# [설정] 모델 백엔드 모드
+# ==========================================
+# live   : 실제 Gemini 호출
+# record : 실제 호출 + 요청/응답 쌍을 디스크(JSONL)에 기록
+# replay : 기록된 응답을 재생 (기록에 없으면 fake 답변)
+# fake   : 결정적(deterministic) 가짜 답변 + 설정 가능한 지연시간
+MODES = ["live", "record", "replay", "fake"]
+DEFAULT_MODEL = "gemini-2.5-flash"
+DEFAULT_RECORD_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages", "llm_recordings.jsonl"
+)
+CACHE_TTL_SECONDS = 60 * 60   # 모델 측 캐시 유지 시간 (만료 전 자동 재등록)
+
+
+def prompt_key(model_name, prompt, cache_key=None):
+    return hashlib.sha256(f"{model_name}\n{cache_key or ''}\n{prompt}".encode("utf-8")).hexdigest()
+
+
+def cache_key_of(cache):
+    return cache["key"] if cache else None
+
+
+# ==========================================
+# [클래스] 백엔드 구현
+# ==========================================
+class LiveBackend:
+    mode = "live"
+
+    def __init__(self, api_key, model_name=DEFAULT_MODEL):
+        import google.generativeai as genai  # 오프라인 모드에서는 불러오지 않음
+        genai.configure(api_key=api_key.strip())
+        self._genai = genai
+        self.model_name = model_name
+        self._model = genai.GenerativeModel(model_name)
+
+    def create_cache(self, key, static_prefix, ttl=CACHE_TTL_SECONDS):
+        # 고정 프롬프트(페르소나+정책)를 모델 측 Context Cache로 한 번만 등록합니다.
+        # 최소 토큰 수 미달 등으로 등록이 안 되면 None -> 호출 측에서 프롬프트에 직접 붙입니다.
+        import datetime
+        try:
+            cached = self._genai.caching.CachedContent.create(
+                model=f"models/{self.model_name}",
+                display_name=key[:60],
+                system_instruction=static_prefix,
+                ttl=datetime.timedelta(seconds=ttl),
+            )
+        except Exception:
+            return None
+        return {"key": key, "handle": cached, "model": self._genai.GenerativeModel.from_cached_content(cached)}
+
+    def delete_cache(self, cache):
+        try:
+            cache["handle"].delete()
+        except Exception:
+            pass
+
+    def generate(self, prompt, cache=None):
+        model = cache["model"] if cache else self._model
+        return model.generate_content(prompt).text
+
+
+class FakeBackend:
+    mode = "fake"
+
+    def __init__(self, latency=0.0, jitter=0.0, model_name=DEFAULT_MODEL, per_1k_chars=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.model_name = model_name
+        # 입력 길이에 비례하는 처리 시간(1,000자당 초) - 캐시 효과를 오프라인에서 재현하는 용도
+        self.per_1k_chars = per_1k_chars
+        self.caches = {}
+        self.input_chars = 0
+        self.cached_chars = 0
+
+    def create_cache(self, key, static_prefix, ttl=CACHE_TTL_SECONDS):
+        self.caches[key] = static_prefix
+        return {"key": key, "handle": key, "model": None}
+
+    def delete_cache(self, cache):
+        self.caches.pop(cache["key"], None)
+
+    def generate(self, prompt, cache=None):
+        key = prompt_key(self.model_name, prompt, cache_key_of(cache))
+        if cache:
+            self.cached_chars += len(self.caches.get(cache["key"], ""))
+        self.input_chars += len(prompt)
+        # 같은 프롬프트면 항상 같은 지연/답변이 나오도록 해시에서 값을 뽑습니다.
+        ratio = int(key[:8], 16) / 0xFFFFFFFF
+        delay = self.latency + self.jitter * (2 * ratio - 1) + self.per_1k_chars * len(prompt) / 1000
+        time.sleep(max(0.0, delay))
+        question = prompt.rsplit("사용자 질문:", 1)[-1].strip()[:80]
+        return f"[FAKE-{key[:8]}] '{question}' 문의에 대한 테스트 답변입니다."
+
+
+class RecordingBackend:
+    mode = "record"
+
+    def __init__(self, inner, path=DEFAULT_RECORD_PATH):
+        self.inner = inner
+        self.path = path
+        self.model_name = inner.model_name
+        self._lock = threading.Lock()
+
+    def create_cache(self, key, static_prefix, ttl=CACHE_TTL_SECONDS):
+        return self.inner.create_cache(key, static_prefix, ttl)
+
+    def delete_cache(self, cache):
+        self.inner.delete_cache(cache)
+
+    def generate(self, prompt, cache=None):
+        started = time.perf_counter()
+        response = self.inner.generate(prompt, cache)
+        record = {
+            "key": prompt_key(self.model_name, prompt, cache_key_of(cache)),
+            "model": self.model_name,
+            "cache_key": cache_key_of(cache),
+            "prompt": prompt,
+            "response": response,
+            "latency": round(time.perf_counter() - started, 4),
+            "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return response
+
+
+class ReplayBackend:
+    mode = "replay"
+
+    def __init__(self, path=DEFAULT_RECORD_PATH, fallback=None, use_recorded_latency=False,
+                 model_name=DEFAULT_MODEL):
+        self.model_name = model_name
+        self.fallback = fallback or FakeBackend(model_name=model_name)
+        self.use_recorded_latency = use_recorded_latency
+        self.hits = 0
+        self.misses = 0
+        self._records = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        rec = json.loads(line)
+                        self._records[rec["key"]] = rec
+
+    def create_cache(self, key, static_prefix, ttl=CACHE_TTL_SECONDS):
+        return self.fallback.create_cache(key, static_prefix, ttl)
+
+    def delete_cache(self, cache):
+        self.fallback.delete_cache(cache)
+
+    def generate(self, prompt, cache=None):
+        rec = self._records.get(prompt_key(self.model_name, prompt, cache_key_of(cache)))
+        if rec is None:
+            self.misses += 1
+            return self.fallback.generate(prompt, cache)
+        self.hits += 1
+        if self.use_recorded_latency:
+            time.sleep(rec.get("latency", 0))
+        return rec["response"]
+
+
+# ==========================================
+# [함수] 모드에 맞는 백엔드 생성
+# ==========================================
+def resolve_mode(default="live"):
+    mode = os.environ.get("CHATBOT_LLM_MODE", default).strip().lower()
+    if mode not in MODES:
+        raise ValueError(f"알 수 없는 CHATBOT_LLM_MODE: {mode} (가능: {', '.join(MODES)})")
+    return mode
+
+
+def get_backend(mode, api_key=None, model_name=DEFAULT_MODEL, record_path=DEFAULT_RECORD_PATH,
+                latency=None, jitter=None, per_1k_chars=None):
+    latency = float(os.environ.get("CHATBOT_FAKE_LATENCY", 0.0)) if latency is None else latency
+    jitter = float(os.environ.get("CHATBOT_FAKE_JITTER", 0.0)) if jitter is None else jitter
+    if per_1k_chars is None:
+        per_1k_chars = float(os.environ.get("CHATBOT_FAKE_PER_1K_CHARS", 0.0))
+
+    if mode == "live":
+        return LiveBackend(api_key, model_name)
+    if mode == "record":
+        return RecordingBackend(LiveBackend(api_key, model_name), record_path)
+    if mode == "replay":
+        fallback = FakeBackend(latency, jitter, model_name, per_1k_chars)
+        return ReplayBackend(record_path, fallback, model_name=model_name)
+    if mode == "fake":
+        return FakeBackend(latency, jitter, model_name, per_1k_chars)
+    raise ValueError(f"알 수 없는 모드: {mode}")
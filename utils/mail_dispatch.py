@@ -0,0 +1,281 @@
+import os
+import time
+import queue
+import socket
+import sqlite3
+import smtplib
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from email.message import EmailMessage
+from email.utils import make_msgid, formatdate
+
+# ==========================================
+# [설정] SMTP 발송
+# ==========================================
+# st.secrets["smtp"] 또는 환경변수(SMTP_HOST 등)로 설정합니다.
+# 로컬 테스트: python -m aiosmtpd -n -l localhost:1025  (받은 메일을 터미널에 출력)
+#   -> SMTP_HOST=localhost SMTP_PORT=1025 SMTP_STARTTLS=0
+PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages")
+SEND_LOG_PATH = os.path.join(PAGES_DIR, "mail_send_log.db")
+
+DEFAULT_CONFIG = {
+    "host": "localhost",
+    "port": 1025,
+    "username": "",
+    "password": "",
+    "starttls": False,
+    "sender": "독서화랑 클래스 <dsmycs001@gmail.com>",
+    "pool_size": 2,           # 유지하는 SMTP 연결 수 (= 동시에 보내는 수)
+    "rate_per_minute": 30,    # 분당 최대 발송 수
+    "batch_size": 20,         # 한 묶음으로 보내는 수 (묶음 사이에 진행 상황 표시)
+    "max_retries": 3,
+}
+
+TRANSIENT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, socket.timeout,
+                    ConnectionError, TimeoutError)
+
+
+def load_config(overrides=None):
+    config = dict(DEFAULT_CONFIG)
+    env_map = {"host": "SMTP_HOST", "port": "SMTP_PORT", "username": "SMTP_USERNAME",
+               "password": "SMTP_PASSWORD", "starttls": "SMTP_STARTTLS", "sender": "SMTP_SENDER"}
+    for key, env in env_map.items():
+        if os.environ.get(env):
+            config[key] = os.environ[env]
+    config.update({k: v for k, v in (overrides or {}).items() if v not in (None, "")})
+    config["port"] = int(config["port"])
+    config["starttls"] = str(config["starttls"]).lower() in ("1", "true", "yes")
+    return config
+
+
+def idempotency_key(template_title, recipient, subject, body):
+    # 같은 템플릿/받는사람/제목/본문이면 같은 키 -> 두 번 보내지 않음
+    return hashlib.sha256("\x1f".join([template_title, recipient.lower(), subject, body]).encode("utf-8")).hexdigest()
+
+
+# ==========================================
+# [클래스] 지속 연결 풀
+# ==========================================
+class SMTPPool:
+
+    def __init__(self, config):
+        self.config = config
+        self._idle = queue.Queue()
+        self._slots = threading.Semaphore(config["pool_size"])
+
+    def _connect(self):
+        conn = smtplib.SMTP(self.config["host"], self.config["port"], timeout=30)
+        conn.ehlo()
+        if self.config["starttls"]:
+            conn.starttls()
+            conn.ehlo()
+        if self.config["username"]:
+            conn.login(self.config["username"], self.config["password"])
+        return conn
+
+    @staticmethod
+    def _alive(conn):
+        try:
+            return conn.noop()[0] == 250
+        except smtplib.SMTPException:
+            return False
+        except OSError:
+            return False
+
+    @contextmanager
+    def connection(self):
+        # 쉬고 있는 연결을 재사용하고, 끊겼으면 새로 연결합니다.
+        self._slots.acquire()
+        conn = None
+        try:
+            try:
+                conn = self._idle.get_nowait()
+                if not self._alive(conn):
+                    self._discard(conn)
+                    conn = None
+            except queue.Empty:
+                pass
+            conn = conn or self._connect()
+            yield conn
+            self._idle.put(conn)
+        except Exception:
+            if conn is not None:
+                self._discard(conn)
+            raise
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        while not self._idle.empty():
+            self._discard(self._idle.get_nowait())
+
+
+# ==========================================
+# [클래스] 발송 속도 제한 (토큰 버킷)
+# ==========================================
+class RateLimiter:
+
+    def __init__(self, rate_per_minute, burst=1):
+        self.interval = 60.0 / max(rate_per_minute, 1)
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) / self.interval)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                time.sleep((1 - self.tokens) * self.interval)
+
+
+# ==========================================
+# [클래스] 발송 기록 (SQLite)
+# ==========================================
+class SendLog:
+
+    def __init__(self, path=SEND_LOG_PATH):
+        self.path = path
+        with self._db() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS sends (
+                    idempotency_key TEXT PRIMARY KEY,
+                    template TEXT, recipient TEXT, subject TEXT,
+                    status TEXT, attempts INTEGER DEFAULT 0, last_error TEXT,
+                    message_id TEXT, updated_at TEXT
+                )""")
+
+    def _db(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def status(self, key):
+        with self._db() as db:
+            row = db.execute("SELECT status FROM sends WHERE idempotency_key=?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def claim(self, key, item):
+        # SMTP 로 넘기기 전에 키를 'sending' 으로 선점합니다. 처음 보는 키이거나 지난번에 실패한 키만
+        # 선점되고(True), 이미 보냈거나 다른 세션이 보내는 중('sending')이면 False.
+        # 보내는 중에 프로세스가 죽으면 'sending' 으로 남아 다시 보내지 않습니다. (중복 발송보다 누락 확인이 안전)
+        with self._db() as db:
+            cur = db.execute("""
+                INSERT INTO sends (idempotency_key, template, recipient, subject, status, attempts, updated_at)
+                VALUES (?, ?, ?, ?, 'sending', 0, datetime('now', 'localtime'))
+                ON CONFLICT(idempotency_key) DO UPDATE SET
+                    status='sending', updated_at=excluded.updated_at
+                WHERE sends.status = 'failed'
+            """, (key, item["템플릿"], item["받는사람"], item["제목"]))
+            return cur.rowcount == 1
+
+    def record(self, key, item, status, attempts, error=None, message_id=None):
+        with self._db() as db:
+            db.execute("""
+                INSERT INTO sends (idempotency_key, template, recipient, subject, status, attempts, last_error, message_id, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, datetime('now', 'localtime'))
+                ON CONFLICT(idempotency_key) DO UPDATE SET
+                    status=excluded.status, attempts=sends.attempts + excluded.attempts,
+                    last_error=excluded.last_error, message_id=COALESCE(excluded.message_id, sends.message_id),
+                    updated_at=excluded.updated_at
+            """, (key, item["템플릿"], item["받는사람"], item["제목"], status, attempts, error, message_id))
+
+    def recent(self, limit=200):
+        with self._db() as db:
+            cur = db.execute("""SELECT updated_at, template, recipient, subject, status, attempts, last_error
+                                FROM sends ORDER BY updated_at DESC LIMIT ?""", (limit,))
+            columns = [c[0] for c in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+
+# ==========================================
+# [함수] 발송
+# ==========================================
+def build_message(item, sender, key):
+    msg = EmailMessage()
+    msg["From"] = sender
+    msg["To"] = item["받는사람"]
+    msg["Subject"] = item["제목"]
+    msg["Date"] = formatdate(localtime=True)
+    msg["Message-ID"] = make_msgid(idstring=key[:16])
+    msg["X-Idempotency-Key"] = key
+    msg.set_content(item["본문"])
+    return msg
+
+
+def send_one(pool, item, sender, key, max_retries):
+    # 일시적인 오류(연결 끊김, 4xx 응답)는 재시도, 영구 오류(5xx)는 바로 실패 처리
+    attempts, delay = 0, 1.0
+    while True:
+        attempts += 1
+        msg = build_message(item, sender, key)
+        try:
+            with pool.connection() as conn:
+                conn.send_message(msg)
+            return "sent", attempts, None, msg["Message-ID"]
+        except smtplib.SMTPResponseException as e:
+            transient = 400 <= e.smtp_code < 500
+            error = f"{e.smtp_code} {e.smtp_error!r}"
+        except smtplib.SMTPRecipientsRefused as e:
+            return "failed", attempts, f"수신 거부: {e.recipients}", None
+        except TRANSIENT_ERRORS as e:
+            transient, error = True, str(e)
+        except OSError as e:
+            # DNS 조회 실패(socket.gaierror), 연결 거부 등 네트워크 오류도 재시도 후 실패로 기록
+            transient, error = True, f"{type(e).__name__}: {e}"
+        except smtplib.SMTPException as e:
+            return "failed", attempts, f"{type(e).__name__}: {e}", None
+        if not transient or attempts > max_retries:
+            return "failed", attempts, error, None
+        time.sleep(delay)
+        delay *= 2
+
+
+def _send_claimed(pool, limiter, send_log, item, key, config):
+    limiter.acquire()
+    status, attempts, error, message_id = send_one(pool, item, config["sender"], key, config["max_retries"])
+    send_log.record(key, item, status, attempts, error, message_id)
+    return status
+
+
+def dispatch(items, config, send_log=None, on_progress=None):
+    # items: render_bulk 결과 목록. 이미 보냈거나 보내는 중인 메일(같은 키)은 건너뜁니다.
+    # 한 묶음 안에서는 연결 풀 크기만큼 동시에 보냅니다. (속도 제한은 모든 스레드 공용)
+    send_log = send_log or SendLog()
+    pool = SMTPPool(config)
+    limiter = RateLimiter(config["rate_per_minute"], burst=min(config["batch_size"], 5))
+    summary = {"sent": 0, "skipped": 0, "failed": 0, "no_recipient": 0}
+    try:
+        with ThreadPoolExecutor(max_workers=config["pool_size"]) as workers:
+            for start in range(0, len(items), config["batch_size"]):
+                futures = []
+                for item in items[start:start + config["batch_size"]]:
+                    if not item["받는사람"]:
+                        summary["no_recipient"] += 1
+                        continue
+                    key = idempotency_key(item["템플릿"], item["받는사람"], item["제목"], item["본문"])
+                    if not send_log.claim(key, item):
+                        summary["skipped"] += 1
+                        continue
+                    futures.append(workers.submit(_send_claimed, pool, limiter, send_log, item, key, config))
+                for future in futures:
+                    summary[future.result()] += 1
+                if on_progress:
+                    on_progress(min(start + config["batch_size"], len(items)), len(items), summary)
+    finally:
+        pool.close()
+    return summary
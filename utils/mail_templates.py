@@ -0,0 +1,426 @@
+import io
+import csv
+import string
+import zipfile
+import datetime
+import tempfile
+
+# ==========================================
+# [설정] 공통 정보 (모든 템플릿의 문의처)
+# ==========================================
+# 이 부분만 수정하면 모든 메일 템플릿의 문의처가 한 번에 변경됩니다.
+CONTACT_INFO = """[문의]
+서비스 문의: 사이트 하단 [이용문의] 클릭
+메일: dsmycs001@gmail.com
+전화: 02-593-9964"""
+
+DATE_FORMAT = '%Y.%m.%d'                       # 메일 본문에 들어가는 날짜 형식
+DATE_INPUT_FORMATS = ['%Y-%m-%d', '%Y.%m.%d', '%Y/%m/%d', '%Y%m%d']
+EMAIL_COLUMN = "이메일"                         # 일괄 생성 시 받는 사람 주소 컬럼 (선택)
+
+
+class TemplateError(Exception):
+    pass
+
+
+# ==========================================
+# [클래스] 입력 항목 / 미리 컴파일된 템플릿
+# ==========================================
+class Field:
+    # key: 본문 안의 {자리표시자}, column: 일괄 생성 CSV의 컬럼명, label: 화면 입력창 이름
+    def __init__(self, key, column, label, kind="text", required=True, default=""):
+        self.key = key
+        self.column = column
+        self.label = label
+        self.kind = kind            # text / textarea / date
+        self.required = required
+        self.default = default
+
+    def parse(self, raw):
+        # 일괄 생성용: CSV 셀 값을 검증하고 변환합니다. 문제가 있으면 TemplateError
+        if isinstance(raw, float) and raw != raw:  # NaN (빈 셀)
+            raw = ""
+        if self.kind == "date":
+            if isinstance(raw, (datetime.date, datetime.datetime)):
+                return raw
+            text = str(raw).strip()
+            if not text:
+                if self.required:
+                    raise TemplateError(f"'{self.column}' 값이 비어 있습니다.")
+                return None
+            for fmt in DATE_INPUT_FORMATS:
+                try:
+                    return datetime.datetime.strptime(text[:10], fmt).date()
+                except ValueError:
+                    continue
+            raise TemplateError(f"'{self.column}' 날짜 형식이 올바르지 않습니다: {text}")
+        text = str(raw if raw is not None else "").strip()
+        if not text:
+            if self.required and not self.default:
+                raise TemplateError(f"'{self.column}' 값이 비어 있습니다.")
+            text = self.default
+        return text
+
+
+F = Field
+
+
+class CompiledText:
+    # 문자열을 한 번만 파싱해서 (고정 문구, 자리표시자) 조각으로 들고 있다가 빠르게 채웁니다.
+    def __init__(self, source):
+        self.source = source
+        self.parts = [(literal, name) for literal, name, _, _ in string.Formatter().parse(source)]
+        self.names = {name for _, name in self.parts if name}
+
+    def render(self, values):
+        out = []
+        for literal, name in self.parts:
+            out.append(literal)
+            if name:
+                out.append(values[name])
+        return "".join(out)
+
+
+class MailTemplate:
+    def __init__(self, title, step_title, fields, checklist, subject, body,
+                 checklist_error=None, checklist_ok=None, checklist_title="📎 필수 첨부/확인 사항"):
+        self.title = title
+        self.step_title = step_title
+        self.fields = fields
+        self.checklist = checklist
+        self.checklist_title = checklist_title
+        self.checklist_error = checklist_error
+        self.checklist_ok = checklist_ok
+        self.subject = CompiledText(subject)
+        self.body = CompiledText(body)
+
+        # 등록 시점에 본문의 자리표시자와 선언된 입력 항목이 맞는지 확인
+        declared = {f.key for f in fields} | {"CONTACT_INFO"}
+        unknown = (self.subject.names | self.body.names) - declared
+        if unknown:
+            raise TemplateError(f"'{title}' 템플릿에 선언되지 않은 항목이 있습니다: {', '.join(sorted(unknown))}")
+
+    @property
+    def columns(self):
+        return [f.column for f in self.fields]
+
+    def render(self, values):
+        # values: {key: 값} -> (제목, 본문)
+        context = {"CONTACT_INFO": CONTACT_INFO}
+        for f in self.fields:
+            value = values.get(f.key, f.default)
+            if isinstance(value, (datetime.date, datetime.datetime)):
+                value = value.strftime(DATE_FORMAT)
+            context[f.key] = "" if value is None else str(value)
+        return self.subject.render(context), self.body.render(context)
+
+    def render_text(self, values):
+        # 화면 표시/복사용: 기존 메일 본문과 같은 '제목: ...' 형식
+        subject, body = self.render(values)
+        return f"제목: {subject}\n\n{body}"
+
+    def parse_row(self, row):
+        # 일괄 생성용: CSV 한 행을 검증 -> ({key: 값}, 오류 목록)
+        values, errors = {}, []
+        for f in self.fields:
+            try:
+                values[f.key] = f.parse(row.get(f.column, ""))
+            except TemplateError as e:
+                errors.append(str(e))
+        return values, errors
+
+    def sample_csv(self):
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(self.columns + [EMAIL_COLUMN])
+        writer.writerow([
+            "2026-03-02" if f.kind == "date" else (f.default.replace("\n", " ") or f"{f.column} 예시")
+            for f in self.fields
+        ] + ["teacher@example.com"])
+        return buf.getvalue().encode("utf-8-sig")
+
+
+# ==========================================
+# [설정] 템플릿 등록부 (발송 단계 순서)
+# ==========================================
+TEMPLATES = [
+    MailTemplate(
+        title='1. 체험 신청 확인 및 계정 생성',
+        step_title='📝 1단계: 체험 신청 확인',
+        fields=[
+            F('school', '학교명', '학교명 (예: 서울초)'),
+            F('teacher', '교사명', '교사명'),
+            F('start_date', '시작일', '시작일', kind='date'),
+            F('end_date', '종료일', '종료일', kind='date'),
+            F('admin_id', '관리자ID', '관리자 ID'),
+            F('admin_pw', '관리자PW', '관리자 PW'),
+        ],
+        checklist=[
+            '1. 서비스 홈페이지 링크',
+            '2. 서비스 소개 파일',
+            '3. (교사용/학생용)이용안내 매뉴얼',
+            '4. 퀵 매뉴얼 파일',
+            '5. 이용 확인서',
+        ],
+        checklist_error='⚠️ 필수 첨부파일 및 확인 사항을 모두 체크해 주세요.',
+        checklist_ok='✅ 첨부파일 및 확인 사항 체크 완료!',
+        subject='[독서화랑] {school} 체험 신청 감사 및 서비스 이용 안내',
+        body="""안녕하세요, {school} {teacher} 선생님!
+우리 아이들을 위한 똑똑한 독서 파트너, 독서화랑 클래스입니다.
+
+신청해주신 체험 서비스가 정상적으로 접수되었습니다. 원활한 체험을 위해 아래 정보를 확인해 주세요.
+
+[서비스 접속 정보]
+
+체험 기간: {start_date} ~ {end_date}
+접속 URL: [https://school.dmy.co.kr/teacher/]
+선생님 관리자 ID: {admin_id} / PW: {admin_pw}
+
+[이용 시 확인 사항]
+체험용 계정 정보는 종료 후 일괄 삭제됩니다.
+콘텐츠의 무단 복제 및 배포는 엄격히 금지됩니다.
+체험 종료 후 간단한 피드백(설문)에 협조 부탁드립니다.
+
+아이들이 독서의 즐거움을 느끼고 선생님의 수업이 더 편리해질 수 있도록 최선을 다하겠습니다. 감사합니다.
+
+{CONTACT_INFO}""",
+    ),
+    MailTemplate(
+        title='2. 미응답 메세지 재발송',
+        step_title='📝 2단계: 미응답 리마인드',
+        fields=[
+            F('teacher', '교사명', '교사명'),
+            F('title_idea', '제목', '제목 입력 (예: 체험 안내 메일 확인 부탁드립니다 😊)', default='체험 안내 메일 확인 부탁드립니다 😊'),
+            F('link', '신청내용링크', '신청 내용 다시보기 링크'),
+        ],
+        checklist=[],
+        checklist_error=None,
+        checklist_ok=None,
+        subject='[독서화랑 클래스] {title_idea}',
+        body="""안녕하세요, {teacher} 선생님! 며칠 전 보내드린 체험 안내 메일을 혹시 놓치셨을까 하여 짧게 문자 남깁니다. 😊
+
+혹시 메일을 받지 못하셨거나 접속에 어려움이 있으시다면 언제든 답장이나 아래 링크로 말씀해 주세요. 바로 다시 안내해 드리겠습니다!
+
+신청 내용 다시보기: [{link}]
+
+{CONTACT_INFO}""",
+    ),
+    MailTemplate(
+        title='3. 체험 중간 설문 메세지',
+        step_title='📝 3단계: 중간 점검 설문',
+        fields=[
+            F('teacher', '교사명', '교사명'),
+            F('survey_link', '설문링크', '설문 링크 URL'),
+        ],
+        checklist=[],
+        checklist_error=None,
+        checklist_ok=None,
+        subject='[독서화랑] 선생님, 아이들과의 체험은 어떠신가요?',
+        body="""안녕하세요, {teacher} 선생님! 독서화랑 클래스와 함께하는 독서 시간이 아이들에게 즐거운 경험이 되고 있는지 궁금합니다. 😊
+
+이용 중 불편한 점은 없으셨나요? 
+더 나은 서비스를 위해 짧은 [중간 점검 설문]을 준비했습니다. 1분만 시간을 내어 주시면 큰 도움이 되겠습니다.
+
+중간 설문조사: [{survey_link}]
+
+{CONTACT_INFO}""",
+    ),
+    MailTemplate(
+        title='4. 계약 전환 상담',
+        step_title='📝 4단계: 계약 전환 유도',
+        fields=[
+            F('teacher', '교사명', '교사명'),
+            F('end_date', '종료일', '체험 종료일', kind='date'),
+            F('benefits', '혜택', '🎁 정규 전환 특별 혜택 (직접 입력)', kind='textarea', default='1. 전교생 대상 독서 리포트 무료 제공\n2. 연간 결제 시 1개월 추가 혜택'),
+        ],
+        checklist=[
+            '1. 정규 도입 제안서',
+        ],
+        checklist_error='⚠️ 필수 첨부파일(정규 도입 제안서)을 체크해 주세요.',
+        checklist_ok='✅ 첨부파일 확인 완료!',
+        subject='[독서화랑] 체험 종료 및 정규 도입 혜택 안내',
+        body="""안녕하세요, {teacher} 선생님.
+아이들과 함께한 체험이 {end_date}에 만료될 예정입니다. 
+지금의 독서 습관을 정규 과정으로 이어가실 수 있도록 특별 혜택을 안내해 드립니다.
+
+🎁 정규 전환 특별 혜택
+{benefits}
+
+아이들의 독서 근육이 튼튼해질 수 있도록 끝까지 함께하겠습니다. 감사합니다.
+
+{CONTACT_INFO}""",
+    ),
+    MailTemplate(
+        title='5. 견적서 발행',
+        step_title='📝 5단계: 견적서 송부',
+        fields=[
+            F('school', '학교명', '학교명/기관명'),
+            F('teacher', '교사명', '교사명/담당자명'),
+            F('core_benefits', '핵심혜택', '독서화랑 클래스만의 핵심 혜택 (선택사항)', kind='textarea', required=False),
+        ],
+        checklist=[
+            '1. 독서화랑 class 견적서',
+        ],
+        checklist_error='⚠️ 필수 첨부파일(독서화랑 class 견적서)을 체크해 주세요.',
+        checklist_ok='✅ 첨부파일 확인 완료!',
+        subject='[독서화랑] {school} 온라인 독서 클래스 도입 견적서 및 행정 서류 송부',
+        body="""안녕하세요, {teacher} 선생님! (혹은 담당자님)
+우리 아이들을 위한 똑똑한 독서 파트너, 독서화랑 클래스 마케팅팀입니다.
+
+문의하신 서비스 도입을 위해 필요한 견적서와 관련 행정 서류를 준비하여 보내드립니다. 독서화랑 클래스는 단순한 도서 제공을 넘어, 선생님의 수업 편의성과 아이들의 독서 역량 강화를 최우선으로 생각합니다.
+
+1. 송부 서류 리스트
+독서화랑 class 견적서 1부
+
+2. 독서화랑 클래스만의 핵심 혜택
+{core_benefits}
+
+3. 안내 사항
+본 견적서의 유효기간은 발행일로부터 30일입니다.
+추가 서류가 필요하신 경우 말씀해 주시면 즉시 재발행해 드리겠습니다.
+
+검토 후 도입 의사를 밝혀주시면 정식 계약 절차와 계정 발급을 신속히 진행하도록 하겠습니다. 
+
+아이들이 책과 더 가까워지는 즐거운 변화를 독서화랑이 함께하겠습니다.
+
+감사합니다.
+
+{CONTACT_INFO}""",
+    ),
+    MailTemplate(
+        title='6. 계약의사 확인 후 계약서 송부',
+        step_title='📝 6단계: 계약 서류 송부',
+        fields=[
+            F('school', '학교명', '학교명/기관명'),
+            F('teacher', '교사명', '교사명/담당자명'),
+            F('core_benefits', '핵심혜택', '독서화랑 클래스만의 핵심 혜택 (선택사항)', kind='textarea', required=False),
+        ],
+        checklist=[
+            '1. 계약서',
+            '2. 견적서(최종)',
+            '3. 사업자등록증',
+            '4. 통장사본',
+        ],
+        checklist_title="📎 필수 첨부/확인 사항 [수의계약]",
+        checklist_error='⚠️ 수의계약에 필요한 4가지 서류를 모두 체크해 주세요.',
+        checklist_ok='✅ 첨부파일 확인 완료!',
+        subject='[독서화랑] {school} 정식 도입 관련 계약 서류 및 행정 증빙 자료 송부',
+        body="""안녕하세요, {teacher} 선생님!
+우리 아이들을 위한 똑똑한 독서 파트너, 독서화랑 클래스 마케팅팀입니다.
+
+독서화랑 클래스 도입을 결정해 주셔서 진심으로 감사드립니다. 
+원활한 행정 처리를 위해 {teacher}께서 결재 및 계약 시 필요한 서류 일체를 준비하여 보내드립니다.
+
+1. 송부 서류 리스트
+독서화랑 클래스 이용 계약서(공식) 1부
+사업자등록증 사본 1부
+통장 사본(입금 계좌 확인용) 1부
+최종 견적서(확정 수량 반영) 1부
+
+2. 독서화랑 클래스만의 핵심 혜택
+{core_benefits}
+
+3. 향후 진행 절차 안내
+계약 체결: 보내드린 계약서에 날인하여 회신 주시거나, 학교장터(S2B) 혹은 나라장터를 통한 전자 계약 번호를 알려주시면 즉시 응찰하겠습니다.
+세금계산서 발행: 서비스 개시 시점에 맞춰 행정실(정산 담당자)과 협의하여 발행해 드릴 예정입니다.
+
+문의 사항: 추가로 필요한 행정 서류(등기부등본, 완납증명서 등)가 있으시면 언제든 말씀해 주세요.
+
+아이들이 책 읽는 즐거움을 발견하는 의미 있는 시간이 되도록 정성을 다해 준비하겠습니다.
+
+감사합니다.
+
+{CONTACT_INFO}""",
+    ),
+    MailTemplate(
+        title='7. 계정 생성 및 정규 서비스 개시 안내',
+        step_title='📝 7단계: 정규 서비스 개시',
+        fields=[
+            F('school', '학교명', '학교명'),
+            F('teacher', '교사명', '관리 교사명'),
+            F('start_date', '시작일', '이용 시작일', kind='date'),
+            F('end_date', '종료일', '이용 종료일', kind='date'),
+            F('admin_id', '관리자ID', '발급 ID'),
+            F('admin_pw', '관리자PW', '발급 PW'),
+        ],
+        checklist=[
+            '1. 교사용 ID/PW',
+            '2. 서비스 URL: [독서화랑 클래스 접속 링크]',
+            '3. (교사용/학생용)이용안내 매뉴얼',
+            '4. 세금 계산서',
+        ],
+        checklist_error='⚠️ 필수 첨부파일 및 확인 사항을 모두 체크해 주세요.',
+        checklist_ok='✅ 첨부파일 및 정보 확인 완료!',
+        subject='[독서화랑] {school} 정규 서비스 개시 안내 및 정산 서류(세금계산서) 재송부',
+        body="""안녕하세요, {teacher} 선생님!
+우리 아이들을 위한 똑똑한 독서 파트너, 독서화랑 클래스입니다.
+
+{school}의 정식 도입을 다시 한번 진심으로 환영합니다. 
+요청하신 정산 절차가 모두 마무리됨에 따라, 정규 클래스 접속 정보와 행정 서류를 최종 안내해 드립니다.
+
+1. 서비스 이용 및 관리자 계정 정보
+서비스 URL: https://school.dmy.co.kr/teacher/
+이용 기간: {start_date} ~ {end_date}
+관리 교사 계정: ID: {admin_id} / PW: {admin_pw}
+
+2. 정산 완료 및 행정 서류 안내
+세금계산서: 협의된 정산 일정에 따라 발행된 전자세금계산서를 본 메일에 동봉합니다. (또는 행정실에도 별도 전달되었습니다.)
+
+첨부 서류: 1. 독서화랑 클래스 학생용/교사용 이용 매뉴얼 2. 학생용 접속 가이드 3. 정산 증빙 서류
+
+3. [특별 지원] 서비스 교육 지원 
+선생님께서 클래스를 더욱 원활하게 운영하실 수 있도록 시연 및 활용법 교육을 제공합니다.
+지원 내용: 관리자 페이지 활용법, 학생 독서 데이터 확인 방법, 수업 적용 팁
+신청 방법: 교육 지원이 필요하신 경우 원하시는 날짜와 시간을 회신 주시면 일정을 조율하여 신속히 도와드리겠습니다.
+
+이용 중 궁금하신 점은 언제든 말씀해 주세요.
+
+선생님의 학급에 즐거운 독서 변화가 시작되기를 응원합니다!
+
+{CONTACT_INFO}""",
+    ),]
+
+TEMPLATE_REGISTRY = {t.title: t for t in TEMPLATES}
+
+
+# ==========================================
+# [함수] 일괄 생성 (메일 머지)
+# ==========================================
+def render_bulk(template, records):
+    # records: 행(dict) 목록 -> (생성 결과 목록, 오류 목록). 오류 행은 건너뛰고 나머지는 생성합니다.
+    results, errors = [], []
+    for i, row in enumerate(records, start=1):
+        values, row_errors = template.parse_row(row)
+        if row_errors:
+            errors.append({"행": i, "학교/담당자": f"{row.get('학교명', '')} {row.get('교사명', '')}".strip(),
+                           "오류": " / ".join(row_errors)})
+            continue
+        subject, body = template.render(values)
+        email = str(row.get(EMAIL_COLUMN, "") or "").strip()
+        results.append({"행": i, "템플릿": template.title, "받는사람": "" if email == "nan" else email,
+                        "제목": subject, "본문": body, "values": values})
+    return results, errors
+
+
+def _safe_name(text):
+    return "".join(c for c in str(text) if c.isalnum() or c in "-_ ").strip().replace(" ", "_") or "mail"
+
+
+def stream_zip(results, spool_limit=8 * 1024 * 1024):
+    # 메일 한 통씩 압축 파일에 바로 써 넣습니다. (일정 크기를 넘으면 메모리 대신 임시 파일 사용)
+    spool = tempfile.SpooledTemporaryFile(max_size=spool_limit)
+    with zipfile.ZipFile(spool, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for r in results:
+            label = _safe_name(f"{r['values'].get('school', '')}_{r['values'].get('teacher', '')}")
+            zf.writestr(f"{r['행']:04d}_{label}.txt", f"제목: {r['제목']}\n\n{r['본문']}")
+    spool.seek(0)
+    return spool
+
+
+def results_csv(results):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(["행", "템플릿", "받는사람", "제목", "본문"])
+    for r in results:
+        writer.writerow([r["행"], r["템플릿"], r["받는사람"], r["제목"], r["본문"]])
+    return buf.getvalue().encode("utf-8-sig")
@@ -0,0 +1,111 @@
+import re
+import html
+import hashlib
+import threading
+from collections import Counter
+
+from utils.retrieval import NgramIndex
+
+# ==========================================
+# [설정] RCA 노트 검색
+# ==========================================
+# 주제/논리분석내용/결론(Action)을 한글 글자 n-gram으로 색인하고,
+# 카테고리/작성월 패싯과 하이라이트 스니펫을 제공합니다.
+FIELD_WEIGHTS = {"주제": 3, "결론(Action)": 2, "논리분석내용": 1}
+SNIPPET_RADIUS = 60
+
+
+def note_text(note):
+    return " ".join(" ".join([str(note.get(field, ""))] * weight) for field, weight in FIELD_WEIGHTS.items())
+
+
+def note_month(note):
+    return str(note.get("작성일", ""))[:7] or "날짜없음"
+
+
+# ==========================================
+# [함수] 하이라이트 스니펫
+# ==========================================
+def query_pattern(query):
+    # '지성의 별' / '지성의별' 모두 맞도록 글자 사이 공백을 허용하는 패턴 (키워드 분석 탭과 같은 방식)
+    terms = [t for t in query.split() if t]
+    if not terms:
+        return None
+    parts = [r"\s*".join(map(re.escape, t)) for t in sorted(terms, key=len, reverse=True)]
+    return re.compile("|".join(parts), re.IGNORECASE)
+
+
+def highlight_snippet(text, query, radius=SNIPPET_RADIUS):
+    text = str(text or "")
+    pattern = query_pattern(query) if query else None
+    match = pattern.search(text) if pattern else None
+    if match is None:
+        snippet = text[:radius * 2]
+        return html.escape(snippet) + ("…" if len(text) > len(snippet) else "")
+    start = max(0, match.start() - radius)
+    end = min(len(text), match.end() + radius)
+    window = text[start:end]
+    out, last = [], 0
+    for m in pattern.finditer(window):
+        out.append(html.escape(window[last:m.start()]))
+        out.append(f"<mark>{html.escape(m.group())}</mark>")
+        last = m.end()
+    out.append(html.escape(window[last:]))
+    return ("…" if start > 0 else "") + "".join(out) + ("…" if end < len(text) else "")
+
+
+# ==========================================
+# [클래스] 증분 검색 색인
+# ==========================================
+class NoteSearchIndex:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.index = NgramIndex()
+        self.notes = {}          # _id -> note
+        self._digests = {}       # _id -> 내용 해시 (바뀐 노트만 다시 색인)
+        self.version = None
+
+    def update(self, notes, version=None):
+        # 새로 생긴/바뀐 노트만 색인하고, 사라진 노트(예: 전송 대기 -> 시트 반영)는 빼냅니다.
+        with self._lock:
+            if version is not None and version == self.version:
+                return 0
+            seen, changed = set(), 0
+            for note in notes:
+                doc_id = note["_id"]
+                seen.add(doc_id)
+                digest = hashlib.md5(note_text(note).encode("utf-8")).hexdigest()
+                if self._digests.get(doc_id) != digest:
+                    self.index.add(doc_id, note_text(note))
+                    self._digests[doc_id] = digest
+                    changed += 1
+                self.notes[doc_id] = note
+            for doc_id in set(self.notes) - seen:
+                self.index.remove(doc_id)
+                self.notes.pop(doc_id)
+                self._digests.pop(doc_id, None)
+            self.version = version
+            return changed
+
+    def facets(self, doc_ids=None):
+        notes = self.notes.values() if doc_ids is None else (self.notes[d] for d in doc_ids)
+        notes = list(notes)
+        return (
+            Counter(str(n.get("카테고리", "")) for n in notes),
+            Counter(note_month(n) for n in notes),
+        )
+
+    def search(self, query="", categories=None, months=None):
+        with self._lock:
+            candidates = {
+                doc_id for doc_id, note in self.notes.items()
+                if (not categories or str(note.get("카테고리", "")) in categories)
+                and (not months or note_month(note) in months)
+            }
+            if query.strip():
+                ranked = self.index.search(query, k=len(candidates) or 1, candidates=candidates)
+                return [self.notes[doc_id] for doc_id, _ in ranked]
+            # 검색어가 없으면 최신순
+            return sorted((self.notes[d] for d in candidates),
+                          key=lambda n: (str(n.get("작성일", "")), n["_id"]), reverse=True)
@@ -0,0 +1,267 @@
+import os
+import json
+import time
+import uuid
+import fcntl
+import threading
+from contextlib import contextmanager
+
+# ==========================================
+# [설정] RCA 분석 노트 저장소
+# ==========================================
+# 읽기: 시트를 한 번 통째로 읽은 뒤에는 새로 추가된 행만 이어서 가져옵니다.
+# 쓰기: 저장 버튼은 로컬 outbox 파일에 기록하고 바로 끝나며(화면에는 즉시 반영),
+#       백그라운드 작업자가 모아서 시트에 append_rows로 보내고 실패하면 재시도합니다.
+SHEET_URL = "https://docs.google.com/spreadsheets/d/1MQVn2jcKiHagQqUyyHR3ew9BLhD520Cv3UTwVMo5_6g/edit?usp=sharing"
+WORKSHEET_NAME = "CS_논리노트"
+HEADER = ["작성일", "주제", "카테고리", "논리분석내용", "결론(Action)"]
+KEYFILE = "service-account.json"
+SCOPE = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages")
+OUTBOX_PATH = os.path.join(PAGES_DIR, "rca_outbox.jsonl")
+
+SYNC_INTERVAL = 30          # 증분 동기화 최소 간격(초)
+FULL_RESYNC_INTERVAL = 600  # 시트에서 직접 수정된 내용까지 반영하는 전체 재조회 간격(초)
+FLUSH_BATCH = 50            # 한 번에 시트로 보내는 최대 행 수
+RETRY_BASE = 5              # 전송 실패 시 첫 재시도 대기(초), 실패할 때마다 2배
+RETRY_MAX = 300
+CLAIM_TIMEOUT = 120         # 가져간 프로세스가 이 시간 안에 끝내지 못하면 다른 프로세스가 다시 보냄
+
+# 이 프로세스의 outbox 작업자 표시 (여러 레플리카가 같은 outbox 를 나눠 보낼 때 구분)
+WORKER_ID = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+def note_key(row):
+    # 같은 노트를 두 번 보내지 않도록 비교할 때 쓰는 키
+    return (str(row[0]), str(row[1]), str(row[3]))
+
+
+# ==========================================
+# [클래스] 노트 저장소 (캐시 + outbox + 백그라운드 전송)
+# ==========================================
+class NoteStore:
+
+    def __init__(self, outbox_path=OUTBOX_PATH):
+        self.outbox_path = outbox_path
+        self._lock = threading.RLock()      # 메모리 상태(rows, version)용 - 네트워크 호출 중에는 잡지 않음
+        self._io_lock = threading.Lock()    # 시트 읽기/보내기를 한 번에 하나씩
+        self._wakeup = threading.Event()
+        self._worksheet = None
+        self.rows = []               # 시트에 저장된 행 (HEADER 순서의 리스트)
+        self.sheet_rows = 0          # 지금까지 읽은 시트 행 수 (헤더, 빈 행 포함)
+        self._last_raw = None        # 마지막으로 읽은 시트 행 (증분 조회 시 위치가 맞는지 확인용)
+        self.last_sync = 0.0
+        self.last_full_sync = 0.0
+        self.last_error = None
+        self.retry_delay = 0
+        self._worker = None
+        self.version = 0             # 이 프로세스의 시트 사본/전송이 바뀔 때마다 증가 (state() 참고)
+
+    # --- 시트 연결 (프로세스당 한 번 인증) ---
+    def worksheet(self):
+        with self._lock:
+            if self._worksheet is None:
+                import gspread
+                from oauth2client.service_account import ServiceAccountCredentials
+                creds = ServiceAccountCredentials.from_json_keyfile_name(KEYFILE, SCOPE)
+                sh = gspread.authorize(creds).open_by_url(SHEET_URL)
+                try:
+                    ws = sh.worksheet(WORKSHEET_NAME)
+                except gspread.exceptions.WorksheetNotFound:
+                    ws = sh.add_worksheet(title=WORKSHEET_NAME, rows="100", cols="5")
+                    ws.append_row(HEADER)
+                self._worksheet = ws
+            return self._worksheet
+
+    # --- 읽기 (증분 동기화) ---
+    def sync(self, force=False):
+        # 다른 스레드가 이미 시트와 통신 중이면, 강제가 아닌 동기화는 기다리지 않고 건너뜀
+        if not self._io_lock.acquire(blocking=force):
+            return False
+        try:
+            return self._sync(force)
+        finally:
+            self._io_lock.release()
+
+    def _sync(self, force):
+        now = time.time()
+        if not force and now - self.last_sync < SYNC_INTERVAL:
+            return False
+        ws = self.worksheet()
+        values = None
+        if now - self.last_full_sync < FULL_RESYNC_INTERVAL and self.sheet_rows > 1:
+            # 마지막으로 읽은 행부터 다시 받아서, 그 행이 그대로면 뒤의 행만 추가.
+            # 위쪽 행이 지워지거나 끼워져 위치가 어긋났으면 전체 재조회로 넘어감
+            tail = ws.get(f"A{self.sheet_rows}:E")
+            if tail and self._normalize(tail[0]) == self._last_raw:
+                new_values = tail[1:]
+            else:
+                values = ws.get_all_values()
+        else:
+            values = ws.get_all_values()
+
+        with self._lock:
+            if values is not None:
+                self.rows = [self._normalize(v) for v in values[1:] if any(v)]
+                self.sheet_rows = len(values)
+                self._last_raw = self._normalize(values[-1]) if values else None
+                self.last_full_sync = now
+                changed = True
+            else:
+                new_rows = [self._normalize(v) for v in new_values if any(v)]
+                self.rows.extend(new_rows)
+                if new_values:
+                    self.sheet_rows += len(new_values)
+                    self._last_raw = self._normalize(new_values[-1])
+                changed = bool(new_rows)
+            self.last_sync = now
+            if changed:
+                self.version += 1
+            return changed
+
+    @staticmethod
+    def _normalize(values):
+        values = list(values) + [""] * (len(HEADER) - len(values))
+        return values[:len(HEADER)]
+
+    # --- 쓰기 (outbox) ---
+    @contextmanager
+    def _outbox_locked(self):
+        # 같은 서버의 여러 프로세스가 outbox 파일을 함께 쓰므로 읽기-수정-쓰기는 파일 잠금 안에서
+        with open(self.outbox_path + ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_outbox(self):
+        if not os.path.exists(self.outbox_path):
+            return []
+        with open(self.outbox_path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def pending(self):
+        with self._outbox_locked():
+            return self._read_outbox()
+
+    def submit(self, row):
+        entry = {"id": uuid.uuid4().hex, "row": self._normalize(row), "created_at": time.time()}
+        with self._outbox_locked():
+            with open(self.outbox_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())  # 전송 전에 서버가 재시작돼도 잃어버리지 않도록
+        with self._lock:
+            self.version += 1
+        self._wakeup.set()
+        return entry["id"]
+
+    def _rewrite_outbox(self, entries):
+        tmp = f"{self.outbox_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.outbox_path)
+
+    def _claim(self):
+        # 아무도 가져가지 않은(또는 가져간 지 CLAIM_TIMEOUT 이 지난) 항목을 이 프로세스 몫으로 표시
+        now = time.time()
+        with self._outbox_locked():
+            entries = self._read_outbox()
+            batch = [e for e in entries if now - e.get("claimed_at", 0) >= CLAIM_TIMEOUT][:FLUSH_BATCH]
+            for e in batch:
+                e["claimed_by"], e["claimed_at"] = WORKER_ID, now
+            if batch:
+                self._rewrite_outbox(entries)
+        return batch
+
+    def _finish(self, ids, sent):
+        # 보낸 항목은 지우고, 못 보낸 항목은 다시 누구나 가져갈 수 있게 표시를 풂 (파일을 새로 읽어서)
+        with self._outbox_locked():
+            entries = []
+            for e in self._read_outbox():
+                if e["id"] in sent:
+                    continue
+                if e["id"] in ids and e.get("claimed_by") == WORKER_ID:
+                    e.pop("claimed_by", None)
+                    e.pop("claimed_at", None)
+                entries.append(e)
+            self._rewrite_outbox(entries)
+
+    def flush(self):
+        with self._io_lock:
+            batch = self._claim()
+            if not batch:
+                return 0
+            ids = {e["id"] for e in batch}
+            sent = set()
+            try:
+                # 지난번 전송이 시트에는 들어갔는데 outbox 정리 전에 끊긴 경우를 대비해 중복을 걸러냅니다.
+                self._sync(force=True)
+                with self._lock:
+                    existing = {note_key(r) for r in self.rows[-(len(batch) + FLUSH_BATCH):]}
+                fresh = [e for e in batch if note_key(e["row"]) not in existing]
+                if fresh:
+                    self.worksheet().append_rows([e["row"] for e in fresh], value_input_option="RAW")
+                sent = ids
+                self._sync(force=True)   # 방금 보낸 행을 시트 위치 그대로 다시 읽어 옴
+            finally:
+                self._finish(ids, sent)
+                with self._lock:
+                    self.version += 1
+            return len(batch)
+
+    # --- 백그라운드 작업자 ---
+    def start_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="rca-outbox", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(timeout=self.retry_delay or SYNC_INTERVAL)
+            self._wakeup.clear()
+            try:
+                while self.flush() == FLUSH_BATCH:
+                    pass
+                self.last_error = None
+                self.retry_delay = 0
+            except Exception as e:
+                self.last_error = str(e)
+                self.retry_delay = min(RETRY_MAX, (self.retry_delay or RETRY_BASE / 2) * 2)
+
+    def state(self):
+        # 검색 색인 등 파생 데이터 갱신용 키: 시트 사본 버전 + 공유 outbox 파일 상태
+        # (version 은 프로세스마다 따로 세므로, 다른 프로세스가 outbox 에 쓴 노트는 파일 수정 시각/크기로 알아챔)
+        try:
+            info = os.stat(self.outbox_path)
+            outbox = (info.st_ino, info.st_mtime_ns, info.st_size)
+        except FileNotFoundError:
+            outbox = None
+        with self._lock:
+            return self.version, outbox
+
+    # --- 화면용 목록 (write-through) ---
+    def all_notes(self):
+        # 시트 행 + 아직 전송 대기 중인 outbox 행을 합쳐 최신순으로 돌려줍니다.
+        pending = self.pending()
+        with self._lock:
+            notes = [dict(zip(HEADER, r), _id=f"r{i}", _pending=False) for i, r in enumerate(self.rows)]
+        notes += [dict(zip(HEADER, e["row"]), _id=f"p{e['id']}", _pending=True) for e in pending]
+        return notes[::-1]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_note_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = NoteStore()
+            _store.start_worker()
+        return _store
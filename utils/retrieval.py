@@ -0,0 +1,79 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+# ==========================================
+# [설정] 한글 글자 n-gram 검색
+# ==========================================
+# 형태소 분석기 없이도 '지성의 별' / '지성의별'처럼 띄어쓰기가 달라도 맞도록
+# 공백을 없앤 글자 단위 n-gram으로 색인합니다.
+NGRAM_SIZE = 2
+_NON_WORD = re.compile(r"[^0-9a-z가-힣]+")
+
+
+def normalize(text):
+    return _NON_WORD.sub("", str(text or "").lower())
+
+
+def char_ngrams(text, n=NGRAM_SIZE):
+    text = normalize(text)
+    if len(text) < n:
+        return [text] if text else []
+    return [text[i:i + n] for i in range(len(text) - n + 1)]
+
+
+# ==========================================
+# [클래스] 증분 역색인
+# ==========================================
+class NgramIndex:
+    # 문서를 하나씩 add() 할 수 있는 TF-IDF 방식 역색인입니다.
+
+    def __init__(self, n=NGRAM_SIZE):
+        self.n = n
+        self.postings = defaultdict(dict)   # gram -> {doc_id: tf}
+        self.doc_norms = {}                 # doc_id -> 문서 길이 정규화 값
+        self.doc_grams = {}                 # doc_id -> 포함된 gram 목록 (삭제용)
+
+    def __len__(self):
+        return len(self.doc_norms)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.doc_norms
+
+    def add(self, doc_id, text):
+        if doc_id in self.doc_norms:
+            self.remove(doc_id)
+        counts = Counter(char_ngrams(text, self.n))
+        for gram, tf in counts.items():
+            self.postings[gram][doc_id] = tf
+        self.doc_norms[doc_id] = math.sqrt(sum(counts.values())) or 1.0
+        self.doc_grams[doc_id] = list(counts)
+
+    def remove(self, doc_id):
+        for gram in self.doc_grams.pop(doc_id, ()):
+            docs = self.postings.get(gram)
+            if docs is not None:
+                docs.pop(doc_id, None)
+                if not docs:
+                    del self.postings[gram]
+        self.doc_norms.pop(doc_id, None)
+
+    def idf(self, gram):
+        df = len(self.postings.get(gram, ()))
+        return math.log(1 + len(self.doc_norms) / df) if df else 0.0
+
+    def scores(self, query, candidates=None):
+        scores = defaultdict(float)
+        for gram in set(char_ngrams(query, self.n)):
+            docs = self.postings.get(gram)
+            if not docs:
+                continue
+            weight = self.idf(gram)
+            for doc_id, tf in docs.items():
+                if candidates is None or doc_id in candidates:
+                    scores[doc_id] += weight * (1 + math.log(tf))
+        return {doc_id: s / self.doc_norms[doc_id] for doc_id, s in scores.items()}
+
+    def search(self, query, k=5, min_score=0.0, candidates=None):
+        ranked = sorted(self.scores(query, candidates).items(), key=lambda x: x[1], reverse=True)
+        return [(doc_id, s) for doc_id, s in ranked[:k] if s > min_score]
@@ -0,0 +1,114 @@
+import os
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from utils.cache_registry import registry
+
+# ==========================================
+# [설정] 처리 시간 / SLA 분석
+# ==========================================
+# 처리 시간은 주말과 공휴일을 뺀 영업일 기준으로 셉니다. (np.busday_count, 행 전체를 한 번에 계산)
+# 분위수는 기준 컬럼 3개를 세로로 펼친 뒤 groupby 한 번으로 모두 구합니다.
+SLA_DAYS = 2                    # 목표 처리 기한(영업일)
+AGING_THRESHOLDS = [3, 5, 10]   # 미처리 건 경과 구간(영업일)
+QUANTILES = [0.5, 0.9, 0.99]
+GROUP_COLUMNS = ['카테고리', '처리카테고리', '협업 부서']
+DONE_STATUS = "처리완료"
+CACHE_NAME = "utils.sla.sla_report"
+CACHE_TTL = 3600
+
+# 대한민국 공휴일 (대체공휴일 포함). 추가 휴무일은 환경변수 CS_HOLIDAYS="2026-05-01,2026-12-31" 로 지정
+HOLIDAYS_KR = [
+    # 2025
+    "2025-01-01", "2025-01-27", "2025-01-28", "2025-01-29", "2025-01-30", "2025-03-03", "2025-05-05",
+    "2025-05-06", "2025-06-03", "2025-06-06", "2025-08-15", "2025-10-03", "2025-10-06", "2025-10-07",
+    "2025-10-08", "2025-10-09", "2025-12-25",
+    # 2026
+    "2026-01-01", "2026-02-16", "2026-02-17", "2026-02-18", "2026-03-02", "2026-05-05", "2026-05-25",
+    "2026-06-03", "2026-08-17", "2026-09-24", "2026-09-25", "2026-10-05", "2026-10-09", "2026-12-25",
+    # 2027
+    "2027-01-01", "2027-02-08", "2027-02-09", "2027-03-01", "2027-05-05", "2027-05-13", "2027-08-16",
+    "2027-09-14", "2027-09-15", "2027-09-16", "2027-10-04", "2027-10-11", "2027-12-27",
+]
+
+
+def holidays():
+    extra = [d.strip() for d in os.environ.get("CS_HOLIDAYS", "").split(",") if d.strip()]
+    return np.array(sorted(set(HOLIDAYS_KR + extra)), dtype="datetime64[D]")
+
+
+def business_days(start, end, holiday_list=None):
+    # 두 날짜 Series 사이의 영업일 수 (시작일 포함, 종료일 제외). 둘 중 하나라도 없으면 NaN
+    holiday_list = holidays() if holiday_list is None else holiday_list
+    start = pd.to_datetime(start).to_numpy(dtype="datetime64[D]")
+    end = pd.to_datetime(end).to_numpy(dtype="datetime64[D]")
+    valid = ~(np.isnat(start) | np.isnat(end))
+    days = np.full(len(start), np.nan)
+    days[valid] = np.clip(np.busday_count(start[valid], end[valid], holidays=holiday_list), 0, None)
+    return days
+
+
+# ==========================================
+# [함수] SLA 리포트 (데이터 버전별 캐시)
+# ==========================================
+def _compute(df, today):
+    hol = holidays()
+    finished = df['처리일'] if '처리일' in df.columns else pd.Series(pd.NaT, index=df.index)
+    done = df['처리 상태'].eq(DONE_STATUS).to_numpy() if '처리 상태' in df.columns else finished.notna().to_numpy()
+    handled = business_days(df['일시'], finished, hol)
+    age = business_days(df['일시'], pd.Series(pd.Timestamp(today), index=df.index), hol)
+
+    base = pd.DataFrame({'영업일': handled, 'SLA 준수': handled <= SLA_DAYS}, index=df.index)
+    groups = [c for c in GROUP_COLUMNS if c in df.columns]
+
+    # 기준 컬럼들을 세로로 펼쳐서(기준, 값) groupby 한 번으로 분위수/건수/준수율 계산
+    closed = ~np.isnan(handled)
+    if groups and closed.any():
+        long = (df.loc[closed, groups].astype(str).apply(lambda s: s.str.strip())
+                .join(base[closed])
+                .melt(id_vars=['영업일', 'SLA 준수'], value_vars=groups, var_name='기준', value_name='값'))
+        long = long[long['값'] != '']
+        grouped = long.groupby(['기준', '값'], sort=False)
+        stats = grouped['영업일'].quantile(QUANTILES).unstack()
+        stats.columns = [f"p{int(q * 100)}" for q in QUANTILES]
+        stats.insert(0, '처리 건수', grouped.size())
+        stats['SLA 준수율'] = grouped['SLA 준수'].mean()
+        stats = stats.reset_index().sort_values(['기준', '처리 건수'], ascending=[True, False], ignore_index=True)
+    else:
+        stats = pd.DataFrame(columns=['기준', '값', '처리 건수'] + [f"p{int(q * 100)}" for q in QUANTILES] + ['SLA 준수율'])
+
+    # 미처리 건 경과 영업일
+    open_mask = ~done
+    aging = df.loc[open_mask].assign(**{'경과 영업일': age[open_mask]})
+    aging = aging[aging['경과 영업일'] >= AGING_THRESHOLDS[0]].copy()
+    labels = [f"{lo}~{hi - 1}일" for lo, hi in zip(AGING_THRESHOLDS, AGING_THRESHOLDS[1:])] + [f"{AGING_THRESHOLDS[-1]}일 이상"]
+    aging['경과 구간'] = pd.cut(aging['경과 영업일'], AGING_THRESHOLDS + [np.inf], right=False, labels=labels)
+    aging = aging.sort_values('경과 영업일', ascending=False)
+
+    overall = {
+        "closed": int(closed.sum()),
+        "p50": float(np.nanpercentile(handled, 50)) if closed.any() else None,
+        "p90": float(np.nanpercentile(handled, 90)) if closed.any() else None,
+        "sla_rate": float((handled[closed] <= SLA_DAYS).mean()) if closed.any() else None,
+        "open": int(open_mask.sum()),
+        "aging": aging['경과 구간'].value_counts().reindex(labels, fill_value=0).to_dict(),
+    }
+    return {"overall": overall, "groups": stats, "aging": aging, "handled": handled}
+
+
+def sla_report(df, version, today=None):
+    """영업일 기준 처리 시간 리포트. 같은 데이터 버전 + 같은 날짜면 캐시에서 돌려줍니다.
+
+    version: df 를 가리키는 싼 키 (원본 데이터 버전 + 필터 조건, 예: 페이지의 view 키 - 표를 해시하지 않음)
+    돌려주는 dict: overall(전체 요약), groups(기준별 분위수 표), aging(기준 초과 미처리 건),
+    handled(행별 처리 영업일 배열, df 와 같은 순서)
+    """
+    today = today or datetime.date.today()
+    key = (version, today.isoformat())
+    hit, report = registry.get(CACHE_NAME, key)
+    if not hit:
+        report = _compute(df, today)
+        registry.put(CACHE_NAME, key, report, ttl=CACHE_TTL, max_entries=4)
+    return report
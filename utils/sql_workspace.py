@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import threading
+
+import pandas as pd
+
+# ==========================================
+# [설정] SQL 작업공간 (DuckDB, 메모리 전용)
+# ==========================================
+# 이미 캐시에 올라와 있는 DataFrame을 Arrow 테이블로 바꿔 DuckDB에 등록(register)합니다.
+# DuckDB는 Arrow 버퍼를 그대로 스캔하므로 데이터를 DB 안으로 다시 복사하지 않습니다.
+PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages")
+SAVED_QUERIES_PATH = os.path.join(PAGES_DIR, "saved_queries.json")
+
+QUERY_TIMEOUT = 10      # 초, 넘으면 con.interrupt()로 중단
+PREVIEW_ROWS = 1000     # 화면에 가져오는 최대 행 수
+READ_ONLY_PREFIXES = ("select", "with", "from", "describe", "show", "summarize", "pivot", "unpivot", "values")
+
+EXAMPLE_QUERIES = {
+    "부서별 처리 현황": (
+        'SELECT 출처, "처리 상태", COUNT(*) AS 건수\n'
+        'FROM cs\nGROUP BY ALL\nORDER BY 출처, 건수 DESC'
+    ),
+    "월별 신규 가입 (지점별)": (
+        "SELECT date_trunc('month', 가입일) AS 월, 소속, COUNT(*) AS 가입자\n"
+        "FROM signups\nWHERE 가입일 IS NOT NULL\nGROUP BY ALL\nORDER BY 월"
+    ),
+    "일자별 챗봇 질문 수": (
+        "SELECT CAST(timestamp AS DATE) AS 날짜, COUNT(*) AS 질문\n"
+        "FROM chat_log\nWHERE role = 'user'\nGROUP BY ALL\nORDER BY 날짜"
+    ),
+}
+
+
+class QueryError(Exception):
+    pass
+
+
+class QueryTimeout(QueryError):
+    pass
+
+
+def mask_sql(sql):
+    # 주석은 지우고 문자열('...')/따옴표 이름("...") 안쪽은 공백으로 가린 같은 길이의 문자열.
+    # 문장 구분(;)과 시작 키워드를 문자열 내용에 속지 않고 확인하기 위한 용도
+    out, i, n = [], 0, len(sql)
+    while i < n:
+        c = sql[i]
+        if c in ("'", '"'):
+            j = i + 1
+            while j < n:
+                if sql[j] == c:
+                    if j + 1 < n and sql[j + 1] == c:   # '' 또는 "" 는 이스케이프
+                        j += 2
+                        continue
+                    break
+                j += 1
+            out.append(c + " " * (min(j, n) - i - 1) + (c if j < n else ""))
+            i = j + 1
+        elif sql.startswith("--", i):
+            j = sql.find("\n", i)
+            j = n if j < 0 else j
+            out.append(" " * (j - i))
+            i = j
+        elif sql.startswith("/*", i):
+            j = sql.find("*/", i + 2)
+            j = n if j < 0 else j + 2
+            out.append(" " * (j - i))
+            i = j
+        else:
+            out.append(c)
+            i += 1
+    return "".join(out)
+
+
+def check_read_only(sql):
+    # 조회용 단일 문장만 허용합니다. (등록된 테이블을 바꾸거나 파일을 쓰는 문장 차단)
+    masked = mask_sql(sql).rstrip()
+    while masked.endswith(";"):
+        masked = masked[:-1].rstrip()
+    if not masked.strip():
+        raise QueryError("실행할 SQL이 없습니다.")
+    if ";" in masked:
+        raise QueryError("한 번에 하나의 문장만 실행할 수 있습니다.")
+    if not masked.lstrip().lower().startswith(READ_ONLY_PREFIXES):
+        raise QueryError("조회(SELECT / WITH / DESCRIBE ...) 문장만 실행할 수 있습니다.")
+    # 가린 문자열과 같은 위치까지 원문을 잘라 실행 (문자열 안의 ; 와 주석은 그대로 둠)
+    return sql[:len(masked)].strip()
+
+
+def to_arrow(df):
+    import pyarrow as pa
+
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        # 시트에서 온 열에 숫자/문자가 섞여 있으면 문자열로 맞춰서 등록합니다.
+        mixed = {c: "string" for c in df.columns if df[c].dtype == object}
+        return pa.Table.from_pandas(df.astype(mixed), preserve_index=False)
+
+
+# ==========================================
+# [클래스] 세션별 SQL 작업공간
+# ==========================================
+class SqlWorkspace:
+
+    def __init__(self):
+        import duckdb
+
+        self._duckdb = duckdb
+        # 서버의 로컬 파일(read_text('service-account.json') 등)과 외부 접근을 막고, 사용자 SQL이
+        # 설정을 되돌리지 못하게 잠급니다. 적용할 수 없으면 작업공간을 만들지 않습니다. (열린 채로 실행하지 않음)
+        try:
+            self.con = duckdb.connect(":memory:", config={"enable_external_access": False})
+            self.con.execute("SET lock_configuration = true")
+        except duckdb.Error as e:
+            raise QueryError(f"SQL 작업공간의 보안 설정을 적용할 수 없습니다: {e}")
+        self._lock = threading.Lock()
+        self._sources = {}   # 테이블 이름 -> 마지막으로 등록한 Arrow 테이블 (같은 객체면 다시 등록하지 않음)
+        self.tables = {}     # 테이블 이름 -> {"rows", "columns"}
+
+    def register(self, name, table):
+        # table 은 to_arrow()로 만든 pyarrow.Table (프로세스 공용 캐시에 있는 객체를 그대로 넘김)
+        with self._lock:
+            if self._sources.get(name) is table:
+                return False
+            self.con.register(name, table)
+            self._sources[name] = table
+            self.tables[name] = {"rows": table.num_rows, "columns": table.column_names}
+            return True
+
+    def run(self, sql, limit=PREVIEW_ROWS, timeout=QUERY_TIMEOUT):
+        # (결과 DataFrame, 잘렸는지 여부, 걸린 시간) 을 돌려줍니다.
+        body = check_read_only(sql)
+        with self._lock:
+            timer = threading.Timer(timeout, self.con.interrupt)
+            started = time.perf_counter()
+            timer.start()
+            try:
+                table = self.con.sql(body).limit(limit + 1).arrow()
+            except self._duckdb.InterruptException:
+                raise QueryTimeout(f"{timeout}초가 지나 쿼리를 중단했습니다.")
+            except self._duckdb.Error as e:
+                raise QueryError(str(e))
+            finally:
+                timer.cancel()
+            elapsed = time.perf_counter() - started
+        truncated = table.num_rows > limit
+        return table.slice(0, limit).to_pandas(), truncated, elapsed
+
+
+# ==========================================
+# [함수] 저장된 쿼리 (JSON 파일)
+# ==========================================
+def load_saved_queries(path=SAVED_QUERIES_PATH):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_query(name, sql, path=SAVED_QUERIES_PATH):
+    queries = load_saved_queries(path)
+    queries[name] = sql
+    _write_queries(queries, path)
+    return queries
+
+
+def delete_query(name, path=SAVED_QUERIES_PATH):
+    queries = load_saved_queries(path)
+    queries.pop(name, None)
+    _write_queries(queries, path)
+    return queries
+
+
+def _write_queries(queries, path):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(queries, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def chartable_columns(df):
+    numeric = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+    return list(df.columns), numeric
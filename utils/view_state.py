@@ -0,0 +1,73 @@
+import datetime
+
+import streamlit as st
+
+from utils.cache_registry import registry
+
+# ==========================================
+# [설정] 필터 상태 공유 (URL 쿼리 파라미터) + 세션 공용 결과 캐시
+# ==========================================
+# 필터 값은 주소창 쿼리 파라미터(?mode=관리부&from=2026-10-12&grades=초1,초2&kw=완독)에도 적어 두므로
+# 링크만 보내면 같은 화면이 열립니다. 필터를 정규화한 값(view_key)이 같으면 어느 세션에서 보든
+# 같은 계산 결과(필터된 표, 집계표, 그림)를 프로세스 공용 캐시에서 그대로 꺼내 씁니다.
+# 캐시된 결과는 여러 사람이 함께 보므로 호출하는 쪽에서 고치면 안 됩니다. (복사본이 아님)
+VIEW_CACHE = "utils.view_state.shared_view"
+VIEW_TTL = 600          # 데이터 버전이 키에 들어 있으므로 TTL은 메모리 정리용
+MAX_VIEWS = 256         # 보기 x 결과 조각 수 상한
+ALL = "all"             # 학년 전체 선택을 뜻하는 정규화 값
+
+
+def get_param(name, default=None):
+    return st.query_params.get(name, default)
+
+
+def parse_date(value, default):
+    try:
+        return datetime.date.fromisoformat(value) if value else default
+    except ValueError:
+        return default
+
+
+def parse_list(value):
+    return [v for v in (value or "").split(",") if v]
+
+
+def init_state(key, value):
+    # 세션에서 처음 그릴 때만 URL 값으로 위젯 초기값을 채움 (이후에는 위젯 값이 우선)
+    if key not in st.session_state:
+        st.session_state[key] = value
+
+
+def write_params(values):
+    # {이름: 문자열 또는 None} - None 이면 주소에서 뺌. 값이 바뀐 것만 다시 씀
+    for name, value in values.items():
+        if value is None:
+            if name in st.query_params:
+                del st.query_params[name]
+        elif st.query_params.get(name) != value:
+            st.query_params[name] = value
+
+
+# ==========================================
+# [함수] 정규화된 필터 키 + 공용 캐시
+# ==========================================
+def grades_key(selected, options):
+    # 아무것도 안 골랐거나 전부 고른 경우는 같은 보기(전체)
+    chosen = sorted(set(selected) & set(options))
+    return ALL if not chosen or len(chosen) == len(set(options)) else tuple(chosen)
+
+
+def view_key(source, version, start, end, lo, hi, grades):
+    # version: 불러올 때 정해진 데이터 버전 (utils.data_sources.data_version - 다시 그릴 때마다 해시하지 않음)
+    # 기간은 데이터가 있는 범위로 잘라서 비교 (범위 밖을 골라도 같은 결과면 같은 키)
+    start, end = max(start, lo), min(end, hi)
+    return (source, version, start.isoformat(), end.isoformat(), grades)
+
+
+def shared_view(key, part, build):
+    """(보기 키, 결과 이름)으로 프로세스 공용 캐시에서 꺼내고, 없으면 build() 로 만들어 저장합니다."""
+    hit, value = registry.get(VIEW_CACHE, (key, part))
+    if not hit:
+        value = build()
+        registry.put(VIEW_CACHE, (key, part), value, ttl=VIEW_TTL, max_entries=MAX_VIEWS)
+    return value
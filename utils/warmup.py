@@ -0,0 +1,42 @@
+import time
+import importlib
+import threading
+
+# ==========================================
+# [설정] 백그라운드 미리 불러오기 대상
+# ==========================================
+# 대시보드 탭에서 처음 쓸 때 불러오는 무거운 라이브러리들.
+# 랜딩 페이지가 그려진 뒤 백그라운드에서 미리 import 해두면, 사용자가 해당 탭을 열 때 기다리지 않습니다.
+HEAVY_MODULES = [
+    "gspread",
+    "oauth2client.service_account",
+    "plotly.graph_objects",
+    "matplotlib.pyplot",
+    "wordcloud",
+    "prophet",
+]
+
+_started = False
+_lock = threading.Lock()
+timings = {}   # 모듈 -> 불러오는 데 걸린 시간(초), 실패 시 None
+
+
+def _warm_up(modules):
+    for name in modules:
+        started = time.perf_counter()
+        try:
+            importlib.import_module(name)
+            timings[name] = time.perf_counter() - started
+        except Exception:
+            timings[name] = None
+
+
+def start_warmup(modules=HEAVY_MODULES):
+    # 프로세스당 한 번만 실행합니다. (import 잠금 덕분에 페이지 쪽 import와 겹쳐도 안전)
+    global _started
+    with _lock:
+        if _started:
+            return False
+        _started = True
+    threading.Thread(target=_warm_up, args=(list(modules),), name="import-warmup", daemon=True).start()
+    return True